@@ -0,0 +1,247 @@
+'''
+Scaling benchmark for trajectory and safety analysis.
+
+Feeds synthetic traffic (see `synthetic_traffic.py`) through `TrajManager`, `TimeToCollision`
+and `PostEncroachmentTime` at several scales and records time, memory and correctness per stage.
+With `--compare`, exits non-zero if any correctness metric got worse than in the previous run.
+
+Usage
+-----
+    python benchmarks/bench_analysis.py --scales 10,100,1000 --output bench.json
+    python benchmarks/bench_analysis.py --compare bench.json
+'''
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from conflict_detection.homography import WorldProjector
+from conflict_detection.trajectory import TrajManager
+from conflict_detection.safety import TimeToCollision, PostEncroachmentTime
+from synthetic_traffic import SyntheticTraffic
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def identity_projector(width:int, height:int):
+    '''WorldProjector whose homography maps image space onto itself'''
+    pts = np.array([[[0, height], [width, height], [width, 0], [0, 0]]], dtype=np.float32)
+    return WorldProjector(pts, pts.copy())
+
+
+def measure(fn, trace_memory:bool=False):
+    '''Runs `fn` and returns (result, seconds, peak_bytes)'''
+    if trace_memory:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        peak -= baseline
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def run_pipeline(traffic:SyntheticTraffic, args, trace_memory:bool=False, run_conflicts:bool=True):
+    '''Runs every stage once; returns per-stage measurements and the stage outputs'''
+    stages = {}
+    outputs = {}
+    manager = TrajManager(identity_projector(traffic.width, traffic.height), traffic.fps)
+
+    def collect():
+        for _, tracks in traffic.frames():
+            manager.collect_tracks(tracks)
+
+    _, stages["collect_tracks"], peak_collect = measure(collect, trace_memory)
+    outputs["analyzers"], stages["analyze_tracks"], peak_analyze = measure(manager.analyze_tracks, trace_memory)
+    peaks = {"collect_tracks": peak_collect, "analyze_tracks": peak_analyze}
+
+    if run_conflicts:
+        for name, cls in [("ttc", TimeToCollision), ("pet", PostEncroachmentTime)]:
+            # Fresh analyzers so the per-time caches from the previous stage don't leak in
+            analyzers = list(manager.analyze_tracks().values())
+            detector = cls(ttc_thresh=args.ttc_thresh, min_dist=args.min_dist)
+            _, seconds, peak = measure(lambda: detector.analyze_all_conflicts(analyzers), trace_memory)
+            stages[f"{name}_analyze_all_conflicts"] = seconds
+            peaks[f"{name}_analyze_all_conflicts"] = peak
+            outputs[name] = detector
+
+    return stages, peaks, outputs
+
+
+def score_conflicts(detector, ground_truth:set, incidental:set=frozenset(), ambiguous:set=frozenset()):
+    '''
+    Scores detected pairs against the injected `ground_truth` conflicts
+
+    `incidental` pairs (see `SyntheticTraffic.incidental_conflicts()`) are expected detections too and
+    count toward precision but not recall; `ambiguous` pairs are left out of the score either way.
+    '''
+    detected = {tuple(sorted(pair)) for pair in detector.get_all_minimum_ttc()} - set(ambiguous)
+    tp = len(detected & ground_truth)
+    found_incidental = len(detected & incidental)
+    fp = len(detected - ground_truth - incidental)
+    fn = len(ground_truth - detected)
+    return {
+        "detected": len(detected),
+        "expected": len(ground_truth),
+        "true_positives": tp,
+        "false_positives": fp,
+        "false_negatives": fn,
+        "incidental_expected": len(incidental),
+        "incidental_detected": found_incidental,
+        "ambiguous": len(ambiguous),
+        "precision": (tp + found_incidental) / len(detected) if detected else 1.0,
+        "recall": tp / (tp + fn) if tp + fn else 1.0
+    }
+
+
+def score_tracks(traffic:SyntheticTraffic, analyzers:dict):
+    errors = []
+    for tid, track in traffic.tracks.items():
+        if track["speed"] == 0 or tid not in analyzers:
+            continue
+        speed = analyzers[tid].calculate_avg_speed()
+        if speed is not None:
+            errors.append(abs(speed - track["speed"]) / track["speed"])
+
+    return {
+        "expected_tracks": len(traffic.tracks),
+        "analyzed_tracks": len(analyzers),
+        "speed_mean_rel_error": float(np.mean(errors)) if errors else None,
+        "speed_max_rel_error": float(np.max(errors)) if errors else None
+    }
+
+
+def run_scale(n_tracks:int, args):
+    traffic = SyntheticTraffic(n_tracks, seed=args.seed)
+    run_conflicts = not args.skip_conflicts_above or n_tracks <= args.skip_conflicts_above
+
+    stages, _, outputs = run_pipeline(traffic, args, run_conflicts=run_conflicts)
+    result = {
+        "n_tracks": n_tracks,
+        "n_frames": traffic.n_frames,
+        "kinds": traffic.counts(),
+        "seconds": stages,
+        "peak_mb": None,
+        "correctness": {"tracks": score_tracks(traffic, outputs["analyzers"])}
+    }
+
+    if run_conflicts:
+        incidental, ambiguous = traffic.incidental_conflicts(args.min_dist)
+        for name in ("ttc", "pet"):
+            result["correctness"][name] = score_conflicts(outputs[name], traffic.ground_truth, incidental, ambiguous)
+    else:
+        result["skipped"] = ["ttc_analyze_all_conflicts", "pet_analyze_all_conflicts"]
+
+    if not args.no_memory:
+        _, peaks, _ = run_pipeline(traffic, args, trace_memory=True, run_conflicts=run_conflicts)
+        result["peak_mb"] = {stage: peak / 2**20 for stage, peak in peaks.items()}
+
+    return result
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=Path(__file__).parent).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform()
+    }
+
+
+# Correctness metrics compared between runs: name -> True when higher is better
+CORRECTNESS_METRICS = {"precision": True, "recall": True, "false_positives": False, "false_negatives": False, "incidental_detected": True, "analyzed_tracks": True}
+
+
+def compare(current:dict, previous:dict):
+    '''
+    Prints per-stage speedups and correctness changes of `current` relative to `previous`
+
+    :return: list of correctness regressions, empty when none got worse
+    '''
+    regressions = []
+    before = {r["n_tracks"]: r for r in previous["results"]}
+    for result in current["results"]:
+        old = before.get(result["n_tracks"])
+        if old is None:
+            continue
+        for stage, seconds in result["seconds"].items():
+            old_seconds = old["seconds"].get(stage)
+            if old_seconds:
+                print(f"n={result['n_tracks']:>6} {stage:<32} {old_seconds:9.3f}s -> {seconds:9.3f}s  ({old_seconds / seconds:5.2f}x)")
+
+        for section, scores in result["correctness"].items():
+            old_scores = old["correctness"].get(section, {})
+            for metric, higher_is_better in CORRECTNESS_METRICS.items():
+                value, old_value = scores.get(metric), old_scores.get(metric)
+                if value is None or old_value is None or value == old_value:
+                    continue
+                worse = value < old_value if higher_is_better else value > old_value
+                label = f"{section}.{metric}"
+                print(f"n={result['n_tracks']:>6} {label:<32} {old_value:9.3g}  -> {value:9.3g}   {'REGRESSED' if worse else 'improved'}")
+                if worse:
+                    regressions.append(f"n={result['n_tracks']} {label}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="10,100,1000,10000", help="Comma separated track counts")
+    parser.add_argument("--skip-conflicts-above", type=int, default=2000, help="Skip the O(n^2) conflict stages above this many tracks (0 runs every scale)")
+    parser.add_argument("--ttc-thresh", type=float, default=1.5)
+    parser.add_argument("--min-dist", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", default=None, help="JSON output path")
+    parser.add_argument("--compare", default=None, help="Previous JSON output to compare against")
+    parser.add_argument("--log-level", default="ERROR")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=args.log_level)
+
+    report = {"environment": environment(), "args": vars(args), "results": []}
+    for n_tracks in [int(s) for s in args.scales.split(",")]:
+        result = run_scale(n_tracks, args)
+        report["results"].append(result)
+        stages = ", ".join(f"{k}={v:.3f}s" for k, v in result["seconds"].items())
+        print(f"n={n_tracks}: {stages}")
+
+    output = Path(args.output or RESULTS_DIR / f"analysis_{datetime.now():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text()))
+        if regressions:
+            print(f"\nCorrectness regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
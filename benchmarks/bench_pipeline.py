@@ -0,0 +1,230 @@
+'''
+End-to-end pipeline benchmark.
+
+Renders synthetic traffic (see `synthetic_traffic.py`) to a video of moving rectangles, then runs
+`DetectionSystem.monitor_traffic()` -> `detect_conflicts()` headless with a fixed calibration and a
+stub detector that returns the ground-truth boxes, so no model, footage or click step is needed.
+
+Usage
+-----
+    python benchmarks/bench_pipeline.py --tracks 40 --output pipeline.json
+'''
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from conflict_detection.detect import DetectionSystem
+from conflict_detection.alerts import QueueSink
+from bench_analysis import RESULTS_DIR, environment, score_conflicts
+from synthetic_traffic import SyntheticTraffic
+
+CLASS_COLORS = {"car": (200, 120, 40), "motorcycle": (40, 200, 200), "bus": (40, 160, 40), "truck": (60, 60, 200)}
+
+
+class GroundTruthDetector:
+    '''Stands in for `ObjectDetector`; returns the synthetic boxes of the next frame on every call'''
+
+    def __init__(self, traffic:SyntheticTraffic):
+        self.by_frame = {idx: tracks for idx, tracks in traffic.frames()}
+        self.frame_idx = 0
+
+    def detect(self, frame:np.ndarray):
+        self.frame_idx += 1
+        return [{
+            "bbox": track["bbox"],
+            "conf": track["conf"],
+            "class_id": track["class_id"],
+            "class_name": track["class_name"]
+        } for track in self.by_frame.get(self.frame_idx, [])]
+
+    def skip_frame(self, detections:list):
+        self.frame_idx += 1
+
+
+def render_video(traffic:SyntheticTraffic, path:str):
+    '''Writes one frame per synthetic frame with every active track drawn as a filled rectangle'''
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), traffic.fps, (traffic.width, traffic.height))
+    background = np.full((traffic.height, traffic.width, 3), 90, dtype=np.uint8)
+    for x in range(0, traffic.width, traffic.tile_size):
+        cv2.line(background, (x, 0), (x, traffic.height), (160, 160, 160), 1)
+    for y in range(0, traffic.height, traffic.tile_size):
+        cv2.line(background, (0, y), (traffic.width, y), (160, 160, 160), 1)
+
+    for _, tracks in traffic.frames():
+        frame = background.copy()
+        for track in tracks:
+            x1, y1, x2, y2 = map(int, track["bbox"])
+            cv2.rectangle(frame, (x1, y1), (x2, y2), CLASS_COLORS[track["class_name"]], thickness=-1)
+        writer.write(frame)
+    writer.release()
+
+
+def match_track_ids(traffic:SyntheticTraffic, analyzers:dict):
+    '''Maps tracker ids onto synthetic ids by majority vote of the nearest ground-truth center per frame'''
+    centers_by_frame = {}
+    for tid, track in traffic.tracks.items():
+        for i, center in enumerate(track["centers"]):
+            centers_by_frame.setdefault(track["start_frame"] + i, []).append((tid, center))
+
+    mapping = {}
+    for track_id, analyzer in analyzers.items():
+        votes = Counter()
+        for pos in analyzer.positions:
+            candidates = centers_by_frame.get(pos["frame_idx"], [])
+            if candidates:
+                dists = [np.hypot(*(np.asarray(pos["center"]) - center)) for _, center in candidates]
+                votes[candidates[int(np.argmin(dists))][0]] += 1
+        if votes:
+            mapping[track_id] = votes.most_common(1)[0][0]
+    return mapping
+
+
+class _MappedConflicts:
+    '''Adapts detected conflicts keyed by tracker ids to synthetic ids for `score_conflicts()`'''
+
+    def __init__(self, min_ttc:dict, mapping:dict):
+        self.pairs = {(mapping.get(a), mapping.get(b)): v for (a, b), v in min_ttc.items()}
+
+    def get_all_minimum_ttc(self):
+        return {pair: v for pair, v in self.pairs.items() if None not in pair and pair[0] != pair[1]}
+
+
+def run(args):
+    traffic = SyntheticTraffic(args.tracks, fps=args.fps, tile_size=args.tile_size, grid=(args.cols, args.rows), seed=args.seed)
+    corners = np.array([[[0, traffic.height], [traffic.width, traffic.height], [traffic.width, 0], [0, 0]]], dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = str(Path(tmp) / "synthetic.mp4")
+        file_out = None if args.no_annotate else str(Path(tmp) / "annotated.mp4")
+
+        start = time.perf_counter()
+        render_video(traffic, video)
+        render_seconds = time.perf_counter() - start
+
+        sink = QueueSink() if args.alerts else None
+        system = DetectionSystem(video, world_pts=corners, img_pts=corners, detector=GroundTruthDetector(traffic), ttc_thresh=args.ttc_thresh, min_dist=args.min_dist, motion_gate=args.motion_gate, alert_sinks=[sink] if sink else None, tracker_backend=args.tracker)
+
+        start = time.perf_counter()
+        system.monitor_traffic(file_out=file_out, headless=True, bev=args.bev)
+        monitor_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        min_ttc = system.detect_conflicts()
+        conflict_seconds = time.perf_counter() - start
+
+        outputs = {"annotated_video_bytes": Path(file_out).stat().st_size if file_out else None}
+        if args.clips:
+            start = time.perf_counter()
+            clips = system.export_clips(str(Path(tmp) / "clips"), args.clip_pre, args.clip_post)
+            outputs.update({
+                "clips": len(clips),
+                "clip_frames": sum(clip["end_frame"] - clip["start_frame"] + 1 for clip in clips),
+                "clip_seconds": time.perf_counter() - start,
+                "clip_bytes": sum((Path(tmp) / "clips" / clip["path"]).stat().st_size for clip in clips)
+            })
+
+    analyzers = system.traj.get_analyzer()
+    mapping = match_track_ids(traffic, analyzers)
+    frames = system.timer.calls.get("track", 0)
+
+    alerts = None
+    if sink is not None:
+        events = [sink.events.get() for _ in range(sink.events.qsize())]
+        alerted = {(e["track_A_id"], e["track_B_id"]): e for e in events if e["type"] == "conflict"}
+        alerts = {
+            "events": len(events),
+            "by_type": dict(Counter(e["type"] for e in events)),
+            "sinks": system.alerts.summary(),
+            "conflict_pairs": score_conflicts(_MappedConflicts(alerted, mapping), traffic.ground_truth)
+        }
+    system.close()
+
+    return {
+        "n_tracks": args.tracks,
+        "n_frames": frames,
+        "frame_size": [traffic.width, traffic.height],
+        "render_seconds": render_seconds,
+        "monitor_traffic_seconds": monitor_seconds,
+        "detect_conflicts_seconds": conflict_seconds,
+        "frames_per_second": frames / monitor_seconds if monitor_seconds else None,
+        "stages": system.timer.summary(),
+        "tracks": {
+            "injected": len(traffic.tracks),
+            "tracked": len(analyzers),
+            "matched": len(set(mapping.values()))
+        },
+        "conflicts": score_conflicts(_MappedConflicts(min_ttc, mapping), traffic.ground_truth),
+        "outputs": outputs,
+        "motion_gate": system.gate.summary() if system.gate is not None else None,
+        "alerts": alerts
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=40)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--tile-size", type=int, default=160)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--ttc-thresh", type=float, default=1.5)
+    parser.add_argument("--min-dist", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-annotate", action="store_true", help="Skip drawing / writing the annotated output video")
+    parser.add_argument("--bev", action="store_true", help="Write the bird's-eye view next to the camera view in the annotated video")
+    parser.add_argument("--motion-gate", action="store_true", help="Skip inference on static / duplicate frames (see `MotionGate`)")
+    parser.add_argument("--clips", action="store_true", help="Also export per-conflict clips and report their cost")
+    parser.add_argument("--clip-pre", type=float, default=2.0)
+    parser.add_argument("--clip-post", type=float, default=2.0)
+    parser.add_argument("--tracker", default="bytetrack", choices=("bytetrack", "iou"), help="ObjectTracker backend")
+    parser.add_argument("--alerts", action="store_true", help="Publish conflict events while processing and score the alerted pairs")
+    parser.add_argument("--output", default=None, help="JSON output path")
+    parser.add_argument("--log-level", default="ERROR")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=args.log_level)
+
+    result = run(args)
+    report = {"environment": environment(), "args": vars(args), "results": [result]}
+
+    stages = ", ".join(f"{k}={v['mean_ms']:.2f}ms" for k, v in result["stages"].items() if v["calls"] > 1)
+    print(f"{result['n_frames']} frames at {result['frames_per_second']:.1f} frames/s ({stages})")
+    print(f"Conflicts: {result['conflicts']['true_positives']}/{result['conflicts']['expected']} injected detected, {result['conflicts']['false_positives']} false positives")
+
+    if result["motion_gate"] is not None:
+        gate = result["motion_gate"]
+        print(f"Motion gate: skipped {gate['static'] + gate['duplicate']}/{gate['frames']} frames ({100 * gate['skip_rate']:.1f}%, {gate['duplicate']} duplicates)")
+
+    if result["alerts"] is not None:
+        alerts = result["alerts"]
+        print(f"Alerts: {alerts['events']} events {alerts['by_type']}; conflict alerts cover {alerts['conflict_pairs']['true_positives']}/{alerts['conflict_pairs']['expected']} injected conflicts, {alerts['conflict_pairs']['false_positives']} other pairs; {result['stages']['alerts']['mean_ms']:.2f} ms/frame")
+
+    outputs = result["outputs"]
+    if args.clips:
+        print(f"Clips: {outputs['clips']} clips, {outputs['clip_frames']} frames, {outputs['clip_bytes'] / 2**20:.1f} MB in {outputs['clip_seconds']:.2f}s")
+    if outputs["annotated_video_bytes"] is not None:
+        print(f"Annotated video: {outputs['annotated_video_bytes'] / 2**20:.1f} MB, {result['stages']['write']['seconds'] + result['stages']['annotate']['seconds']:.2f}s annotate+write")
+
+    output = Path(args.output or RESULTS_DIR / f"pipeline_{datetime.now():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+'''
+Trajectory simplification benchmark.
+
+Simplifies every track of synthetic traffic (see `synthetic_traffic.py`) at several tolerances with
+`TrajAnalyzer.simplify()` and reports, per tolerance: compression ratio, stored bytes, the largest
+interpolation error, `TimeToCollision.analyze_all_conflicts()` time, and how far TTC and PET results
+moved compared with the unsimplified tracks. PET of simplified tracks is computed at frame rate
+(`analyze_cells(resample=1 / fps)`), the way `DetectionSystem.export_geo()` does.
+
+A tolerance passes when detection of the injected conflicts (recall) is unchanged, the minimum TTC of
+every injected conflict found in both runs moved by at most `--ttc-tol` seconds, and at least
+`--pet-min-overlap` of the PET cells are shared.
+
+With `--noise`, the unsimplified tracks' velocities come from noisy frame-to-frame differences while a
+simplified track's come from its (smoothed) segments, so TTC differences then mostly measure the noise.
+
+Usage
+-----
+    python benchmarks/bench_simplify.py --tracks 200 --tolerances 0.5,1,2,4
+'''
+import argparse
+import json
+import logging
+import sys
+import time
+
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from conflict_detection.trajectory import TrajManager, TrajAnalyzer
+from conflict_detection.safety import TimeToCollision, PostEncroachmentTime
+from bench_analysis import RESULTS_DIR, environment, identity_projector, score_conflicts
+from synthetic_traffic import SyntheticTraffic
+
+
+def build_analyzers(traffic:SyntheticTraffic):
+    manager = TrajManager(identity_projector(traffic.width, traffic.height), traffic.fps)
+    for _, tracks in traffic.frames():
+        manager.collect_tracks(tracks)
+    return list(manager.analyze_tracks().values())
+
+
+def stored_bytes(analyzers:list):
+    return sum(column.nbytes for traj in analyzers for column in traj.to_arrays().values())
+
+
+def run_conflicts(analyzers:list, args, resample:float=None):
+    ttc = TimeToCollision(args.ttc_thresh, args.min_dist)
+    start = time.perf_counter()
+    ttc.analyze_all_conflicts(analyzers)
+    seconds = time.perf_counter() - start
+
+    pet = PostEncroachmentTime(pet_thresh=args.pet_thresh)
+    cells = pet.analyze_cells(analyzers, args.cell_size, resample)
+    cells = {(x, y): value for x, y, value in zip(cells["cell_x"].tolist(), cells["cell_y"].tolist(), cells["pet"].tolist())}
+    return ttc, seconds, cells
+
+
+def compare(reference:tuple, simplified:tuple, ground_truth:set):
+    ref_ttc, _, ref_cells = reference
+    ttc, _, cells = simplified
+    ref_min = {tuple(sorted(pair)): r for pair, r in ref_ttc.get_all_minimum_ttc().items()}
+    got_min = {tuple(sorted(pair)): r for pair, r in ttc.get_all_minimum_ttc().items()}
+    common = set(ref_min) & set(got_min) & ground_truth
+    shared_cells = set(ref_cells) & set(cells)
+    return {
+        "ttc": score_conflicts(ttc, ground_truth),
+        "pairs_changed": len(set(ref_min) ^ set(got_min)),
+        "max_min_ttc_diff": max([abs(ref_min[p]["min_ttc"] - got_min[p]["min_ttc"]) for p in common] or [0.0]),
+        "max_time_of_min_diff": max([abs(ref_min[p]["time_of_min"] - got_min[p]["time_of_min"]) for p in common] or [0.0]),
+        "pet_cells": len(cells),
+        "pet_cell_overlap": len(shared_cells) / max(1, len(set(ref_cells) | set(cells))),
+        "max_pet_diff": max([abs(ref_cells[c] - cells[c]) for c in shared_cells] or [0.0])
+    }
+
+
+def run(args):
+    traffic = SyntheticTraffic(args.tracks, noise=args.noise, seed=args.seed)
+    analyzers = build_analyzers(traffic)
+    reference = run_conflicts(analyzers, args)
+    baseline = {
+        "points": sum(len(traj) for traj in analyzers),
+        "bytes": stored_bytes(analyzers),
+        "ttc_seconds": reference[1],
+        "ttc": score_conflicts(reference[0], traffic.ground_truth),
+        "pet_cells": len(reference[2])
+    }
+
+    results = []
+    for tolerance in [float(s) for s in args.tolerances.split(",")]:
+        simplified = [TrajAnalyzer.from_arrays(traj.to_arrays()) for traj in analyzers]
+        start = time.perf_counter()
+        stats = [traj.simplify(tolerance, args.max_gap, args.method) for traj in simplified]
+        simplify_seconds = time.perf_counter() - start
+
+        outputs = run_conflicts(simplified, args, resample=1 / traffic.fps)
+        result = {
+            "tolerance": tolerance,
+            "simplify_seconds": simplify_seconds,
+            "kept": sum(s["kept"] for s in stats),
+            "ratio": baseline["points"] / max(1, sum(s["kept"] for s in stats)),
+            "max_error": max(s["max_error"] for s in stats),
+            "bytes": stored_bytes(simplified),
+            "ttc_seconds": outputs[1],
+            **compare(reference, outputs, traffic.ground_truth)
+        }
+        result["passed"] = result["ttc"]["recall"] >= baseline["ttc"]["recall"] and result["max_min_ttc_diff"] <= args.ttc_tol and result["pet_cell_overlap"] >= args.pet_min_overlap
+        results.append(result)
+    return {"n_tracks": len(analyzers), "baseline": baseline, "tolerances": results}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.0, help="Center noise (pixels) of the synthetic tracks")
+    parser.add_argument("--tolerances", default="0.5,1,2,4", help="Comma separated simplification tolerances (pixels)")
+    parser.add_argument("--max-gap", type=float, default=None, help="Largest time between kept points (seconds)")
+    parser.add_argument("--method", default="sed", choices=("sed", "rdp"))
+    parser.add_argument("--ttc-thresh", type=float, default=1.5)
+    parser.add_argument("--min-dist", type=float, default=0.5)
+    parser.add_argument("--pet-thresh", type=float, default=1.5)
+    parser.add_argument("--cell-size", type=float, default=10.0)
+    parser.add_argument("--ttc-tol", type=float, default=0.1, help="Allowed change of an injected conflict's minimum TTC (seconds)")
+    parser.add_argument("--pet-min-overlap", type=float, default=0.9, help="Required share of PET cells found with and without simplification")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON output path")
+    parser.add_argument("--log-level", default="ERROR")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=args.log_level)
+
+    result = run(args)
+    report = {"environment": environment(), "args": vars(args), "results": [result]}
+    baseline = result["baseline"]
+    print(f"{result['n_tracks']} tracks, {baseline['points']} points, {baseline['bytes'] / 2**10:.0f} KiB, TTC {baseline['ttc_seconds']:.2f}s, recall {baseline['ttc']['recall']:.2f}, {baseline['pet_cells']} PET cells")
+    for r in result["tolerances"]:
+        print(f"tol {r['tolerance']:g}: {r['ratio']:.1f}x ({r['bytes'] / 2**10:.0f} KiB), max error {r['max_error']:.2f}, TTC {r['ttc_seconds']:.2f}s, "
+              f"recall {r['ttc']['recall']:.2f}, {r['pairs_changed']} pairs changed, min TTC diff {r['max_min_ttc_diff']:.3f}s, "
+              f"PET overlap {r['pet_cell_overlap']:.2f} (max diff {r['max_pet_diff']:.3f}s) {'ok' if r['passed'] else 'FAILED'}")
+
+    output = Path(args.output or RESULTS_DIR / f"simplify_{datetime.now():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+    if not all(r["passed"] for r in result["tolerances"]):
+        print("\nSimplification moved results beyond tolerance.")
+        sys.exit(1)
+    print("\nSimplified results within tolerance.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+'''
+Threshold sweep benchmark.
+
+Evaluates a grid of (`ttc_thresh`, `min_dist`) combinations on synthetic traffic (see
+`synthetic_traffic.py`) two ways: `ThresholdSweep` (one pass, then array comparisons per grid point)
+and the per-combination baseline of one `TimeToCollision.analyze_all_conflicts()` run per grid point.
+The baseline is run once per `min_dist` (`TimeToCollision` does not apply `ttc_thresh`, so the
+`ttc_thresh` axis is filtered from its conflict history) and its time is extrapolated to the grid.
+
+Correctness: for every `min_dist`, the sweep's per-pair minima at `ttc_thresh=inf` must equal
+`get_all_minimum_ttc()`, and every grid point's conflicting pairs must equal the filtered history.
+
+Usage
+-----
+    python benchmarks/bench_sweep.py --tracks 200 --ttc-threshs 0.5,1,1.5,2,2.5,3,3.5,4,4.5,5 --min-dists 0.5,2,5,10,20
+'''
+import argparse
+import json
+import logging
+import sys
+import time
+
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from conflict_detection.trajectory import TrajManager
+from conflict_detection.safety import TimeToCollision, ThresholdSweep
+from bench_analysis import RESULTS_DIR, environment, identity_projector
+from synthetic_traffic import SyntheticTraffic
+
+
+def build_analyzers(args):
+    traffic = SyntheticTraffic(args.tracks, seed=args.seed)
+    manager = TrajManager(identity_projector(traffic.width, traffic.height), traffic.fps)
+    for _, tracks in traffic.frames():
+        manager.collect_tracks(tracks)
+    return list(manager.analyze_tracks().values())
+
+
+def max_error(reference:dict, swept:dict):
+    '''Largest absolute difference over every field of every pair (inf if the pair sets differ)'''
+    if set(reference) != set(swept):
+        return float("inf")
+    errors = [0.0]
+    for pair, ref in reference.items():
+        got = swept[pair]
+        errors.append(max(abs(ref[key] - got[key]) for key in ("min_ttc", "time_of_min", "min_distance")))
+        errors.append(float(np.abs(np.subtract(ref["collision_point"], got["collision_point"])).max()))
+    return max(errors)
+
+
+def run(args):
+    ttc_threshs = np.array([float(s) for s in args.ttc_threshs.split(",")])
+    min_dists = np.array([float(s) for s in args.min_dists.split(",")])
+    analyzers = build_analyzers(args)
+
+    start = time.perf_counter()
+    sweep = ThresholdSweep(args.step).compute(analyzers)
+    compute_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    results = sweep.evaluate(ttc_threshs, min_dists)
+    evaluate_seconds = time.perf_counter() - start
+
+    baseline_seconds, errors, mismatches = [], [], 0
+    for d, min_dist in enumerate(min_dists):
+        ttc = TimeToCollision(float(ttc_threshs.max()), float(min_dist))
+        start = time.perf_counter()
+        ttc.analyze_all_conflicts(analyzers, step=args.step)
+        baseline_seconds.append(time.perf_counter() - start)
+
+        reference = ttc.get_all_minimum_ttc()
+        errors.append(max_error(reference, sweep.minimum_ttc(np.inf, min_dist)))
+        mismatches += int(sweep.evaluate([np.inf], [min_dist])["conflict_pairs"][0, 0] != len(reference))
+        history = ttc.get_all_conflicts()
+        for t, ttc_thresh in enumerate(ttc_threshs):
+            expected = {pair for pair, checks in history.items() if any(check["ttc"] <= ttc_thresh for check in checks.values())}
+            mismatches += int(len(expected) != results["conflict_pairs"][t, d] or expected != set(sweep.minimum_ttc(ttc_thresh, min_dist)))
+
+    per_run = float(np.mean(baseline_seconds))
+    grid_points = len(ttc_threshs) * len(min_dists)
+    return {
+        "n_tracks": len(analyzers),
+        "n_pairs": len(sweep.pairs),
+        "n_samples": len(sweep.time),
+        "grid_points": grid_points,
+        "seconds": {"compute": compute_seconds, "evaluate": evaluate_seconds, "baseline_per_run": per_run, "baseline_grid_estimate": per_run * grid_points},
+        "speedup": per_run * grid_points / (compute_seconds + evaluate_seconds),
+        "max_error": max(errors),
+        "mismatched_grid_points": mismatches,
+        "conflict_pairs": results["conflict_pairs"].tolist(),
+        "passed": max(errors) <= args.tolerance and mismatches == 0
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=200)
+    parser.add_argument("--ttc-threshs", default="0.5,1,1.5,2,2.5,3,3.5,4,4.5,5")
+    parser.add_argument("--min-dists", default="0.5,2,5,10,20")
+    parser.add_argument("--step", type=float, default=0.1)
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="Allowed difference from TimeToCollision")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON output path")
+    parser.add_argument("--log-level", default="ERROR")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=args.log_level)
+
+    result = run(args)
+    report = {"environment": environment(), "args": vars(args), "results": [result]}
+    seconds = result["seconds"]
+    print(f"{result['n_tracks']} tracks, {result['n_pairs']} pairs, {result['n_samples']} samples, {result['grid_points']} grid points")
+    print(f"Sweep: compute {seconds['compute']:.3f}s + evaluate {seconds['evaluate']:.3f}s")
+    print(f"Baseline: {seconds['baseline_per_run']:.3f}s per run, ~{seconds['baseline_grid_estimate']:.1f}s for the grid ({result['speedup']:.0f}x)")
+    print(f"Max difference from TimeToCollision: {result['max_error']:.3g}, mismatched grid points: {result['mismatched_grid_points']}")
+
+    output = Path(args.output or RESULTS_DIR / f"sweep_{datetime.now():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+    if not result["passed"]:
+        print("\nSweep results differ from TimeToCollision.")
+        sys.exit(1)
+    print("\nSweep matches TimeToCollision.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+'''
+Tracker backend benchmark.
+
+Feeds the same synthetic detections (see `synthetic_traffic.py`), degraded with box jitter, missed
+detections and low-confidence clutter, to every `ObjectTracker` backend and compares time per frame,
+ID switches, fragmented tracks and how many ground-truth boxes end up in a track.
+
+Usage
+-----
+    python benchmarks/bench_trackers.py --tracks 200 --jitter 2 --miss-rate 0.05
+'''
+import argparse
+import json
+import logging
+import sys
+import time
+
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from conflict_detection.objects import ObjectTracker
+from conflict_detection.objects.iou_tracker import box_iou
+from bench_analysis import RESULTS_DIR, environment
+from synthetic_traffic import SyntheticTraffic
+
+# backend name -> ObjectTracker kwargs
+BACKENDS = {
+    "bytetrack": {"backend": "bytetrack"},
+    "iou-greedy": {"backend": "iou", "matcher": "greedy"},
+    "iou-hungarian": {"backend": "iou", "matcher": "hungarian"},
+}
+
+
+def degrade(traffic:SyntheticTraffic, jitter:float, miss_rate:float, clutter:float, seed:int):
+    '''Per-frame detection lists plus the ground-truth id of each detection (None for clutter)'''
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _, tracks in traffic.frames():
+        detections, gt_ids = [], []
+        for track in tracks:
+            if rng.random() < miss_rate:
+                continue
+            bbox = np.asarray(track["bbox"], dtype=np.float64) + rng.normal(0, jitter, 4)
+            detections.append({"bbox": bbox.tolist(), "conf": float(rng.uniform(0.5, 0.95)), "class_id": track["class_id"], "class_name": track["class_name"]})
+            gt_ids.append(track["track_id"])
+        for _ in range(rng.poisson(clutter)):
+            x, y = rng.uniform(0, traffic.width - 30), rng.uniform(0, traffic.height - 20)
+            detections.append({"bbox": [x, y, x + 30, y + 20], "conf": float(rng.uniform(0.1, 0.3)), "class_id": 2, "class_name": "car"})
+            gt_ids.append(None)
+        frames.append((detections, gt_ids))
+    return frames
+
+
+def score(outputs:list, frames:list):
+    '''ID switches / fragmentation per ground-truth track; outputs are matched to detections by IoU'''
+    assigned = {}
+    covered, total = 0, 0
+    for tracks, (detections, gt_ids) in zip(outputs, frames):
+        total += sum(gt is not None for gt in gt_ids)
+        if not tracks or not detections:
+            continue
+        iou = box_iou(np.array([t["bbox"] for t in tracks]), np.array([d["bbox"] for d in detections]))
+        best = iou.argmax(axis=1)
+        for t, track in enumerate(tracks):
+            gt = gt_ids[best[t]]
+            if gt is None or iou[t, best[t]] < 0.5 or track["track_id"] is None:
+                continue
+            covered += 1
+            assigned.setdefault(gt, []).append(track["track_id"])
+
+    switches = sum(int(np.count_nonzero(np.diff(ids))) for ids in assigned.values())
+    fragmented = sum(len(set(ids)) > 1 for ids in assigned.values())
+    return {"id_switches": switches, "fragmented_tracks": fragmented, "tracked_gt": len(assigned), "coverage": covered / total if total else None}
+
+
+def run(args):
+    traffic = SyntheticTraffic(args.tracks, fps=args.fps, tile_size=args.tile_size, grid=(args.cols, args.rows), seed=args.seed)
+    frames = degrade(traffic, args.jitter, args.miss_rate, args.clutter, args.seed)
+
+    results = {}
+    for name in args.backends.split(","):
+        tracker = ObjectTracker(fps=args.fps, **BACKENDS[name])
+        outputs = []
+        start = time.perf_counter()
+        for detections, _ in frames:
+            outputs.append(tracker.track(detections))
+        seconds = time.perf_counter() - start
+
+        results[name] = {
+            "seconds": seconds,
+            "ms_per_frame": 1000 * seconds / len(frames),
+            "track_ids": len({t["track_id"] for tracks in outputs for t in tracks}),
+            **score(outputs, frames)
+        }
+    return {"n_tracks": len(traffic.tracks), "n_frames": len(frames), "detections": sum(len(d) for d, _ in frames), "backends": results}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=200)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--tile-size", type=int, default=160)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--jitter", type=float, default=2.0, help="Std. dev. (pixels) of noise added to every box coordinate")
+    parser.add_argument("--miss-rate", type=float, default=0.05, help="Probability that a ground-truth box is not detected in a frame")
+    parser.add_argument("--clutter", type=float, default=1.0, help="Mean number of low-confidence false detections per frame")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON output path")
+    parser.add_argument("--log-level", default="ERROR")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=args.log_level)
+
+    result = run(args)
+    report = {"environment": environment(), "args": vars(args), "results": [result]}
+
+    print(f"{result['n_frames']} frames, {result['n_tracks']} ground-truth tracks, {result['detections']} detections")
+    print(f"{'backend':<15} {'ms/frame':>9} {'id switches':>12} {'fragmented':>11} {'coverage':>9} {'track ids':>10}")
+    for name, r in result["backends"].items():
+        print(f"{name:<15} {r['ms_per_frame']:9.3f} {r['id_switches']:12d} {r['fragmented_tracks']:11d} {r['coverage']:9.3f} {r['track_ids']:10d}")
+
+    output = Path(args.output or RESULTS_DIR / f"trackers_{datetime.now():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+'''
+Import-time budget check.
+
+Imports each subpackage in a fresh interpreter and fails (exit code 1) if it loads a heavy dependency
+it shouldn't, or if the median import time of the analysis path (trajectory / safety / homography)
+exceeds the budget. Detector / tracker dependencies (torch, ultralytics, supervision) must only load
+when an `ObjectDetector` model or a ByteTrack `ObjectTracker` is constructed; the "iou" tracker
+backend must not load them at all.
+
+Usage
+-----
+    python benchmarks/check_imports.py --budget 0.5 --runs 5
+'''
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY = ("torch", "ultralytics", "supervision")
+DATAFRAME = ("pandas", "pyarrow")
+
+# module -> dependencies that must not be loaded by importing it
+FORBIDDEN = {
+    "conflict_detection.trajectory": HEAVY + DATAFRAME,
+    "conflict_detection.safety": HEAVY + DATAFRAME,
+    "conflict_detection.homography": HEAVY + DATAFRAME,
+    "conflict_detection.studio": HEAVY + DATAFRAME,
+    "conflict_detection.objects": HEAVY + DATAFRAME,
+    "conflict_detection.detect": HEAVY + DATAFRAME,
+    "conflict_detection.archive": HEAVY,
+    "conflict_detection.alerts": HEAVY + DATAFRAME,
+}
+
+# setup statements -> dependencies that must not be loaded by running them
+CONSTRUCTED = {
+    'from conflict_detection.objects import ObjectTracker; ObjectTracker(backend="iou")': HEAVY + DATAFRAME,
+}
+
+# modules whose import time is held to the budget
+TIMED = ("conflict_detection.trajectory", "conflict_detection.safety", "conflict_detection.homography")
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {deps!r} if m in sys.modules]}}))
+'''
+
+
+def probe(module:str, deps:tuple, statement:str=None):
+    '''Imports `module` (or runs `statement`) in a fresh interpreter; returns seconds and which of `deps` got loaded'''
+    statement = statement if statement is not None else f"import {module}"
+    out = subprocess.run([sys.executable, "-c", PROBE.format(statement=statement, deps=deps)], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def check(budget:float, runs:int):
+    failures = []
+    results = {}
+    for module, forbidden in FORBIDDEN.items():
+        samples = [probe(module, forbidden) for _ in range(runs if module in TIMED else 1)]
+        median = statistics.median(s["seconds"] for s in samples)
+        loaded = samples[0]["loaded"]
+        results[module] = {"median_seconds": median, "loaded": loaded}
+
+        if loaded:
+            failures.append(f"{module} loads {', '.join(loaded)}")
+        if module in TIMED and median > budget:
+            failures.append(f"{module} imports in {median:.3f}s (budget {budget:.3f}s)")
+
+        print(f"{module:<32} {median:7.3f}s  {'loads ' + ', '.join(loaded) if loaded else 'ok'}")
+
+    for statement, forbidden in CONSTRUCTED.items():
+        sample = probe(None, forbidden, statement)
+        results[statement] = {"seconds": sample["seconds"], "loaded": sample["loaded"]}
+        if sample["loaded"]:
+            failures.append(f"`{statement}` loads {', '.join(sample['loaded'])}")
+        print(f"{statement}\n{'':<32} {sample['seconds']:7.3f}s  {'loads ' + ', '.join(sample['loaded']) if sample['loaded'] else 'ok'}")
+    return results, failures
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=0.5, help="Seconds allowed for each timed import (median)")
+    parser.add_argument("--runs", type=int, default=5)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    _, failures = check(args.budget, args.runs)
+    if failures:
+        print("\nImport budget exceeded:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nImport budget ok.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+'''
+Long-run memory soak test.
+
+Streams synthetic detections (see `synthetic_traffic.py`) for a simulated multi-hour recording through
+the per-frame pipeline: tracker -> `TrajManager` (finalizing lost tracks, spilled to disk) ->
+`OnlineConflictMonitor`. A `MemoryProfiler` snapshots the heap periodically after a warm-up; the run
+fails (exit code 1) if the traced heap grows by more than `--max-growth-mb` between the first
+snapshot after warm-up and the end, and prints the components and source lines that grew.
+
+Traffic is generated in independent chunks, so the generator itself holds only one chunk at a time.
+RSS is reported but not bounded: with tracing on, it includes tracemalloc's own bookkeeping.
+
+Usage
+-----
+    python benchmarks/soak_pipeline.py --hours 2 --fps 5 --max-growth-mb 16
+'''
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from conflict_detection.objects import ObjectTracker
+from conflict_detection.trajectory import TrajManager
+from conflict_detection.safety import OnlineConflictMonitor
+from conflict_detection.utils import MemoryProfiler
+from bench_analysis import RESULTS_DIR, environment, identity_projector
+from synthetic_traffic import SyntheticTraffic
+
+
+def stream_detections(n_frames:int, tracks_per_chunk:int, fps:int, tile_size:int, grid:tuple, seed:int):
+    '''Yields one detection list per frame, chaining freshly generated traffic chunks'''
+    emitted, chunk = 0, 0
+    while emitted < n_frames:
+        traffic = SyntheticTraffic(tracks_per_chunk, fps=fps, tile_size=tile_size, grid=grid, seed=seed + chunk)
+        for _, tracks in traffic.frames():
+            yield [{key: track[key] for key in ("bbox", "conf", "class_id", "class_name")} for track in tracks]
+            emitted += 1
+            if emitted >= n_frames:
+                return
+        chunk += 1
+
+
+def run(args, spill_dir:str):
+    n_frames = int(args.hours * 3600 * args.fps)
+    grid = (args.cols, args.rows)
+    tracker = ObjectTracker(fps=args.fps, backend=args.tracker)
+    manager = TrajManager(identity_projector(grid[0] * args.tile_size, grid[1] * args.tile_size), args.fps, lost_buffer=tracker.max_frames_lost, spill_dir=None if args.no_spill else spill_dir)
+    monitor = OnlineConflictMonitor()
+    profiler = MemoryProfiler(every=max(1, n_frames // args.snapshots))
+
+    warmup = int(n_frames * args.warmup)
+    events = 0
+    start = time.perf_counter()
+    for frame_idx, detections in enumerate(stream_detections(n_frames, args.tracks_per_chunk, args.fps, args.tile_size, grid, args.seed), start=1):
+        tracks = tracker.track(detections)
+        manager.collect_tracks(tracks)
+        events += len(monitor.update(manager.collector))
+
+        if frame_idx == warmup:
+            profiler.start()
+        elif frame_idx > warmup:
+            profiler.step(frame_idx)
+        if frame_idx % max(1, n_frames // 10) == 0:
+            logging.getLogger(__name__).warning(f"{frame_idx}/{n_frames} frames ({frame_idx / args.fps / 3600:.2f} h simulated)")
+    seconds = time.perf_counter() - start
+
+    profiler.snapshot(n_frames)
+    profiler.stop()
+    growth = profiler.growth()
+    return {
+        "n_frames": n_frames,
+        "simulated_hours": args.hours,
+        "seconds": seconds,
+        "frames_per_second": n_frames / seconds,
+        "tracks_finalized": len(manager.analyzers) + len(manager.spilled),
+        "live_tracks": len(manager.collector.trajectories),
+        "events": events,
+        "growth": growth,
+        "top_growth": profiler.top_growth(args.top),
+        "snapshots": profiler.history,
+        "passed": growth is not None and growth["traced"] <= args.max_growth_mb * 2**20
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=2.0, help="Simulated recording length")
+    parser.add_argument("--fps", type=int, default=5)
+    parser.add_argument("--tracks-per-chunk", type=int, default=40)
+    parser.add_argument("--tile-size", type=int, default=160)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--tracker", default="iou", choices=("bytetrack", "iou"))
+    parser.add_argument("--no-spill", action="store_true", help="Keep finalized tracks in memory (they then count as growth)")
+    parser.add_argument("--warmup", type=float, default=0.1, help="Fraction of the run before the first snapshot")
+    parser.add_argument("--snapshots", type=int, default=20)
+    parser.add_argument("--max-growth-mb", type=float, default=16.0, help="Allowed traced-heap growth after warm-up")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON output path")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=args.log_level)
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        result = run(args, spill_dir)
+    report = {"environment": environment(), "args": vars(args), "results": [result]}
+
+    growth = result["growth"]
+    rss = f", RSS {growth['rss'] / 2**20:+.1f} MB" if growth["rss"] is not None else ""
+    print(f"{result['n_frames']} frames ({args.hours:g} h at {args.fps} fps) in {result['seconds']:.1f}s, {result['tracks_finalized']} tracks finalized, {result['events']} events")
+    print(f"Growth after warm-up: traced {growth['traced'] / 2**20:+.2f} MB{rss} (bound {args.max_growth_mb:g} MB)")
+    for name, size in sorted(growth["components"].items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<12} {size / 2**20:+8.2f} MB")
+    print("Top growth sites:")
+    for stat in result["top_growth"]:
+        print(f"  {stat['size_diff'] / 2**20:+8.2f} MB {stat['count_diff']:+8d} blocks  {stat['location']} [{stat['component']}]")
+
+    output = Path(args.output or RESULTS_DIR / f"soak_{datetime.now():%Y%m%d_%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+    if not result["passed"]:
+        print(f"\nMemory grew by more than {args.max_growth_mb:g} MB.")
+        sys.exit(1)
+    print("\nMemory bound ok.")
+
+
+if __name__ == "__main__":
+    main()
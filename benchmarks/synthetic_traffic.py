@@ -0,0 +1,297 @@
+'''
+Synthetic Traffic Generator
+
+Produces straight, turning, crossing and stationary trajectories with known ground-truth
+conflicts so the trajectory / safety modules can be benchmarked without video or a model.
+
+Tracks are laid out on a grid of tiles. Every tile hosts one group of tracks at a time
+(a single straight / turning / stationary track or a crossing pair), so the only tracks that
+actually meet are the crossing pairs, which reach a shared collision point on the same frame;
+these are the ground-truth conflicts. Tracks of different groups never meet, but TTC extrapolates
+current velocities, so it can still predict incidental conflicts between them (typically a turning
+track whose tangent sweeps across another track's path). `incidental_conflicts()` finds those pairs
+from the generated positions, so benchmarks can count them as expected rather than as false positives.
+'''
+import numpy as np
+
+from typing import Dict, List, Tuple
+
+# COCO class ids used by the YOLO models
+CLASS_IDS = {"car": 2, "motorcycle": 3, "bus": 5, "truck": 7}
+CLASS_SIZES = {"car": (40, 24), "motorcycle": (20, 12), "bus": (70, 30), "truck": (60, 28)}
+DEFAULT_MIX = {"straight": 0.3, "turning": 0.2, "crossing": 0.4, "stationary": 0.1}
+
+
+class SyntheticTraffic:
+
+    def __init__(self, n_tracks:int, fps:int=30, tile_size:int=400, grid:Tuple[int, int]=(4, 4), track_frames:int=90, gap_frames:int=15, mix:dict=None, noise:float=0.0, parked:int=0, parked_jitter:float=1.0, seed:int=0):
+        """
+        Parameters
+        ----------
+        n_tracks : int
+            Number of tracks to generate
+        fps : int
+            Frame rate used to convert frame indices to timestamps
+        tile_size : int
+            Width / height (pixels) of a single tile
+        grid : tuple of int
+            Number of tiles (columns, rows); frame size is `grid * tile_size`
+        track_frames : int
+            Lifetime of every track in frames
+        gap_frames : int
+            Idle frames between two consecutive groups in the same tile
+        mix : dict
+            Fraction of tracks per kind ("straight", "turning", "crossing", "stationary")
+        noise : float
+            Standard deviation (pixels) of gaussian noise added to track centers
+        parked : int
+            Extra stationary objects present for the whole recording (e.g. parked cars), placed near tile
+            corners; they overlap in time with every other track but take part in no conflict
+        parked_jitter : float
+            Standard deviation (pixels) of the detector jitter on parked objects
+        seed : int
+            Random seed
+        """
+        self.n_tracks = n_tracks
+        self.fps = fps
+        self.tile_size = tile_size
+        self.grid = grid
+        self.track_frames = track_frames
+        self.gap_frames = gap_frames
+        self.mix = mix if mix is not None else DEFAULT_MIX
+        self.noise = noise
+        self.parked = parked
+        self.parked_jitter = parked_jitter
+        self.rng = np.random.default_rng(seed)
+
+        self.width = grid[0] * tile_size
+        self.height = grid[1] * tile_size
+        self.tracks = {}
+        self.ground_truth = set()
+        self.n_frames = 0
+
+        self._generate()
+
+    def frames(self):
+        '''Yields the per-frame track list (ObjectTracker.track() format) for every frame, starting at frame 1'''
+        by_frame = self._index_by_frame()
+        for frame_idx in range(1, self.n_frames + 1):
+            yield frame_idx, by_frame.get(frame_idx, [])
+
+    def trajectories(self):
+        '''Returns dict of track_id -> list of position dicts (TrajCollector format)'''
+        trajectories = {}
+        for tid, track in self.tracks.items():
+            bboxes = self._bboxes(track)
+            trajectories[tid] = [{
+                "bbox": bboxes[i].tolist(),
+                "timestamp": (track["start_frame"] + i) / self.fps,
+                "frame_idx": track["start_frame"] + i,
+                "class_name": track["class_name"],
+                "conf": 0.9
+            } for i in range(len(bboxes))]
+        return trajectories
+
+    def counts(self):
+        '''Returns the number of generated tracks per kind'''
+        counts = {kind: 0 for kind in DEFAULT_MIX}
+        for track in self.tracks.values():
+            counts[track["kind"]] += 1
+        return counts
+
+    def incidental_conflicts(self, min_dist:float=0.5, step:float=0.1, tolerance:float=0.05):
+        '''
+        Pairs outside `ground_truth` for which TTC is expected to predict a conflict
+
+        Applies the TTC definition to the generated centers: at every sample of the pair's time overlap
+        (`step` apart, rounded to 0.01s), both tracks are extrapolated at their current finite-difference
+        velocity and the pair conflicts if their closest future approach is below `min_dist`. Pairs whose
+        smallest predicted distance is within `tolerance` of `min_dist` depend on rounding of the tracked
+        boxes, so they are returned separately as ambiguous.
+
+        :return: (incidental, ambiguous) sets of sorted track id pairs
+        '''
+        ids = np.array(sorted(self.tracks))
+        times = {tid: (self.tracks[tid]["start_frame"] + np.arange(len(self.tracks[tid]["centers"]))) / self.fps for tid in ids}
+        first = np.array([times[tid][0] for tid in ids])
+        last = np.array([times[tid][-1] for tid in ids])
+
+        incidental, ambiguous = set(), set()
+        for i, tid_A in enumerate(ids[:-1]):
+            overlapping = np.flatnonzero((first[i + 1:] <= last[i]) & (last[i + 1:] >= first[i])) + i + 1
+            for j in overlapping:
+                pair = (int(tid_A), int(ids[j]))
+                if pair in self.ground_truth:
+                    continue
+                start, end = max(first[i], first[j]), min(last[i], last[j])
+                samples = np.round(np.linspace(start, end, int((end - start) / step) + 1), 2)
+                distance = self._predicted_distance(times[pair[0]], self.tracks[pair[0]]["centers"], times[pair[1]], self.tracks[pair[1]]["centers"], samples)
+                if abs(distance - min_dist) < tolerance:
+                    ambiguous.add(pair)
+                elif distance < min_dist:
+                    incidental.add(pair)
+        return incidental, ambiguous
+
+    @staticmethod
+    def _predicted_distance(times_A:np.ndarray, centers_A:np.ndarray, times_B:np.ndarray, centers_B:np.ndarray, samples:np.ndarray):
+        '''Smallest predicted closest-approach distance over `samples` (inf when no sample predicts an approach)'''
+        states = []
+        for times, centers in ((times_A, centers_A), (times_B, centers_B)):
+            seg = np.clip(np.searchsorted(times, samples), 1, len(times) - 1)
+            delta = (times[seg] - times[seg - 1])[:, None]
+            velocity = (centers[seg] - centers[seg - 1]) / delta
+            position = centers[seg - 1] + velocity * (samples[:, None] - times[seg - 1][:, None])
+            valid = (samples >= times[0]) & (samples <= times[-1])
+            states.append((position, velocity, valid))
+
+        (pos_A, vel_A, valid_A), (pos_B, vel_B, valid_B) = states
+        rel_pos, rel_vel = pos_B - pos_A, vel_B - vel_A
+        rel_vel_sqrd = (rel_vel ** 2).sum(axis=1)
+        dot_product = (rel_pos * rel_vel).sum(axis=1)
+        moving = (vel_A != 0).any(axis=1) | (vel_B != 0).any(axis=1)
+        # Same rejections as `TimeToCollision.calculate_instant_ttc()`: both still, parallel, moving apart
+        approaching = valid_A & valid_B & moving & (rel_vel_sqrd > 0) & (dot_product <= 0)
+        if not approaching.any():
+            return np.inf
+
+        t = -dot_product[approaching] / rel_vel_sqrd[approaching]
+        closest = rel_pos[approaching] + rel_vel[approaching] * t[:, None]
+        return float(np.sqrt((closest ** 2).sum(axis=1)).min())
+
+    def _generate(self):
+        groups = self._plan_groups()
+        self.rng.shuffle(groups)
+
+        n_tiles = self.grid[0] * self.grid[1]
+        slot_frames = self.track_frames + self.gap_frames
+        next_id = 1
+
+        for g, kind in enumerate(groups):
+            tile = g % n_tiles
+            slot = g // n_tiles
+            origin = np.array([(tile % self.grid[0]) * self.tile_size, (tile // self.grid[0]) * self.tile_size], dtype=np.float64)
+            start_frame = 1 + slot * slot_frames
+
+            if kind == "crossing":
+                centers_A, centers_B, speed_A, speed_B = self._crossing(origin)
+                for centers, speed in [(centers_A, speed_A), (centers_B, speed_B)]:
+                    self._add_track(next_id, kind, start_frame, centers, speed)
+                    next_id += 1
+                self.ground_truth.add((next_id - 2, next_id - 1))
+            else:
+                centers, speed = getattr(self, f"_{kind}")(origin)
+                self._add_track(next_id, kind, start_frame, centers, speed)
+                next_id += 1
+
+        self.n_frames = (len(groups) - 1) // n_tiles * slot_frames + self.track_frames if groups else 0
+
+        for p in range(self.parked):
+            tile = p % n_tiles
+            corner = np.array([(tile % self.grid[0]) * self.tile_size, (tile // self.grid[0]) * self.tile_size], dtype=np.float64) + 0.05 * self.tile_size
+            centers = corner + self.rng.normal(0, self.parked_jitter, (self.n_frames, 2))
+            self._add_track(next_id, "stationary", 1, centers, 0.0)
+            next_id += 1
+
+    def _plan_groups(self):
+        n_pairs = int(self.n_tracks * self.mix.get("crossing", 0.0) / 2)
+        remaining = self.n_tracks - 2 * n_pairs
+
+        singles = [k for k in ("straight", "turning", "stationary") if self.mix.get(k, 0.0) > 0]
+        total = sum(self.mix[k] for k in singles)
+        groups = ["crossing"] * n_pairs
+
+        for i, kind in enumerate(singles):
+            n = remaining - sum(groups.count(k) for k in singles) if i == len(singles) - 1 else int(round(remaining * self.mix[kind] / total))
+            groups.extend([kind] * n)
+        return groups
+
+    def _add_track(self, tid:int, kind:str, start_frame:int, centers:np.ndarray, speed:float):
+        class_name = "car" if kind == "stationary" else self.rng.choice(list(CLASS_IDS))
+        if self.noise > 0:
+            centers = centers + self.rng.normal(0, self.noise, centers.shape)
+        self.tracks[tid] = {
+            "kind": kind,
+            "class_name": str(class_name),
+            "class_id": CLASS_IDS[class_name],
+            "size": CLASS_SIZES[class_name],
+            "start_frame": start_frame,
+            "centers": centers,
+            "speed": speed
+        }
+
+    def _times(self):
+        return np.arange(self.track_frames, dtype=np.float64) / self.fps
+
+    def _straight(self, origin:np.ndarray):
+        '''Constant velocity track crossing the tile'''
+        S = self.tile_size
+        angle = self.rng.uniform(0, 2 * np.pi)
+        direction = np.array([np.cos(angle), np.sin(angle)])
+        center = origin + S / 2 + self.rng.uniform(-0.1, 0.1, 2) * S
+        half = 0.4 * S
+
+        t = self._times()
+        speed = 2 * half / t[-1]
+        centers = center - direction * half + np.outer(t, direction * speed)
+        return centers, speed
+
+    def _turning(self, origin:np.ndarray):
+        '''Quarter-circle arc at constant angular speed'''
+        S = self.tile_size
+        radius = self.rng.uniform(0.25, 0.4) * S
+        corner = self.rng.integers(0, 4)
+        pivot = origin + S * np.array([[0.1, 0.1], [0.9, 0.1], [0.9, 0.9], [0.1, 0.9]][corner])
+        theta_0 = corner * np.pi / 2
+        sign = self.rng.choice([-1, 1])
+        if sign < 0:
+            theta_0 += np.pi / 2
+
+        t = self._times()
+        omega = sign * (np.pi / 2) / t[-1]
+        theta = theta_0 + omega * t
+        centers = pivot + radius * np.column_stack([np.cos(theta), np.sin(theta)])
+        return centers, abs(omega) * radius
+
+    def _stationary(self, origin:np.ndarray):
+        '''Object that never moves'''
+        center = origin + self.tile_size / 2 + self.rng.uniform(-0.2, 0.2, 2) * self.tile_size
+        return np.tile(center, (self.track_frames, 1)), 0.0
+
+    def _crossing(self, origin:np.ndarray):
+        '''Two constant velocity tracks that occupy the same point on the same frame'''
+        S = self.tile_size
+        collision = origin + S / 2 + self.rng.uniform(-0.05, 0.05, 2) * S
+        collision_frame = int(self.rng.uniform(0.5, 0.7) * self.track_frames)
+
+        t = self._times() - collision_frame / self.fps
+        max_speed = 0.4 * S / max(abs(t[0]), abs(t[-1]))
+
+        angle_A = self.rng.uniform(0, 2 * np.pi)
+        angle_B = angle_A + self.rng.choice([-1, 1]) * self.rng.uniform(np.pi / 3, 2 * np.pi / 3)
+
+        tracks = []
+        for angle in (angle_A, angle_B):
+            speed = self.rng.uniform(0.5, 1.0) * max_speed
+            velocity = speed * np.array([np.cos(angle), np.sin(angle)])
+            tracks.append((collision + np.outer(t, velocity), speed))
+
+        (centers_A, speed_A), (centers_B, speed_B) = tracks
+        return centers_A, centers_B, speed_A, speed_B
+
+    def _bboxes(self, track:dict):
+        w, h = track["size"]
+        centers = track["centers"]
+        return np.column_stack([centers[:, 0] - w / 2, centers[:, 1] - h / 2, centers[:, 0] + w / 2, centers[:, 1] + h / 2])
+
+    def _index_by_frame(self):
+        by_frame: Dict[int, List[dict]] = {}
+        for tid, track in self.tracks.items():
+            for i, bbox in enumerate(self._bboxes(track)):
+                by_frame.setdefault(track["start_frame"] + i, []).append({
+                    "bbox": bbox.tolist(),
+                    "conf": 0.9,
+                    "class_id": track["class_id"],
+                    "class_name": track["class_name"],
+                    "track_id": tid
+                })
+        return by_frame
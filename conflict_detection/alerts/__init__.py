@@ -0,0 +1,2 @@
+from .sinks import AlertSink, CallbackSink, QueueSink, JsonlSink, SocketSink
+from .dispatcher import AlertDispatcher
\ No newline at end of file
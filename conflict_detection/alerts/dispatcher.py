@@ -0,0 +1,46 @@
+from typing import List
+
+from .sinks import AlertSink
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+class AlertDispatcher:
+    '''
+    Description
+    -----------
+    Fans conflict events out to any number of `AlertSink`s. Each sink delivers on its own thread, so
+    one slow consumer delays neither the others nor the caller.
+
+    Parameters
+    ----------
+    sinks : list of AlertSink
+    '''
+    def __init__(self, sinks:List[AlertSink]):
+        self.sinks = list(sinks)
+        self.events = 0
+
+    def publish(self, events:List[dict]):
+        for event in events:
+            self.events += 1
+            for sink in self.sinks:
+                sink.publish(event)
+
+    def flush(self, timeout:float=5.0):
+        '''Waits for every sink to deliver what is queued and logs the counts; sinks stay open for the next run'''
+        for sink in self.sinks:
+            sink.flush(timeout)
+        logger.info(f"Published {self.events} conflict events to {len(self.sinks)} sinks.")
+        for name, counts in self.summary().items():
+            if counts["dropped"] or counts["failed"]:
+                logger.warning(f"{name}: {counts['dropped']} events dropped (queue full), {counts['failed']} failed.")
+
+    def close(self, timeout:float=5.0):
+        '''Delivers what is still queued, then releases every sink (files, sockets); publishing afterwards fails'''
+        for sink in self.sinks:
+            sink.close(timeout)
+        logger.debug(f"Closed {len(self.sinks)} alert sinks.")
+
+    def summary(self):
+        '''sink name -> published / delivered / dropped / failed counts'''
+        return {f"{i}:{type(sink).__name__}": dict(sink.counts) for i, sink in enumerate(self.sinks)}
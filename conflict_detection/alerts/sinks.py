@@ -0,0 +1,147 @@
+import json
+import queue
+import time
+import socket
+import threading
+
+from pathlib import Path
+from typing import Callable, Union
+
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+class AlertSink:
+    '''
+    Description
+    -----------
+    Base class for conflict event sinks. `publish()` never blocks: events go into a bounded queue that
+    a background thread drains through `deliver()`, so a slow or broken consumer only fills its own
+    queue (further events are dropped and counted) and never stalls the frame loop. Subclasses
+    implement `deliver(event)` and optionally `_close()`.
+
+    Parameters
+    ----------
+    max_queue : int, default = 1024
+    '''
+    def __init__(self, max_queue:int=1024):
+        self.counts = {"published": 0, "delivered": 0, "dropped": 0, "failed": 0}
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+
+    def publish(self, event:dict):
+        '''Queues `event` for delivery; returns False if the queue was full and the event was dropped'''
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"alerts-{type(self).__name__}", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.counts["dropped"] += 1
+            return False
+        self.counts["published"] += 1
+        return True
+
+    def deliver(self, event:dict):
+        raise NotImplementedError
+
+    def flush(self, timeout:float=5.0):
+        '''Waits up to `timeout` seconds for queued events to be delivered; the sink stays open. Returns False on timeout.'''
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"{type(self).__name__} did not drain its queue within {timeout:.1f}s; {self._queue.qsize()} events pending.")
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout:float=5.0):
+        '''Delivers what is still queued (waiting up to `timeout` seconds), then releases the sink'''
+        if self._thread is not None:
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+                self._thread.join(timeout)
+            except queue.Full:
+                pass
+            if self._thread.is_alive():
+                logger.warning(f"{type(self).__name__} did not drain its queue within {timeout:.1f}s; {self._queue.qsize()} events undelivered.")
+            self._thread = None
+        self._close()
+
+    def _close(self):
+        pass
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                self._queue.task_done()
+                return
+            try:
+                self.deliver(event)
+            except Exception as e:
+                self.counts["failed"] += 1
+                log = logger.warning if self.counts["failed"] == 1 else logger.debug
+                log(f"{type(self).__name__} failed to deliver an event: {type(e).__name__}: {e}")
+            else:
+                self.counts["delivered"] += 1
+            finally:
+                self._queue.task_done()
+
+
+class CallbackSink(AlertSink):
+    '''Calls `callback(event)` for every event (on the sink's thread, not the frame loop's)'''
+    def __init__(self, callback:Callable[[dict], None], max_queue:int=1024):
+        super().__init__(max_queue)
+        self.callback = callback
+
+    def deliver(self, event:dict):
+        self.callback(event)
+
+
+class QueueSink(AlertSink):
+    '''Puts every event on `events` (a new unbounded `queue.Queue` by default) for an in-process consumer'''
+    def __init__(self, events:queue.Queue=None, max_queue:int=1024):
+        super().__init__(max_queue)
+        self.events = events if events is not None else queue.Queue()
+
+    def deliver(self, event:dict):
+        self.events.put(event)
+
+
+class JsonlSink(AlertSink):
+    '''Appends every event as one JSON line to `path`; each line is flushed as it is written'''
+    def __init__(self, path:str, max_queue:int=1024):
+        super().__init__(max_queue)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", buffering=1)
+
+    def deliver(self, event:dict):
+        self._file.write(json.dumps(event, default=str) + "\n")
+
+    def _close(self):
+        self._file.close()
+
+
+class SocketSink(AlertSink):
+    '''
+    Sends every event as one JSON datagram: over UDP when `address` is a (host, port) tuple, over a
+    Unix datagram socket when it is a path. Delivery is fire-and-forget; a missing listener counts as
+    a failed event.
+    '''
+    def __init__(self, address:Union[tuple, str], max_queue:int=1024):
+        super().__init__(max_queue)
+        self.address = tuple(address) if isinstance(address, (tuple, list)) else str(address)
+        family = socket.AF_INET if isinstance(self.address, tuple) else socket.AF_UNIX
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+
+    def deliver(self, event:dict):
+        self._socket.sendto(json.dumps(event, default=str).encode(), self.address)
+
+    def _close(self):
+        self._socket.close()
@@ -0,0 +1,5 @@
+from .archive_writer import ArchiveWriter
+from .archive_reader import ArchiveReader
+from .geo_writer import GeoWriter
+from .heatmap_accumulator import HeatmapAccumulator
+from .run_index import RunIndex
\ No newline at end of file
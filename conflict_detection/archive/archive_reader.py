@@ -0,0 +1,101 @@
+import json
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+
+from .archive_writer import TRACKS_FILE, SUMMARIES_FILE, CONFLICTS_FILE, MANIFEST_FILE
+from conflict_detection.trajectory import TrajManager
+from conflict_detection.homography import WorldProjector
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+class ArchiveReader:
+    '''
+    Description
+    -----------
+    Reads an archive written by `ArchiveWriter` and rebuilds `TrajManager` analyzers from it.
+
+    Parameters
+    ----------
+    archive_dir : str
+        Directory containing the archive's Parquet files.
+    '''
+    def __init__(self, archive_dir:str):
+        self.archive_dir = Path(archive_dir)
+        if not self.archive_dir.is_dir():
+            raise FileNotFoundError(f"Archive directory {self.archive_dir} does not exist.")
+
+        logger.debug(f"Initialized archive reader at {self.archive_dir}.")
+
+    def read_manifest(self):
+        path = self.archive_dir / MANIFEST_FILE
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def read_tracks(self, track_ids:list=None):
+        filters = [("track_id", "in", list(track_ids))] if track_ids is not None else None
+        return self._read(TRACKS_FILE, filters=filters)
+
+    def read_summaries(self):
+        return self._read(SUMMARIES_FILE)
+
+    def read_conflicts(self):
+        return self._read(CONFLICTS_FILE)
+
+    def load_trajectories(self, track_ids:list=None):
+        '''Returns dict of track_id -> list of position dicts (TrajCollector format)'''
+        df = self.read_tracks(track_ids).sort_values(["track_id", "frame_idx"], kind="stable")
+        return self.frame_to_tracks(df)
+
+    def load_manager(self, projector:WorldProjector=None, fps:int=None, track_ids:list=None):
+        '''
+        Rebuilds a `TrajManager` whose collector holds the archived positions and whose analyzers
+        are built from them; `fps` defaults to the value recorded in the manifest.
+        '''
+        manifest = self.read_manifest()
+        fps = fps if fps is not None else manifest.get("fps", 30)
+
+        manager = TrajManager(projector, fps, use_wall_time=False)
+        manager.collector.trajectories = self.load_trajectories(track_ids)
+
+        if manager.collector.trajectories:
+            manager.collector.frame_count = max(pos[-1]["frame_idx"] for pos in manager.collector.trajectories.values())
+            manager.analyze_tracks()
+
+        logger.info(f"Loaded {len(manager.analyzers)} tracks from {self.archive_dir}.")
+        return manager
+
+    @staticmethod
+    def frame_to_tracks(df:pd.DataFrame):
+        '''Inverse of `ArchiveWriter.tracks_to_frame()`; expects rows grouped by track_id'''
+        if len(df) == 0:
+            return {}
+
+        track_ids = df["track_id"].to_numpy()
+        bounds = np.flatnonzero(np.diff(track_ids)) + 1
+        starts = np.concatenate([[0], bounds])
+        ends = np.concatenate([bounds, [len(df)]])
+
+        bboxes = df[["x1", "y1", "x2", "y2"]].to_numpy().tolist()
+        timestamps = df["timestamp"].tolist()
+        frames = df["frame_idx"].tolist()
+        classes = df["class_name"].astype(str).tolist()
+        confs = df["conf"].tolist()
+
+        trajectories = {}
+        for start, end in zip(starts, ends):
+            trajectories[int(track_ids[start])] = [{
+                "bbox": bboxes[i],
+                "timestamp": timestamps[i],
+                "frame_idx": frames[i],
+                "class_name": classes[i],
+                "conf": confs[i]
+            } for i in range(start, end)]
+        return trajectories
+
+    def _read(self, file_name:str, filters:list=None):
+        path = self.archive_dir / file_name
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found. Write it with `ArchiveWriter` first.")
+        return pd.read_parquet(path, engine="pyarrow", filters=filters)
@@ -0,0 +1,171 @@
+import json
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+from datetime import datetime
+
+from conflict_detection.trajectory import TrajManager
+from conflict_detection.safety import TimeToCollision
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+TRACKS_FILE = "tracks.parquet"
+SUMMARIES_FILE = "summaries.parquet"
+CONFLICTS_FILE = "conflicts.parquet"
+MANIFEST_FILE = "manifest.json"
+
+class ArchiveWriter:
+    '''
+    Description
+    -----------
+    Writes the results of a run to a directory of Parquet files so they can be re-analyzed
+    without re-running video:
+
+        tracks.parquet     raw per-frame positions (one row per track / frame)
+        summaries.parquet  per-track summaries from `TrajAnalyzer`
+        conflicts.parquet  conflict records from `TimeToCollision`
+        manifest.json      fps and row counts
+
+    Parameters
+    ----------
+    archive_dir : str
+        Output directory; created if missing.
+    compression : str, default = "zstd"
+        Parquet compression codec.
+    '''
+    def __init__(self, archive_dir:str, compression:str="zstd"):
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        self.manifest = {}
+
+        logger.debug(f"Initialized archive writer at {self.archive_dir}.")
+
+    def write_all(self, manager:TrajManager, ttc:TimeToCollision=None):
+        '''Writes tracks, summaries, conflicts (if `ttc` is given) and the manifest'''
+        self.write_tracks(manager)
+        self.write_summaries(manager)
+        if ttc is not None:
+            self.write_conflicts(ttc)
+        self.write_manifest(manager)
+        return self.archive_dir
+
+    def write_tracks(self, manager:TrajManager):
+        '''Writes the raw per-frame positions held by the manager's `TrajCollector` and its finalized tracks'''
+        live = manager.collector.trajectories
+        df = self.tracks_to_frame(live)
+
+        finalized = [traj for traj in manager.iter_analyzers() if traj.track_id not in live]
+        if finalized:
+            df = pd.concat([df, self.analyzers_to_frame(finalized)], ignore_index=True)
+            df["class_name"] = df["class_name"].astype("category")
+        return self._write(df, TRACKS_FILE)
+
+    def write_summaries(self, manager:TrajManager):
+        '''Writes one row per track with speed, path length and stable class'''
+        if not manager.analyzers and not manager.spilled and manager.collector.trajectories:
+            manager.analyze_tracks()
+
+        df = self.summaries_to_frame(manager.iter_analyzers())
+        return self._write(df, SUMMARIES_FILE)
+
+    def write_conflicts(self, ttc:TimeToCollision, conflicts_only:bool=True):
+        '''Writes one row per pair / time checked; only detected conflicts unless `conflicts_only` is False'''
+        df = self.conflicts_to_frame(ttc.conflict_history, conflicts_only)
+        return self._write(df, CONFLICTS_FILE)
+
+    def write_manifest(self, manager:TrajManager):
+        self.manifest.update({
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "fps": manager.collector.fps,
+            "use_wall_time": manager.collector.use_wall_time
+        })
+        path = self.archive_dir / MANIFEST_FILE
+        path.write_text(json.dumps(self.manifest, indent=2))
+        return path
+
+    @staticmethod
+    def tracks_to_frame(trajectories:dict):
+        '''Flattens dict of track_id -> list of position dicts into a columnar DataFrame'''
+        track_ids = np.repeat(np.fromiter(trajectories.keys(), dtype=np.int64, count=len(trajectories)), [len(p) for p in trajectories.values()])
+        positions = [pos for track in trajectories.values() for pos in track]
+        bboxes = np.array([pos["bbox"] for pos in positions], dtype=np.float64).reshape(-1, 4)
+
+        return pd.DataFrame({
+            "track_id": track_ids,
+            "frame_idx": np.array([pos["frame_idx"] for pos in positions], dtype=np.int64),
+            "timestamp": np.array([pos["timestamp"] for pos in positions], dtype=np.float64),
+            "x1": bboxes[:, 0],
+            "y1": bboxes[:, 1],
+            "x2": bboxes[:, 2],
+            "y2": bboxes[:, 3],
+            "class_name": pd.Categorical([pos["class_name"] for pos in positions]),
+            "conf": np.array([pos["conf"] for pos in positions], dtype=np.float32)
+        })
+
+    @staticmethod
+    def analyzers_to_frame(analyzers:list):
+        '''Same columns as `tracks_to_frame()`, rebuilt from finalized analyzers (bboxes from center / size)'''
+        bboxes = np.vstack([traj.get_bboxes() for traj in analyzers])
+        return pd.DataFrame({
+            "track_id": np.repeat([traj.track_id for traj in analyzers], [len(traj) for traj in analyzers]).astype(np.int64),
+            "frame_idx": np.concatenate([traj._get_value("frame_idx") for traj in analyzers]),
+            "timestamp": np.concatenate([traj._get_value("timestamp") for traj in analyzers]),
+            "x1": bboxes[:, 0],
+            "y1": bboxes[:, 1],
+            "x2": bboxes[:, 2],
+            "y2": bboxes[:, 3],
+            "class_name": pd.Categorical([c for traj in analyzers for c in traj._get_value("class_name")]),
+            "conf": np.concatenate([traj._get_value("conf") for traj in analyzers]).astype(np.float32)
+        })
+
+    @staticmethod
+    def summaries_to_frame(analyzers):
+        '''One summary row per analyzer; accepts a dict of analyzers or any iterable of them'''
+        rows = []
+        for traj in (analyzers.values() if isinstance(analyzers, dict) else analyzers):
+            track_id = traj.track_id
+            timestamps = traj._get_value("timestamp")
+            frames = traj._get_value("frame_idx")
+            rows.append({
+                "track_id": track_id,
+                "stable_class": traj.get_stable_class(),
+                "n_positions": len(traj),
+                "start_time": timestamps[0] if len(traj) else None,
+                "end_time": timestamps[-1] if len(traj) else None,
+                "start_frame": frames[0] if len(traj) else None,
+                "end_frame": frames[-1] if len(traj) else None,
+                "path_length": traj.calculate_path_length(),
+                "avg_speed": traj.calculate_avg_speed()
+            })
+
+        columns = ["track_id", "stable_class", "n_positions", "start_time", "end_time", "start_frame", "end_frame", "path_length", "avg_speed"]
+        df = pd.DataFrame(rows, columns=columns)
+        return df.astype({"track_id": "int64", "n_positions": "int64", "start_time": "float64", "end_time": "float64",
+                          "start_frame": "Int64", "end_frame": "Int64", "path_length": "float64", "avg_speed": "float64"})
+
+    @staticmethod
+    def conflicts_to_frame(conflict_history:dict, conflicts_only:bool=True):
+        records = [result for time_results in conflict_history.values() for result in time_results.values()
+                   if result["conflict_detected"] or not conflicts_only]
+        points = np.array([r["collision_point"] if r["collision_point"] is not None else (np.nan, np.nan) for r in records], dtype=np.float64).reshape(-1, 2)
+
+        return pd.DataFrame({
+            "track_A_id": np.array([r["track_A_id"] for r in records], dtype=np.int64),
+            "track_B_id": np.array([r["track_B_id"] for r in records], dtype=np.int64),
+            "time_checked": np.array([r["time_checked"] for r in records], dtype=np.float64),
+            "ttc": np.array([r["ttc"] for r in records], dtype=np.float64),
+            "collision_x": points[:, 0],
+            "collision_y": points[:, 1],
+            "min_distance": np.array([r["min_distance"] for r in records], dtype=np.float64),
+            "conflict_detected": np.array([r["conflict_detected"] for r in records], dtype=bool)
+        })
+
+    def _write(self, df:pd.DataFrame, file_name:str):
+        path = self.archive_dir / file_name
+        df.to_parquet(path, engine="pyarrow", compression=self.compression, index=False)
+        self.manifest.setdefault("rows", {})[file_name] = len(df)
+        logger.info(f"Wrote {len(df)} rows to {path}")
+        return path
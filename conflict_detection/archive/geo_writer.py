@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+
+from conflict_detection.trajectory import TrajManager
+from conflict_detection.safety import TimeToCollision, PostEncroachmentTime
+from conflict_detection.homography import WorldProjector
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+CONFLICT_LAYER = "conflict_points"
+TRACK_LAYER = "track_paths"
+PET_LAYER = "pet_cells"
+
+class GeoWriter:
+    '''
+    Description
+    -----------
+    Writes conflicts, track paths and PET cells as geospatial layers, each as GeoParquet
+    (`{layer}.parquet`) and GeoJSON (`{layer}.geojson`):
+
+        conflict_points  one point per conflicting pair at its minimum TTC
+        track_paths      one line string per track
+        pet_cells        one polygon per grid cell with PET <= threshold (see `PostEncroachmentTime.analyze_cells()`)
+
+    Pixel coordinates are projected through the calibration's `WorldProjector` and geometries are
+    built in bulk from coordinate arrays (shapely 2 vectorized constructors), never row by row.
+
+    Parameters
+    ----------
+    geo_dir : str
+        Output directory; created if missing.
+    projector : WorldProjector
+    crs : str, default = "EPSG:4326"
+        CRS of the calibration's world points. GeoJSON is always written in EPSG:4326.
+    axis_order : {"latlon", "xy"}, default = "latlon"
+        "latlon" when world points are given as (lat, lon), as in `scripts/main.py`; "xy" for (x, y) /
+        (lon, lat) / projected (easting, northing) points.
+    '''
+    def __init__(self, geo_dir:str, projector:WorldProjector, crs:str="EPSG:4326", axis_order:str="latlon"):
+        if axis_order not in ("latlon", "xy"):
+            raise ValueError(f"Invalid axis_order: {axis_order}. Expected 'latlon' or 'xy'.")
+        try:
+            import geopandas
+            import shapely
+        except ImportError as e:
+            raise ImportError("GeoWriter requires geopandas (pip install geopandas).") from e
+        if int(shapely.__version__.split(".")[0]) < 2:
+            raise ImportError(f"GeoWriter requires shapely>=2.0 for its vectorized constructors, found {shapely.__version__} (pip install -U shapely).")
+
+        self._gpd = geopandas
+        self._shapely = shapely
+        self.geo_dir = Path(geo_dir)
+        self.geo_dir.mkdir(parents=True, exist_ok=True)
+        self.projector = projector
+        self.crs = crs
+        self.axis_order = axis_order
+
+        logger.debug(f"Initialized geo writer at {self.geo_dir} ({crs}, {axis_order}).")
+
+    def write_all(self, manager:TrajManager, ttc:TimeToCollision=None, pet:PostEncroachmentTime=None):
+        '''Writes every layer there is data for; returns layer -> (GeoParquet path, GeoJSON path)'''
+        written = {TRACK_LAYER: self.write(self.tracks_to_frame(manager), TRACK_LAYER)}
+        if ttc is not None:
+            written[CONFLICT_LAYER] = self.write(self.conflicts_to_frame(ttc, manager), CONFLICT_LAYER)
+        if pet is not None and pet.cell_size is not None:
+            written[PET_LAYER] = self.write(self.pet_cells_to_frame(pet), PET_LAYER)
+        return written
+
+    def to_world(self, pts):
+        '''(n, 2) pixel points -> (n, 2) x / y world coordinates in `crs` axis order for geometries'''
+        pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+        if len(pts) == 0:
+            return pts
+        world = self.projector.project(pts, "forward", dtype=np.float64)
+        return world[:, ::-1] if self.axis_order == "latlon" else world
+
+    def conflicts_to_frame(self, ttc:TimeToCollision, manager:TrajManager=None):
+        min_ttc = ttc.get_all_minimum_ttc()
+        pairs = np.array(list(min_ttc), dtype=np.int64).reshape(-1, 2)
+        results = list(min_ttc.values())
+        pixels = np.array([r["collision_point"] for r in results], dtype=np.float64).reshape(-1, 2)
+        world = self.to_world(pixels)
+
+        df = pd.DataFrame({
+            "track_A_id": pairs[:, 0],
+            "track_B_id": pairs[:, 1],
+            "min_ttc": np.array([r["min_ttc"] for r in results], dtype=np.float64),
+            "time_of_min": np.array([r["time_of_min"] for r in results], dtype=np.float64),
+            "min_distance": np.array([r["min_distance"] for r in results], dtype=np.float64),
+            "pixel_x": pixels[:, 0],
+            "pixel_y": pixels[:, 1]
+        })
+        if manager is not None:
+            classes = {traj.track_id: traj.get_stable_class() for traj in manager.iter_analyzers()}
+            df["class_A"] = pd.Categorical([classes.get(a) for a in df["track_A_id"]])
+            df["class_B"] = pd.Categorical([classes.get(b) for b in df["track_B_id"]])
+
+        return self._gpd.GeoDataFrame(df, geometry=self._gpd.points_from_xy(world[:, 0], world[:, 1]), crs=self.crs)
+
+    def tracks_to_frame(self, manager:TrajManager):
+        '''One line string per track with 2+ positions'''
+        if not manager.analyzers and not manager.spilled and manager.collector.trajectories:
+            manager.analyze_tracks()
+        analyzers = [traj for traj in manager.iter_analyzers() if len(traj) >= 2]
+
+        lengths = np.array([len(traj) for traj in analyzers], dtype=np.int64)
+        centers = np.vstack([traj.get_centers() for traj in analyzers]) if analyzers else np.empty((0, 2))
+        world = self.to_world(centers)
+        geometry = self._shapely.linestrings(world, indices=np.repeat(np.arange(len(analyzers)), lengths)) if analyzers else []
+
+        df = pd.DataFrame({
+            "track_id": np.array([traj.track_id for traj in analyzers], dtype=np.int64),
+            "class_name": pd.Categorical([traj.get_stable_class() for traj in analyzers]),
+            "n_positions": lengths,
+            "start_time": np.array([traj._get_value("timestamp")[0] for traj in analyzers], dtype=np.float64),
+            "end_time": np.array([traj._get_value("timestamp")[-1] for traj in analyzers], dtype=np.float64),
+            "start_frame": np.array([traj._get_value("frame_idx")[0] for traj in analyzers], dtype=np.int64),
+            "end_frame": np.array([traj._get_value("frame_idx")[-1] for traj in analyzers], dtype=np.int64)
+        })
+        return self._gpd.GeoDataFrame(df, geometry=self._gpd.GeoSeries(geometry), crs=self.crs)
+
+    def pet_cells_to_frame(self, pet:PostEncroachmentTime):
+        '''One polygon per PET cell; each cell's four pixel corners are projected, so cells follow the perspective'''
+        cells = pet.cell_history
+        size = pet.cell_size
+        x0 = np.asarray(cells["cell_x"], dtype=np.float64) * size
+        y0 = np.asarray(cells["cell_y"], dtype=np.float64) * size
+        corners = np.stack([
+            np.column_stack([x0, y0]), np.column_stack([x0 + size, y0]),
+            np.column_stack([x0 + size, y0 + size]), np.column_stack([x0, y0 + size])
+        ], axis=1)
+        world = self.to_world(corners.reshape(-1, 2)).reshape(-1, 4, 2)
+        geometry = self._shapely.polygons(world) if len(world) else []
+
+        df = pd.DataFrame({
+            "cell_x": np.asarray(cells["cell_x"], dtype=np.int64),
+            "cell_y": np.asarray(cells["cell_y"], dtype=np.int64),
+            "track_A_id": np.asarray(cells["track_A_id"], dtype=np.int64),
+            "track_B_id": np.asarray(cells["track_B_id"], dtype=np.int64),
+            "pet": np.asarray(cells["pet"], dtype=np.float64),
+            "time": np.asarray(cells["time"], dtype=np.float64)
+        })
+        return self._gpd.GeoDataFrame(df, geometry=self._gpd.GeoSeries(geometry), crs=self.crs)
+
+    def write(self, gdf, layer:str):
+        parquet = self.geo_dir / f"{layer}.parquet"
+        gdf.to_parquet(parquet, index=False, compression="zstd")
+
+        # GeoJSON (RFC 7946) is WGS84 only; written from the frame directly so no GDAL driver is needed
+        geojson = self.geo_dir / f"{layer}.geojson"
+        out = gdf if gdf.crs is None or gdf.crs.to_epsg() == 4326 else gdf.to_crs(4326)
+        geojson.write_text(out.to_json(drop_id=True))
+
+        logger.info(f"Wrote {len(gdf)} {layer} features to {parquet} / {geojson.name}")
+        return parquet, geojson
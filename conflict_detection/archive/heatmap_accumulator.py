@@ -0,0 +1,235 @@
+import os
+import json
+import numpy as np
+
+from pathlib import Path
+from numpy.typing import NDArray
+
+from conflict_detection.trajectory import TrajManager
+from conflict_detection.safety import TimeToCollision
+from conflict_detection.homography import WorldProjector
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Per-cell accumulator arrays; all of them merge by addition except `min_ttc` (minimum)
+COUNT_LAYERS = ("conflicts", "tracks", "speed_samples")
+SUM_LAYERS = ("speed_sum",)
+
+AXIS_ORDERS = ("xy", "latlon", "lonlat")
+# Mean Earth radius (m), for the local equirectangular approximation of geographic speeds
+EARTH_RADIUS = 6371008.8
+
+class HeatmapAccumulator:
+    '''
+    Description
+    -----------
+    Fixed-resolution world-space grids that accumulate results across runs and cameras: conflict counts,
+    a min-TTC histogram and the smallest TTC per cell, distinct tracks per cell, and track-speed sums /
+    sample counts (mean speed = sum / samples). Each run is added with `update()`, so a map over weeks of
+    footage never needs re-processing; accumulators with the same grid merge by adding arrays, and persist
+    as one compressed `.npz`.
+
+    Cells are addressed in the calibration's world coordinates (`WorldProjector` "forward" output), so
+    cameras calibrated to the same world frame share a grid. Speeds are in world units per second for
+    planar world coordinates; for geographic ones (degrees, `axis_order="latlon"` / `"lonlat"`) each step
+    is converted to metres first (longitude scaled by cos(latitude)), so speeds are in m/s. Runs are
+    recorded by `source`, and a source already in the heatmap is not added twice.
+
+    Parameters
+    ----------
+    bounds : tuple
+        (xmin, ymin, xmax, ymax) in world coordinates.
+    resolution : float
+        Cell size in world units.
+    ttc_edges : array-like, optional
+        Min-TTC histogram bin edges in seconds (default 0 to 3 s in 0.25 s bins); larger TTCs fall in the last bin.
+    axis_order : {"xy", "latlon", "lonlat"}, default = "xy"
+        "xy" for planar world coordinates (metres, feet, ...); "latlon" / "lonlat" for degrees in that
+        order, as with the (lat, lon) calibration of `scripts/main.py`.
+    '''
+    def __init__(self, bounds:tuple, resolution:float, ttc_edges:NDArray=None, axis_order:str="xy"):
+        if axis_order not in AXIS_ORDERS:
+            raise ValueError(f"Invalid axis_order: {axis_order}. Expected one of {list(AXIS_ORDERS)}.")
+        self.axis_order = axis_order
+        self.bounds = tuple(float(v) for v in bounds)
+        self.resolution = float(resolution)
+        self.ttc_edges = np.asarray(ttc_edges if ttc_edges is not None else np.arange(0, 3.25, 0.25), dtype=np.float64)
+
+        xmin, ymin, xmax, ymax = self.bounds
+        self.shape = (max(1, int(np.ceil((ymax - ymin) / self.resolution))), max(1, int(np.ceil((xmax - xmin) / self.resolution))))
+        self.layers = {name: np.zeros(self.shape, dtype=np.int64) for name in COUNT_LAYERS}
+        self.layers.update({name: np.zeros(self.shape, dtype=np.float64) for name in SUM_LAYERS})
+        self.layers["ttc_hist"] = np.zeros(self.shape + (len(self.ttc_edges) - 1,), dtype=np.int64)
+        self.layers["min_ttc"] = np.full(self.shape, np.inf, dtype=np.float64)
+        self.runs = 0
+        self.sources = []
+
+        xmin, ymin, xmax, ymax = self.bounds
+        if axis_order == "xy" and max(xmax - xmin, ymax - ymin) < 0.1 and max(map(abs, self.bounds)) <= 180:
+            logger.warning(f"Heatmap bounds {self.bounds} look like degrees; pass axis_order='latlon' or 'lonlat' for speeds in m/s.")
+
+    @classmethod
+    def for_projector(cls, projector:WorldProjector, resolution:float, margin:float=0.0, **kwargs):
+        '''Grid covering the calibration's four world points (plus `margin`); stable across runs of one camera'''
+        pts = projector.dst_pts.reshape(-1, 2)
+        xmin, ymin = pts.min(axis=0) - margin
+        xmax, ymax = pts.max(axis=0) + margin
+        return cls((xmin, ymin, xmax, ymax), resolution, **kwargs)
+
+    def update(self, manager:TrajManager, ttc:TimeToCollision=None, projector:WorldProjector=None, source:str=None):
+        '''
+        Adds one run: its tracks' speeds / visits and, with `ttc`, its conflicts (minimum TTC per pair).
+        A run whose `source` was already added is skipped, so re-running an update doesn't double count.
+        '''
+        if source is not None and str(source) in self.sources:
+            logger.warning(f"{source} is already in the heatmap; skipping it.")
+            return self
+        projector = projector if projector is not None else manager.projector
+        self.update_tracks(manager, projector)
+        if ttc is not None:
+            self.update_conflicts(ttc, projector)
+        self.runs += 1
+        if source is not None:
+            self.sources.append(str(source))
+        return self
+
+    def update_tracks(self, manager:TrajManager, projector:WorldProjector):
+        speed_cells, speeds, visit_cells = [], [], []
+        for traj in manager.iter_analyzers():
+            if len(traj) < 2:
+                continue
+            world = projector.project(traj.get_centers(), "forward", dtype=np.float64)
+            dt = np.diff(traj._get_value("timestamp"))
+            moving = dt > 0
+            midpoints = (world[1:] + world[:-1]) / 2
+            speed_cells.append(self.cell_index(midpoints[moving]))
+            speeds.append(self.step_length(np.diff(world, axis=0), midpoints)[moving] / dt[moving])
+
+            cells = self.cell_index(world)
+            visit_cells.append(np.unique(cells[cells >= 0]))
+
+        if speed_cells:
+            cells, speeds = np.concatenate(speed_cells), np.concatenate(speeds)
+            valid = cells >= 0
+            self._add("speed_sum", cells[valid], speeds[valid])
+            self._add("speed_samples", cells[valid])
+            self._add("tracks", np.concatenate(visit_cells))
+
+    def update_conflicts(self, ttc:TimeToCollision, projector:WorldProjector):
+        results = list(ttc.get_all_minimum_ttc().values())
+        if not results:
+            return
+        points = np.array([r["collision_point"] for r in results], dtype=np.float64).reshape(-1, 2)
+        values = np.array([r["min_ttc"] for r in results], dtype=np.float64)
+        cells = self.cell_index(projector.project(points, "forward", dtype=np.float64))
+        valid = cells >= 0
+        cells, values = cells[valid], values[valid]
+
+        self._add("conflicts", cells)
+        bins = np.clip(np.searchsorted(self.ttc_edges, values, side="right") - 1, 0, len(self.ttc_edges) - 2)
+        hist = self.layers["ttc_hist"].reshape(-1, len(self.ttc_edges) - 1)
+        np.add.at(hist, (cells, bins), 1)
+        np.minimum.at(self.layers["min_ttc"].reshape(-1), cells, values)
+
+    def step_length(self, steps:NDArray, midpoints:NDArray):
+        '''Length of world-coordinate `steps` taken around `midpoints`: world units, or metres for geographic coordinates'''
+        if self.axis_order == "xy":
+            return np.hypot(steps[:, 0], steps[:, 1])
+        lat, lon = (0, 1) if self.axis_order == "latlon" else (1, 0)
+        scale = np.radians(1.0) * EARTH_RADIUS
+        north = steps[:, lat] * scale
+        east = steps[:, lon] * scale * np.cos(np.radians(midpoints[:, lat]))
+        return np.hypot(north, east)
+
+    def cell_index(self, world:NDArray):
+        '''Flat cell index of each (x, y) world point; -1 outside the grid'''
+        world = np.asarray(world, dtype=np.float64).reshape(-1, 2)
+        xmin, ymin, _, _ = self.bounds
+        col = np.floor((world[:, 0] - xmin) / self.resolution).astype(np.int64)
+        row = np.floor((world[:, 1] - ymin) / self.resolution).astype(np.int64)
+        inside = (col >= 0) & (col < self.shape[1]) & (row >= 0) & (row < self.shape[0])
+        return np.where(inside, row * self.shape[1] + col, -1)
+
+    def layer(self, name:str):
+        '''A stored layer, or a derived one: "mean_speed" (NaN where no samples)'''
+        if name == "mean_speed":
+            samples = self.layers["speed_samples"]
+            return np.divide(self.layers["speed_sum"], samples, out=np.full(self.shape, np.nan), where=samples > 0)
+        return self.layers[name]
+
+    def merge(self, other:"HeatmapAccumulator"):
+        '''
+        Adds `other` (same bounds, resolution and TTC bins) into this accumulator. Raises if the two share a
+        source: its runs are already counted here, and merged layers can't be split per run to skip them.
+        '''
+        if other.bounds != self.bounds or other.resolution != self.resolution or other.axis_order != self.axis_order or not np.array_equal(other.ttc_edges, self.ttc_edges):
+            raise ValueError("Heatmaps can only be merged when bounds, resolution, axis order and TTC bins match.")
+        shared = set(other.sources) & set(self.sources)
+        if shared:
+            raise ValueError(f"Heatmaps share sources {sorted(shared)}; merging them would count those runs twice.")
+        for name, values in other.layers.items():
+            if name == "min_ttc":
+                np.minimum(self.layers[name], values, out=self.layers[name])
+            else:
+                self.layers[name] += values
+        self.runs += other.runs
+        self.sources.extend(other.sources)
+        return self
+
+    def grid_to_world(self):
+        '''3x3 matrix mapping grid (col, row) to the world coordinates of the cell center'''
+        xmin, ymin, _, _ = self.bounds
+        res = self.resolution
+        return np.array([[res, 0, xmin + res / 2], [0, res, ymin + res / 2], [0, 0, 1]], dtype=np.float64)
+
+    def render(self, frame:NDArray, name:str, projector:WorldProjector, illustrator=None, render=None, alpha:float=0.5, vmax:float=None):
+        '''Overlays layer `name` on a camera frame: warped into pixel space by `Render`, blended by `Illustrator`'''
+        # Deferred so loading / merging heatmaps doesn't need the studio package
+        from conflict_detection.studio.illustrate import Illustrator
+        from conflict_detection.studio.render import Render
+        illustrator = illustrator if illustrator is not None else Illustrator()
+        render = render if render is not None else Render()
+
+        values = self.layer(name).astype(np.float64)
+        if name == "min_ttc":
+            # Shorter TTC is more severe: invert so it renders hotter
+            values = np.where(np.isfinite(values), self.ttc_edges[-1] - np.minimum(values, self.ttc_edges[-1]) + 1e-6, np.nan)
+        h, w = frame.shape[:2]
+        warped = render.render_world_grid(values, self.grid_to_world(), projector.H_I, (w, h))
+        return illustrator.draw_heatmap(frame.copy(), warped, alpha=alpha, vmax=vmax)
+
+    def save(self, path:str):
+        '''Writes a compressed `.npz` atomically (safe to overwrite the file it was loaded from)'''
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"bounds": self.bounds, "resolution": self.resolution, "axis_order": self.axis_order, "runs": self.runs, "sources": self.sources}
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez_compressed(tmp, meta=np.array(json.dumps(meta)), ttc_edges=self.ttc_edges, **self.layers)
+        os.replace(tmp, path)
+        logger.info(f"Saved heatmap ({self.shape[1]}x{self.shape[0]} cells, {self.runs} runs) to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path:str):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            heatmap = cls(meta["bounds"], meta["resolution"], data["ttc_edges"], meta.get("axis_order", "xy"))
+            for name in heatmap.layers:
+                heatmap.layers[name] = data[name].copy()
+        heatmap.runs = meta["runs"]
+        heatmap.sources = meta["sources"]
+        return heatmap
+
+    @classmethod
+    def merge_files(cls, paths:list):
+        '''Loads and merges several saved heatmaps (e.g. one per camera or per week)'''
+        paths = list(paths)
+        merged = cls.load(paths[0])
+        for path in paths[1:]:
+            merged.merge(cls.load(path))
+        return merged
+
+    def _add(self, name:str, cells:NDArray, weights:NDArray=None):
+        size = self.shape[0] * self.shape[1]
+        self.layers[name] += np.bincount(cells, weights=weights, minlength=size).reshape(self.shape).astype(self.layers[name].dtype)
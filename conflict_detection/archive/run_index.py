@@ -0,0 +1,124 @@
+import json
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+
+from .archive_writer import SUMMARIES_FILE, CONFLICTS_FILE, MANIFEST_FILE
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_DIR = "_index"
+RUNS_FILE = "runs.parquet"
+PAIRS_FILE = "conflict_pairs.parquet"
+TRACKS_FILE = "track_summaries.parquet"
+
+class RunIndex:
+    '''
+    Description
+    -----------
+    Precomputed aggregates over every archive (see `ArchiveWriter`) under `root`, kept in
+    `root/_index/` so dashboards and reports read three small Parquet files instead of every run:
+
+        runs.parquet             one row per run: fps, track / conflict counts, min TTC, mean speed
+        conflict_pairs.parquet   one row per conflicting pair and run, at the pair's minimum TTC
+        track_summaries.parquet  the runs' per-track summaries, with a `run` column
+
+    `refresh()` is incremental: only runs whose manifest changed since the last refresh are re-read.
+    Raw per-frame positions (`tracks.parquet`) are never touched; read them per event through
+    `ArchiveReader(index.run_dir(run)).read_tracks(track_ids)`.
+
+    Parameters
+    ----------
+    root : str
+        Directory containing one archive directory per run (at any depth).
+    '''
+    def __init__(self, root:str):
+        self.root = Path(root)
+        self.index_dir = self.root / INDEX_DIR
+
+    def refresh(self):
+        '''Re-reads new / changed runs, drops deleted ones and rewrites the index; returns the runs table'''
+        old_runs = self.read(RUNS_FILE)
+        old_mtimes = dict(zip(old_runs["run"], old_runs["manifest_mtime"])) if len(old_runs) else {}
+
+        manifests = {str(path.parent.relative_to(self.root)): path for path in sorted(self.root.rglob(MANIFEST_FILE)) if INDEX_DIR not in path.parts}
+        current = {run: path.stat().st_mtime_ns for run, path in manifests.items()}
+        unchanged = [run for run, mtime in current.items() if old_mtimes.get(run) == mtime]
+        changed = [run for run in current if run not in unchanged]
+
+        tables = {name: [self._keep(self.read(name), unchanged)] for name in (RUNS_FILE, PAIRS_FILE, TRACKS_FILE)}
+        for run in changed:
+            try:
+                runs, pairs, tracks = self._summarize(run, manifests[run].parent, current[run])
+            except Exception as e:
+                logger.warning(f"Skipping run {run}: {type(e).__name__}: {e}")
+                continue
+            tables[RUNS_FILE].append(runs)
+            tables[PAIRS_FILE].append(pairs)
+            tables[TRACKS_FILE].append(tracks)
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        for name, frames in tables.items():
+            frames = [df for df in frames if len(df)]
+            df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            df.to_parquet(self.index_dir / name, engine="pyarrow", compression="zstd", index=False)
+
+        logger.info(f"Indexed {len(current)} runs under {self.root} ({len(changed)} re-read, {len(old_mtimes) - len(unchanged)} removed or changed).")
+        return self.read(RUNS_FILE)
+
+    def read(self, name:str, filters:list=None):
+        '''One of the index tables (empty DataFrame if the index hasn't been built)'''
+        path = self.index_dir / name
+        if not path.exists():
+            return pd.DataFrame()
+        return pd.read_parquet(path, engine="pyarrow", filters=filters)
+
+    def run_dir(self, run:str):
+        return self.root / run
+
+    def mtime(self):
+        '''Modification time of the index (a cache key for dashboards)'''
+        path = self.index_dir / RUNS_FILE
+        return path.stat().st_mtime_ns if path.exists() else 0
+
+    @staticmethod
+    def _keep(df:pd.DataFrame, runs:list):
+        return df[df["run"].isin(runs)] if len(df) else df
+
+    @staticmethod
+    def _summarize(run:str, archive_dir:Path, mtime:int):
+        manifest = json.loads((archive_dir / MANIFEST_FILE).read_text())
+
+        tracks = pd.read_parquet(archive_dir / SUMMARIES_FILE) if (archive_dir / SUMMARIES_FILE).exists() else pd.DataFrame(columns=["track_id", "stable_class", "avg_speed"])
+        tracks.insert(0, "run", run)
+
+        conflicts = pd.read_parquet(archive_dir / CONFLICTS_FILE) if (archive_dir / CONFLICTS_FILE).exists() else pd.DataFrame()
+        if len(conflicts):
+            conflicts = conflicts[conflicts["conflict_detected"]]
+        if len(conflicts):
+            # Minimum-TTC row per pair, plus how many checks flagged the pair
+            order = conflicts.sort_values("ttc", kind="stable")
+            pairs = order.drop_duplicates(["track_A_id", "track_B_id"]).rename(columns={"ttc": "min_ttc", "time_checked": "time_of_min"})
+            checks = conflicts.groupby(["track_A_id", "track_B_id"]).size().rename("n_checks").reset_index()
+            pairs = pairs.drop(columns="conflict_detected").merge(checks, on=["track_A_id", "track_B_id"])
+            classes = dict(zip(tracks["track_id"], tracks["stable_class"]))
+            pairs["class_A"] = pairs["track_A_id"].map(classes)
+            pairs["class_B"] = pairs["track_B_id"].map(classes)
+        else:
+            pairs = pd.DataFrame(columns=["track_A_id", "track_B_id", "time_of_min", "min_ttc", "collision_x", "collision_y", "min_distance", "n_checks", "class_A", "class_B"])
+        pairs.insert(0, "run", run)
+
+        speeds = tracks["avg_speed"].to_numpy(dtype=np.float64) if len(tracks) else np.array([])
+        runs = pd.DataFrame([{
+            "run": run,
+            "created": manifest.get("created"),
+            "fps": manifest.get("fps"),
+            "n_tracks": len(tracks),
+            "n_conflict_pairs": len(pairs),
+            "min_ttc": float(pairs["min_ttc"].min()) if len(pairs) else np.nan,
+            "mean_speed": float(np.nanmean(speeds)) if np.isfinite(speeds).any() else np.nan,
+            "manifest_mtime": mtime
+        }])
+        return runs, pairs.reset_index(drop=True), tracks
@@ -1 +1,3 @@
-from .detection_system import DetectionSystem
\ No newline at end of file
+from .detection_system import DetectionSystem
+from .multi_camera_runner import MultiCameraRunner
+from .checkpoint import Checkpoint
\ No newline at end of file
@@ -0,0 +1,99 @@
+import os
+import pickle
+import hashlib
+
+from pathlib import Path
+
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+class Checkpoint:
+    '''
+    Description
+    -----------
+    Periodic snapshot of a `DetectionSystem` run on one video: the next frame index, the tracker
+    backend and state (`ObjectTracker.get_state()`) and the collected / finalized trajectories
+    (`TrajManager.get_state()`). Written atomically as two pickles, a small header followed by the
+    state, so a crash mid-write leaves the previous checkpoint intact and `header()` doesn't have to
+    unpickle the trajectories. The video's size and mtime are stored with it and a checkpoint for a
+    different file is ignored.
+
+    Parameters
+    ----------
+    checkpoint_dir : str
+        Directory holding one `{video stem}_{path hash}.ckpt` file per video; created if missing. The hash
+        of the resolved path keeps videos with the same name in different directories apart.
+    video_path : str
+    '''
+    VERSION = 1
+
+    def __init__(self, checkpoint_dir:str, video_path:str):
+        self.video_path = str(video_path)
+        self.path = Path(checkpoint_dir) / f"{Path(video_path).stem}_{self.key(video_path)}.ckpt"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def save(self, frame_idx:int, tracker, traj, complete:bool=False):
+        '''Snapshots `tracker` (ObjectTracker) and `traj` (TrajManager) with `frame_idx` frames processed'''
+        header = {
+            "version": self.VERSION,
+            "video": self._fingerprint(),
+            "frame_idx": frame_idx,
+            "complete": complete
+        }
+        state = {"tracker": tracker.get_state(), "traj": traj.get_state()}
+
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        logger.debug(f"Checkpointed {self.video_path} at frame {frame_idx} to {self.path}.")
+
+    def header(self):
+        '''Returns version, video fingerprint, frame_idx and complete flag, or None if there is no usable checkpoint'''
+        if not self.path.exists():
+            return None
+
+        with open(self.path, "rb") as f:
+            header = pickle.load(f)
+
+        if header.get("version") != self.VERSION or header.get("video") != self._fingerprint():
+            logger.warning(f"Ignoring checkpoint {self.path}: written by another version or for a different file.")
+            return None
+        return header
+
+    def load(self):
+        '''Returns the header merged with the saved tracker / trajectory state, or None'''
+        if self.header() is None:
+            return None
+
+        with open(self.path, "rb") as f:
+            header = pickle.load(f)
+            return {**header, **pickle.load(f)}
+
+    def restore(self, tracker, traj):
+        '''Loads the checkpoint into `tracker` and `traj`; returns the frame index to resume from (0 if none)'''
+        state = self.load()
+        if state is None:
+            return 0
+
+        tracker.set_state(state["tracker"])
+        traj.set_state(state["traj"])
+        logger.info(f"Resuming {self.video_path} from frame {state['frame_idx']}.")
+        return state["frame_idx"]
+
+    def is_complete(self):
+        header = self.header()
+        return header is not None and header["complete"]
+
+    def remove(self):
+        self.path.unlink(missing_ok=True)
+
+    @staticmethod
+    def key(video_path:str):
+        return hashlib.blake2b(str(Path(video_path).resolve()).encode(), digest_size=8).hexdigest()
+
+    def _fingerprint(self):
+        stat = os.stat(self.video_path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
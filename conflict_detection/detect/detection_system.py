@@ -1,30 +1,134 @@
+import time
 import numpy as np
 
 from typing import Union
 from numpy.typing import NDArray
 
-from conflict_detection.studio import StudioManager
+from conflict_detection.studio import StudioManager, ClipExtractor, BirdsEyeView
 from conflict_detection.homography import ClickPoints, WorldProjector
-from conflict_detection.objects import ObjectDetector, ObjectTracker
-from conflict_detection.trajectory import TrajManager
-from conflict_detection.safety import TimeToCollision
-from conflict_detection.utils import get_logger
+from conflict_detection.objects import ObjectDetector, ObjectTracker, MotionGate
+from conflict_detection.trajectory import TrajManager, ZoneMap
+from conflict_detection.safety import TimeToCollision, PostEncroachmentTime, OnlineConflictMonitor, ThresholdSweep
+from conflict_detection.alerts import AlertDispatcher
+from conflict_detection.utils import get_logger, StageTimer, MemoryProfiler
+from .checkpoint import Checkpoint
 
 logger = get_logger(__name__)
 
 class DetectionSystem:
 
-    def __init__(self, file_in:Union[str, int], world_pts:NDArray, model_path:str="./models/yolov8n.pt", model_conf:float=0.5, activation_thresh:float=0.25, lost_buffer:int=30, ttc_thresh:float=1.5, min_dist:float=0.5, use_wall_time:bool=False):
-
-        self.studio = StudioManager(file_in)
+    def __init__(self, file_in:Union[str, int], world_pts:NDArray, model_path:str="./models/yolov8n.pt", model_conf:float=0.5, activation_thresh:float=0.25, lost_buffer:int=30, ttc_thresh:float=1.5, min_dist:float=0.5, use_wall_time:bool=False, img_pts:NDArray=None, detector:ObjectDetector=None, cache_dir:str=None, finalize_tracks:bool=False, spill_dir:str=None, line_mode:str="aa", frame_cache_mb:float=0, seek_index_dir:str=None, motion_gate:bool=False, motion_roi:NDArray=None, checkpoint_dir:str=None, checkpoint_every:int=9000, live_policy:str="drop_oldest", every_n:int=1, latency_budget:float=None, alert_sinks:list=None, near_miss_thresh:float=None, alert_cooldown:float=1.0, tracker_backend:str="bytetrack", tracker_kwargs:dict=None, memory_profile_every:int=None, simplify_tol:float=None, simplify_max_gap:float=None, stationary_speed:float=None, live:bool=None):
+        """
+        Parameters
+        ----------
+        file_in : str or int
+            Video / image path, stream URL or camera index.
+        world_pts : NDArray
+            The four calibration points in world coordinates.
+        model_path : str, default = "./models/yolov8n.pt"
+        model_conf : float, default = 0.5
+        activation_thresh : float, default = 0.25
+            Minimum confidence to start a track.
+        lost_buffer : int, default = 30
+            Frames a lost track is kept alive by the tracker.
+        ttc_thresh : float, default = 1.5
+        min_dist : float, default = 0.5
+        use_wall_time : bool, default = False
+            Unused; files are timed by frame count / fps and live sources by capture time.
+        img_pts : NDArray, optional
+            Fixed calibration in pixels; skips the interactive click step.
+        detector : ObjectDetector, optional
+            Replaces the YOLO-backed `ObjectDetector` with any object exposing the same `detect(frame)` method.
+        cache_dir : str, optional
+            Enables the on-disk detection cache, so re-runs of a video skip decoding and inference.
+        finalize_tracks : bool, default = False
+            Finalizes tracks the tracker has dropped, so memory stays bounded on long recordings.
+        spill_dir : str, optional
+            With `finalize_tracks`, finalized tracks are written here instead of kept in memory.
+        line_mode : str, default = "aa"
+            "fast" trades anti-aliasing for annotation speed.
+        frame_cache_mb : float, default = 0
+            Decoded-frame cache size; only pays off for seek-heavy use such as interactive playback.
+        seek_index_dir : str, optional
+            Where keyframe indexes are persisted (see `SeekIndex`); off by default for the same reason.
+        motion_gate : bool, default = False
+            Skips inference on frames where nothing inside `motion_roi` (default: whole frame) moved and
+            no tracks are active, and on duplicate frames (see `MotionGate`).
+        motion_roi : NDArray, optional
+        checkpoint_dir : str, optional
+            Saves the run every `checkpoint_every` frames so `monitor_traffic(resume=True)` can continue it
+            (see `Checkpoint`).
+        checkpoint_every : int, default = 9000
+        memory_profile_every : int, optional
+            Traces allocations with a `MemoryProfiler` snapshot every that many frames and logs the top
+            growth sites at the end.
+        live : bool, optional
+            Capture in real time (see `Reader`); default: camera indexes and rtsp / rtmp / udp / tcp URLs.
+            Pass True for http(s) camera streams.
+        live_policy : str, default = "drop_oldest"
+        every_n : int, default = 1
+        latency_budget : float, optional
+            Which frames are dropped when processing falls behind (see `LiveSource`).
+        alert_sinks : list, optional
+            Receive conflict / near-miss events as they happen (see `conflict_detection.alerts`), checked
+            every frame by an `OnlineConflictMonitor`; released by `close()`.
+        near_miss_thresh : float, optional
+            Default `2 * ttc_thresh`.
+        alert_cooldown : float, default = 1.0
+            Seconds before the same pair is reported again.
+        tracker_backend : str, default = "bytetrack"
+            "iou" swaps ByteTrack for the built-in NumPy `IoUTracker`.
+        tracker_kwargs : dict, optional
+            Passed to the tracker backend, e.g. `{"matcher": "hungarian"}`.
+        simplify_tol : float, optional
+            Pixels; simplifies every track as it is finalized (see `TrajAnalyzer.simplify()`).
+        simplify_max_gap : float, optional
+            Largest time in seconds between two kept points of a simplified track.
+        stationary_speed : float, optional
+            Pixels/s; collapses intervals where a track stands still into dwell records and leaves tracks
+            that never move out of conflict analysis (see `TrajAnalyzer.collapse_stationary()`).
+        """
+        self.file_in = file_in
+        self.studio = StudioManager(file_in, line_mode=line_mode, frame_cache_mb=frame_cache_mb, seek_index_dir=seek_index_dir, live_policy=live_policy, every_n=every_n, latency_budget=latency_budget, live=live)
         self.fps, _, _ = self.studio.get_metadata()
-        self.detector = ObjectDetector(model_path=model_path, confidence=model_conf)
-        self.tracker = ObjectTracker(fps=self.fps, activation_thresh=activation_thresh, lost_buffer=lost_buffer)
-        self.projector = self._initialize_projector(world_pts)
-        self.traj = TrajManager(self.projector, self.fps, use_wall_time=False)
+        self.live = self.studio.source_type() == "camera"
+        if self.live:
+            # Drivers often report 0 fps; the tracker sees only every n-th frame under "every_nth"
+            self.fps = self.fps or 30
+            tracker_fps = max(1, round(self.fps / self.studio.source.live.every_n))
+        self.detector = detector if detector is not None else ObjectDetector(model_path=model_path, confidence=model_conf, cache_dir=cache_dir)
+        self.tracker = ObjectTracker(fps=tracker_fps if self.live else self.fps, activation_thresh=activation_thresh, lost_buffer=lost_buffer, backend=tracker_backend, **(tracker_kwargs or {}))
+        self.projector = self._initialize_projector(world_pts, img_pts)
+        lost_buffer = self.tracker.max_frames_lost if finalize_tracks else None
+        self.traj = TrajManager(self.projector, self.fps, use_wall_time=False, lost_buffer=lost_buffer, spill_dir=spill_dir, simplify_tol=simplify_tol, simplify_max_gap=simplify_max_gap, stationary_speed=stationary_speed)
         self.ttc = TimeToCollision(ttc_thresh, min_dist)
-        
-    def _initialize_projector(self, world_pts:NDArray):
+        self.timer = StageTimer()
+        self.gate = MotionGate(roi=motion_roi) if motion_gate else None
+        self.zones = None
+        self.checkpoint = Checkpoint(checkpoint_dir, file_in) if checkpoint_dir is not None and self.studio.source_type() == "video" else None
+        self.checkpoint_every = checkpoint_every
+        self.monitor = OnlineConflictMonitor(ttc_thresh, min_dist, near_miss_thresh, cooldown=alert_cooldown)
+        self.alerts = AlertDispatcher(alert_sinks) if alert_sinks else None
+        self.bev = None
+        self.memory = MemoryProfiler(memory_profile_every) if memory_profile_every else None
+        self.sweep = None
+        self.run_started = None
+
+    def close(self):
+        '''Releases the alert sinks; call once done with the system (or use it as a context manager)'''
+        if self.alerts is not None:
+            self.alerts.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _initialize_projector(self, world_pts:NDArray, img_pts:NDArray=None):
+        if img_pts is not None:
+            return WorldProjector(np.asarray(img_pts, dtype=np.float32), world_pts)
+
         _, frame = self.studio.return_frame()
 
         click = ClickPoints(frame, "Image Space")
@@ -32,51 +136,269 @@ class DetectionSystem:
 
         img_pts = np.array(click.get_pts(), dtype=np.float32)
         return  WorldProjector(img_pts, world_pts)
-    
-    def monitor_traffic(self, file_out:str=None):
+
+    def monitor_traffic(self, file_out:str=None, headless:bool=False, resume:bool=False, bev:bool=False, bev_map_dir:str=None, bev_axis_order:str="xy"):
+        '''
+        `headless` skips the playback key handling so the loop can run without a display. When the
+        detector has cached detections for this video and no `file_out` is requested, the video is not
+        decoded at all and tracking / analysis run on the cached detections. `resume` restores the
+        tracker and trajectories from the checkpoint (if any) and continues from its frame; `file_out`
+        then only covers the resumed part. `bev` writes a bird's-eye view of the calibrated region, with
+        track positions and online conflict markers, next to the camera view in `file_out` (see `BirdsEyeView`);
+        `bev_map_dir` persists its remap maps so later runs with the same calibration skip building them;
+        `bev_axis_order="latlon"` orients a (lat, lon) calibration north up (see `BirdsEyeView`).
+        '''
+        self.run_started = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.bev = None
+        if bev and file_out is None:
+            logger.warning("bev=True has no effect without file_out.")
+        elif bev:
+            _, height, width = self.studio.get_metadata()
+            self.bev = BirdsEyeView(self.projector, (width, height), map_dir=bev_map_dir, axis_order=bev_axis_order, illustrator=self.studio.draw, render=self.studio.render)
+
+        start_frame = self.checkpoint.restore(self.tracker, self.traj) if resume and self.checkpoint is not None else 0
+        if self.memory is not None:
+            self.memory.start()
+
+        # Detections of a resumed run are neither replayed nor recorded: the cache covers whole videos only
+        cached = self._open_detection_cache() if start_frame == 0 else None
+        if cached is not None and file_out is None:
+            self._replay_detections(cached)
+            complete = True
+        else:
+            complete = self._process_frames(file_out, headless, start_frame)
+        self._close_detection_cache(complete)
+        if self.alerts is not None:
+            self.alerts.flush()
+        if self.memory is not None:
+            self.memory.snapshot("end")
+            self.memory.log_summary()
+            self.memory.stop()
+
+        logger.info(f"Collected {len(self.traj)} unique tracks.")
+        with self.timer.time("analyze_tracks"):
+            self.traj.analyze_tracks()
+
+    def _process_frames(self, file_out:str=None, headless:bool=False, start_frame:int=0):
+        '''Runs the decode / detect / track loop from `start_frame`; returns False if playback was quit before the end of the video.'''
         if file_out is not None:
-            self.studio.create_writer(file_out, fourcc="mp4v")
+            self.studio.create_writer(file_out, fourcc="mp4v", frame_size=self.bev.output_size() if self.bev is not None else None)
 
         logger.info("Starting video processing.")
 
-        frames_count = 0
-        self.studio.set_frame_idx(0)
+        frames_count = start_frame
+        results, tracks = [], []
+        self.studio.set_frame_idx(start_frame)
 
         while True:
-            ret, frame = self.studio.return_frame()
+            with self.timer.time("read"):
+                ret, frame = self.studio.return_frame()
             if not ret:
                 logger.info(f"Finished processing {frames_count} frames.")
+                self._log_gate()
+                self._save_checkpoint(frames_count, complete=True)
                 if self.studio.writer_check():
                     logger.info(f"Output saved to: {file_out}")
                     self.studio.release_writer()
-                break
-            
+                return True
+
             frames_count += 1
             if frames_count % 25 == 0:
                 logger.info(f"Processing frame {frames_count}")
 
-            results = self.detector.detect(frame)
-            tracks = self.tracker.track(results)
-            self.traj.collect_tracks(tracks)
+            results = self._detect(frame, results, tracks)
+            with self.timer.time("track"):
+                tracks = self.tracker.track(results)
+            with self.timer.time("collect"):
+                self.traj.collect_tracks(tracks, self.studio.capture_timestamp())
+            events = self._publish_alerts()
+            if self.memory is not None:
+                self.memory.step(frames_count)
+            if frames_count % self.checkpoint_every == 0:
+                self._save_checkpoint(frames_count)
 
             if self.studio.writer_check():
-                self.studio.draw_tracked_objects(frame, tracks)
-                self.studio.write_frame(frame)
+                with self.timer.time("annotate"):
+                    if self.bev is not None:
+                        timestamp = self.studio.capture_timestamp()
+                        frame = self.bev.render_frame(frame, tracks, events, frames_count / self.fps if timestamp is None else timestamp)
+                    else:
+                        frame = self.studio.draw_tracked_objects(frame, tracks)
+                with self.timer.time("write"):
+                    self.studio.write_frame(frame)
 
-            flag = self.studio.control_playback()
+            flag = False if headless else self.studio.control_playback()
             if flag:
                 logger.info(f"Finished processing {frames_count} frames.")
+                self._log_gate()
+                self._save_checkpoint(frames_count)
                 if self.studio.writer_check():
                     logger.info(f"Output saved to: {file_out}")
                     self.studio.release_writer()
-                break
-    
-        logger.info(f"Collected {len(self.traj.collector)} unique tracks.")
-        self.traj.analyze_tracks()
-    
+                return False
+
+    def _detect(self, frame:NDArray, previous:list, tracks:list):
+        '''
+        Runs the detector unless the motion gate skips the frame. Skipped frames still go through the
+        tracker and collector (with the previous detections for duplicates, none for static frames), so
+        frame-based timestamps and tracker aging advance exactly as without the gate.
+        '''
+        if self.gate is not None:
+            with self.timer.time("gate"):
+                state = self.gate.check(frame, tracks_active=len(tracks) > 0)
+            if self.gate.skip(state):
+                results = previous if state == "duplicate" else []
+                if hasattr(self.detector, "skip_frame"):
+                    self.detector.skip_frame(results)
+                return results
+
+        with self.timer.time("detect"):
+            return self.detector.detect(frame)
+
+    def _publish_alerts(self):
+        '''Runs the online conflict monitor when alerts or the BEV need it; returns this frame's events'''
+        if self.alerts is None and self.bev is None:
+            return []
+        with self.timer.time("alerts"):
+            events = self.monitor.update(self.traj.collector)
+            if self.alerts is not None:
+                self.alerts.publish(events)
+        return events
+
+    def _save_checkpoint(self, frames_count:int, complete:bool=False):
+        if self.checkpoint is not None:
+            with self.timer.time("checkpoint"):
+                self.checkpoint.save(frames_count, self.tracker, self.traj, complete)
+
+    def _log_gate(self):
+        if self.live:
+            summary = self.studio.source.live.summary()
+            logger.info(f"Live source: delivered {summary['delivered']} of {summary['captured']} captured frames; dropped {summary['overwritten']} (buffer full), {summary['stale']} (over latency budget), {summary['decimated']} (every_nth); mean latency {summary['mean_latency_ms'] or 0:.1f} ms.")
+        if self.gate is not None:
+            summary = self.gate.summary()
+            logger.info(f"Motion gate skipped {summary['static'] + summary['duplicate']} of {summary['frames']} frames ({100 * summary['skip_rate']:.1f}%; {summary['duplicate']} duplicates).")
+
+    def _replay_detections(self, cached):
+        logger.info(f"Replaying {len(cached)} cached frames.")
+        for detections in cached:
+            with self.timer.time("track"):
+                tracks = self.tracker.track(detections)
+            with self.timer.time("collect"):
+                self.traj.collect_tracks(tracks)
+            self._publish_alerts()
+            if self.memory is not None:
+                self.memory.step()
+
+    def _open_detection_cache(self):
+        if not hasattr(self.detector, "open_cache") or self.studio.source_type() != "video":
+            return None
+        fps, height, width = self.studio.get_metadata()
+        return self.detector.open_cache(self.file_in, meta={"fps": fps, "width": width, "height": height})
+
+    def _close_detection_cache(self, complete:bool):
+        if hasattr(self.detector, "close_cache"):
+            self.detector.close_cache(complete)
+
     def detect_conflicts(self):
         all_analyzers = self.traj.get_analyzer()
-        self.ttc.analyze_all_conflicts(all_analyzers)
-        min_ttc = self.ttc.get_all_minimum_ttc()
+        with self.timer.time("detect_conflicts"):
+            self.ttc.analyze_all_conflicts(list(all_analyzers.values()))
+            min_ttc = self.ttc.get_all_minimum_ttc()
         logger.info(f"Detected {len(min_ttc)}")
-        return min_ttc
\ No newline at end of file
+        return min_ttc
+
+    def sweep_thresholds(self, ttc_thresholds:NDArray, min_distances:NDArray, step:float=0.1):
+        '''
+        Conflict counts and per-pair minimum TTC for every (`ttc_thresh`, `min_dist`) combination from
+        one pass over the tracks (see `ThresholdSweep.evaluate()`), for calibrating a new site.
+        '''
+        all_analyzers = self.traj.get_analyzer()
+        with self.timer.time("sweep_thresholds"):
+            self.sweep = ThresholdSweep(step).compute(list(all_analyzers.values()))
+            results = self.sweep.evaluate(ttc_thresholds, min_distances)
+        logger.info(f"Swept {results['conflict_pairs'].size} threshold combinations over {len(results['pairs'])} pairs.")
+        return results
+
+    def count_zones(self, zones:dict, coords:str="image", min_samples:int=3):
+        '''
+        Zone sequences, dwell times and turning movements for every track (see `ZoneMap` and
+        `TrajManager.analyze_zones()`). `zones` maps names to polygons in pixel or, with `coords="world"`,
+        world coordinates. Returns (origin, destination) -> number of tracks.
+        '''
+        _, height, width = self.studio.get_metadata()
+        self.zones = ZoneMap(zones, (width, height), self.projector, coords)
+        with self.timer.time("count_zones"):
+            self.traj.analyze_zones(self.zones, min_samples)
+        return self.traj.get_turning_movements()
+
+    def export_results(self, archive_dir:str):
+        '''Writes tracks, per-track summaries and conflicts to Parquet (see `ArchiveWriter`).'''
+        # Deferred so pandas / pyarrow only load when exporting
+        from conflict_detection.archive import ArchiveWriter
+        return ArchiveWriter(archive_dir).write_all(self.traj, self.ttc)
+
+    def export_geo(self, geo_dir:str, crs:str="EPSG:4326", axis_order:str="latlon", pet_cell_size:float=None, pet_thresh:float=1.5):
+        '''
+        Writes conflict points, track paths and (with `pet_cell_size`, in pixels) PET cells as GeoParquet
+        and GeoJSON in the calibration's world coordinates (see `GeoWriter`). Runs `detect_conflicts()`
+        first if it hasn't been run.
+        '''
+        # Deferred so geopandas only loads when exporting
+        from conflict_detection.archive import GeoWriter
+        if not self.ttc.conflict_history:
+            self.detect_conflicts()
+
+        pet = None
+        if pet_cell_size is not None:
+            pet = PostEncroachmentTime(pet_thresh=pet_thresh)
+            with self.timer.time("pet_cells"):
+                # Simplified tracks are read back at frame rate so they still visit every cell they cross
+                resample = 1 / self.fps if self.traj.simplify_tol is not None else None
+                pet.analyze_cells(list(self.traj.iter_analyzers()), pet_cell_size, resample)
+
+        writer = GeoWriter(geo_dir, self.projector, crs=crs, axis_order=axis_order)
+        with self.timer.time("export_geo"):
+            return writer.write_all(self.traj, self.ttc, pet)
+
+    def update_heatmap(self, heatmap_path:str, resolution:float=None, bounds:tuple=None, axis_order:str="xy"):
+        '''
+        Adds this run's tracks and conflicts to the heatmap at `heatmap_path` (see `HeatmapAccumulator`),
+        creating it on first use with cells of `resolution` world units over `bounds` (default: the
+        calibration's world points); `axis_order="latlon"` for world points in degrees, so speeds come out
+        in m/s. A video already in the heatmap is not added again; camera runs are keyed by their start
+        time. Runs `detect_conflicts()` first if it hasn't been run.
+        '''
+        # Deferred so pandas / pyarrow only load when exporting
+        from pathlib import Path
+        from conflict_detection.archive import HeatmapAccumulator
+        if not self.ttc.conflict_history:
+            self.detect_conflicts()
+
+        if Path(heatmap_path).exists():
+            heatmap = HeatmapAccumulator.load(heatmap_path)
+        elif resolution is None:
+            raise ValueError(f"{heatmap_path} does not exist; pass `resolution` (and optionally `bounds`) to create it.")
+        elif bounds is None:
+            heatmap = HeatmapAccumulator.for_projector(self.projector, resolution, axis_order=axis_order)
+        else:
+            heatmap = HeatmapAccumulator(bounds, resolution, axis_order=axis_order)
+
+        source = f"{self.file_in}@{self.run_started}" if self.live else str(self.file_in)
+        with self.timer.time("update_heatmap"):
+            heatmap.update(self.traj, self.ttc, self.projector, source=source)
+            heatmap.save(heatmap_path)
+        return heatmap
+
+    def export_clips(self, clip_dir:str, pre_seconds:float=2.0, post_seconds:float=2.0):
+        '''
+        Writes a short annotated clip around every conflict (see `ClipExtractor`); a cheaper alternative
+        to `monitor_traffic(file_out=...)` for reviewing long videos. Runs `detect_conflicts()` first if
+        it hasn't been run.
+        '''
+        if not self.ttc.conflict_history:
+            self.detect_conflicts()
+
+        conflicts = self.ttc.get_all_minimum_ttc()
+        extractor = ClipExtractor(self.studio.source, clip_dir, pre_seconds, post_seconds)
+        with self.timer.time("export_clips"):
+            return extractor.extract(conflicts, self.traj.get_analyzer())
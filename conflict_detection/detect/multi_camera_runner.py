@@ -0,0 +1,153 @@
+import time
+
+from typing import Dict
+from pathlib import Path
+
+from .detection_system import DetectionSystem
+from conflict_detection.objects import ObjectDetector
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+class MultiCameraRunner:
+    '''
+    Description
+    -----------
+    Runs several cameras against a single `ObjectDetector`. Frames from all cameras are gathered into
+    shared inference batches and the detections are routed back to each camera's own tracker,
+    `TrajManager` and `TimeToCollision` (one `DetectionSystem` per camera, all sharing the detector).
+
+    Scheduling is weighted round-robin: every camera contributes up to `weights[name]` frames per round
+    and the camera that opens each batch rotates, so no source is systematically served first.
+
+    Parameters
+    ----------
+    cameras : dict
+        name -> dict with `file_in`, `world_pts` and optionally `img_pts` (skips the click step).
+    model_path : str
+    model_conf : float
+    batch_size : int, default = 8
+        Maximum frames per inference batch.
+    weights : dict, optional
+        name -> frames per round (default 1 for every camera).
+    detector : ObjectDetector, optional
+        Shared detector; built from `model_path` / `model_conf` if omitted.
+    **system_kwargs
+        Forwarded to every `DetectionSystem` (e.g. `ttc_thresh`, `min_dist`, `lost_buffer`). The
+        decoded-frame cache defaults to off (`frame_cache_mb=0`) since batched runs never seek.
+        Directories in `PER_CAMERA_DIRS` (e.g. `spill_dir`) get one subdirectory per camera name, so
+        cameras never read back each other's track files or checkpoints.
+    '''
+    # Track ids restart per camera, so per-run files in these directories would collide
+    PER_CAMERA_DIRS = ("spill_dir", "checkpoint_dir")
+
+    def __init__(self, cameras:Dict[str, dict], model_path:str="./models/yolov8n.pt", model_conf:float=0.5, batch_size:int=8, weights:Dict[str, int]=None, detector:ObjectDetector=None, **system_kwargs):
+        if len(cameras) == 0:
+            raise ValueError("At least one camera is required.")
+
+        self.detector = detector if detector is not None else ObjectDetector(model_path=model_path, confidence=model_conf)
+        self.batch_size = batch_size
+        system_kwargs.setdefault("frame_cache_mb", 0)
+        self.weights = {name: max(1, int((weights or {}).get(name, 1))) for name in cameras}
+        self.systems = {
+            name: DetectionSystem(cfg["file_in"], cfg["world_pts"], img_pts=cfg.get("img_pts"), detector=self.detector, **self._camera_kwargs(name, system_kwargs))
+            for name, cfg in cameras.items()
+        }
+        self.frames = {name: 0 for name in cameras}
+        self.batches = 0
+        self.wall_seconds = 0.0
+        self._order = list(cameras)
+        self._active = []
+
+        logger.debug(f"Initialized multi-camera runner for {len(cameras)} cameras.")
+
+    def _camera_kwargs(self, name:str, system_kwargs:dict):
+        '''`system_kwargs` with every shared directory in `PER_CAMERA_DIRS` replaced by `<dir>/<name>`'''
+        return {key: str(Path(value) / name) if key in self.PER_CAMERA_DIRS and value is not None else value for key, value in system_kwargs.items()}
+
+    def monitor_traffic(self):
+        '''Processes every camera to the end of its source, then analyzes each camera's tracks'''
+        for system in self.systems.values():
+            system.studio.set_frame_idx(0)
+        self._active = list(self._order)
+
+        start = time.perf_counter()
+        while self._active:
+            batch = self._gather_batch()
+            if not batch:
+                break
+            self._process_batch(batch)
+            if self.batches % 25 == 0:
+                logger.info(f"Processed {self.batches} batches ({sum(self.frames.values())} frames).")
+        self.wall_seconds += time.perf_counter() - start
+
+        for name, system in self.systems.items():
+            logger.info(f"Camera {name}: collected {len(system.traj)} unique tracks over {self.frames[name]} frames.")
+            with system.timer.time("analyze_tracks"):
+                system.traj.analyze_tracks()
+
+    def detect_conflicts(self):
+        '''Returns name -> minimum TTC per conflicting pair (see `DetectionSystem.detect_conflicts()`)'''
+        return {name: system.detect_conflicts() for name, system in self.systems.items()}
+
+    def report(self):
+        '''Per-camera frames, throughput and stage timings plus batch statistics'''
+        cameras = {}
+        for name, system in self.systems.items():
+            cameras[name] = {
+                "frames": self.frames[name],
+                "frames_per_second": self.frames[name] / self.wall_seconds if self.wall_seconds else None,
+                "stages": system.timer.summary()
+            }
+        total = sum(self.frames.values())
+        return {
+            "cameras": cameras,
+            "batches": self.batches,
+            "mean_batch_size": total / self.batches if self.batches else None,
+            "wall_seconds": self.wall_seconds,
+            "frames_per_second": total / self.wall_seconds if self.wall_seconds else None
+        }
+
+    def _gather_batch(self):
+        '''Reads up to `batch_size` frames using weighted round-robin over the active cameras'''
+        batch = []
+        start = self.batches % len(self._active)
+        order = self._active[start:] + self._active[:start]
+
+        while order and len(batch) < self.batch_size:
+            for name in list(order):
+                for _ in range(self.weights[name]):
+                    if len(batch) == self.batch_size:
+                        break
+                    system = self.systems[name]
+                    with system.timer.time("read"):
+                        ret, frame = system.studio.return_frame()
+                    if not ret:
+                        logger.info(f"Camera {name} finished after {self.frames[name]} frames.")
+                        self._active.remove(name)
+                        order.remove(name)
+                        break
+                    batch.append((name, frame))
+                if len(batch) == self.batch_size:
+                    break
+        return batch
+
+    def _process_batch(self, batch:list):
+        frames = [frame for _, frame in batch]
+
+        start = time.perf_counter()
+        if hasattr(self.detector, "detect_batch"):
+            results = self.detector.detect_batch(frames)
+        else:
+            results = [self.detector.detect(frame) for frame in frames]
+        share = (time.perf_counter() - start) / len(batch)
+        self.batches += 1
+
+        for (name, _), detections in zip(batch, results):
+            system = self.systems[name]
+            system.timer.add("detect", share)
+            with system.timer.time("track"):
+                tracks = system.tracker.track(detections)
+            with system.timer.time("collect"):
+                system.traj.collect_tracks(tracks)
+            self.frames[name] += 1
@@ -40,7 +40,7 @@ class WorldProjector:
         self.H = self._calc_H_mat(self.src_pts, self.dst_pts)
         self.H_I = np.linalg.inv(self.H)
 
-    def project(self, pts:NDArray, direction:Literal["forward", "backward"]):
+    def project(self, pts:NDArray, direction:Literal["forward", "backward"], dtype=np.int32):
         """
         Transform points between camera space and real-world geography space.
         
@@ -50,6 +50,8 @@ class WorldProjector:
             Points to transform in (x, y) pixel coordinates
         direction : {"forward", "backward"}
             "forward" = camera -> real-world, "backward" = real-world -> camera
+        dtype : default = np.int32
+            Output dtype; pass np.float64 to keep sub-unit precision (e.g. for lat / lon output)
             
         Returns
         -------
@@ -65,14 +67,15 @@ class WorldProjector:
         if len(pts) == 0:
             return pts
         
-        pts = np.array([pts], dtype=np.float32)
+        precision = np.float64 if np.dtype(dtype).kind == "f" else np.float32
+        pts = np.array([pts], dtype=precision)
         if pts.ndim == 2:
             pts = pts.reshape(1, -1, 2)
         
         m = self.H if direction == "forward" else self.H_I
 
-        pts = cv2.perspectiveTransform(pts, m)
-        return pts.reshape(-1, 2).astype(np.int32)
+        pts = cv2.perspectiveTransform(pts, m.astype(precision))
+        return pts.reshape(-1, 2).astype(dtype)
     
     def _calc_H_mat(self, src_pts:NDArray, dst_pts:NDArray):
         """
@@ -91,18 +94,19 @@ class WorldProjector:
         Each point correspondence contributes 2 equations to the system.
         With 4 point pairs, we get 8 equations for 8 unknowns (9th fixed to 1).
         """
-        A = np.zeros((9, 9), dtype=np.float32)
+        A = np.zeros((9, 9), dtype=np.float64)
         A[8, 8] = 1
 
-        ui_vi = src_pts[:, :, :].reshape(-1, 2)
-        xi_yi = dst_pts[:, :, :].reshape(-1, 2)
+        # float64: world coordinates such as lat / lon need more precision than float32 offers
+        ui_vi = src_pts[:, :, :].reshape(-1, 2).astype(np.float64)
+        xi_yi = dst_pts[:, :, :].reshape(-1, 2).astype(np.float64)
         DOF = list(range(0, 8, 2))
 
         for dof, (ui, vi), (xi, yi) in zip(DOF, ui_vi, xi_yi):
             A[dof,:] = np.array([-ui, -vi, -1, 0, 0, 0, ui * xi, vi * xi, xi])
             A[dof+1,:] = np.array([0, 0, 0, -ui, -vi, -1, ui * yi, vi * yi, yi])
 
-        b = np.array([0]*8 + [1], dtype=np.float32)
+        b = np.array([0]*8 + [1], dtype=np.float64)
 
         H = np.linalg.solve(A, b).reshape(3, 3)
 
@@ -112,7 +116,8 @@ class WorldProjector:
         '''
         Description
         -----------
-        Private method called upon during object initialization to validate the shape, enforce a point order, and convert the pts dtype to `np.float32`.
+        Private method called upon during object initialization to validate the shape, enforce a point order, and convert the pts dtype to `np.float64`
+        (float32 would round lat / lon to about a metre).
 
         The point order and shape is as follows:
             [[
@@ -151,4 +156,4 @@ class WorldProjector:
                          [bottom_right],
                          [top_right],
                          [top_left]], 
-                         dtype=np.float32).reshape(1, 4, 2)
\ No newline at end of file
+                         dtype=np.float64).reshape(1, 4, 2)
\ No newline at end of file
@@ -1,2 +1,5 @@
 from .object_detector import ObjectDetector
-from .object_tracker import ObjectTracker
\ No newline at end of file
+from .object_tracker import ObjectTracker, TRACKER_BACKENDS
+from .iou_tracker import IoUTracker
+from .detection_cache import DetectionCache
+from .motion_gate import MotionGate
\ No newline at end of file
@@ -0,0 +1,150 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+from pathlib import Path
+from typing import List
+
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+class DetectionCache:
+    '''
+    Description
+    -----------
+    On-disk store of per-frame detections, one compressed `.npz` per (video content, model weights,
+    confidence) key. Detections are kept as flat arrays plus per-frame offsets, so a cached video can be
+    replayed without decoding a single frame.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory holding the cache files; created if missing.
+    '''
+    HASH_INDEX = "hashes.json"
+    CHUNK_SIZE = 8 * 2**20
+
+    def __init__(self, cache_dir:str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._hash_index = self._load_hash_index()
+
+        logger.debug(f"Initialized detection cache at {self.cache_dir}.")
+
+    def key(self, video_path:str, model_path:str, confidence:float):
+        '''Cache key derived from the video content hash, model weights hash and confidence'''
+        video_hash = self.file_hash(video_path)
+        model_hash = self.file_hash(model_path) if os.path.isfile(model_path) else hashlib.blake2b(model_path.encode(), digest_size=16).hexdigest()
+        return hashlib.blake2b(f"{video_hash}:{model_hash}:{confidence:.6f}".encode(), digest_size=16).hexdigest()
+
+    def has(self, key:str):
+        return self._path(key).exists()
+
+    def load(self, key:str):
+        '''Returns `CachedDetections` for `key`'''
+        with np.load(self._path(key), allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        logger.info(f"Loaded {len(arrays['offsets']) - 1} cached frames for key {key}.")
+        return CachedDetections(arrays)
+
+    def recorder(self, key:str, meta:dict=None):
+        '''Returns a `CacheRecorder` that writes to `key` when closed'''
+        return CacheRecorder(self._path(key), meta)
+
+    def file_hash(self, path:str):
+        '''Content hash of a file, memoized on (path, size, mtime) so large videos are only read once'''
+        stat = os.stat(path)
+        index_key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        if index_key in self._hash_index:
+            return self._hash_index[index_key]
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+        self._hash_index[index_key] = digest.hexdigest()
+        (self.cache_dir / self.HASH_INDEX).write_text(json.dumps(self._hash_index, indent=2))
+        return self._hash_index[index_key]
+
+    def _load_hash_index(self):
+        path = self.cache_dir / self.HASH_INDEX
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def _path(self, key:str):
+        return self.cache_dir / f"{key}.npz"
+
+
+class CacheRecorder:
+    '''Accumulates per-frame detections and writes them atomically on `close()`'''
+
+    def __init__(self, path:Path, meta:dict=None):
+        self.path = path
+        self.meta = meta or {}
+        self.offsets = [0]
+        self.xyxy = []
+        self.conf = []
+        self.class_id = []
+        self.class_name = []
+
+    def append(self, detections:List[dict]):
+        for det in detections:
+            self.xyxy.append(det["bbox"])
+            self.conf.append(det["conf"])
+            self.class_id.append(det["class_id"])
+            self.class_name.append(det["class_name"])
+        self.offsets.append(len(self.conf))
+
+    def close(self):
+        names, class_idx = np.unique(np.array(self.class_name, dtype=str), return_inverse=True)
+        meta = {**self.meta, "n_frames": len(self.offsets) - 1}
+
+        tmp = self.path.with_suffix(".tmp.npz")
+        np.savez_compressed(
+            tmp,
+            offsets=np.array(self.offsets, dtype=np.int64),
+            xyxy=np.array(self.xyxy, dtype=np.float32).reshape(-1, 4),
+            conf=np.array(self.conf, dtype=np.float32),
+            class_id=np.array(self.class_id, dtype=np.int16),
+            class_idx=class_idx.astype(np.int16),
+            names=names,
+            meta=np.array(json.dumps(meta))
+        )
+        os.replace(tmp, self.path)
+        logger.info(f"Cached detections for {meta['n_frames']} frames to {self.path}")
+
+
+class CachedDetections:
+    '''Read-only view of a cached video; iterating yields the detection list of every frame in order'''
+
+    def __init__(self, arrays:dict):
+        self.offsets = arrays["offsets"]
+        self.xyxy = arrays["xyxy"]
+        self.conf = arrays["conf"]
+        self.class_id = arrays["class_id"]
+        self.class_idx = arrays["class_idx"]
+        self.names = arrays["names"].tolist()
+        self.meta = json.loads(str(arrays["meta"]))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.get_frame(i)
+
+    def get_frame(self, idx:int):
+        '''Detections of the idx-th (0-based) frame in `ObjectDetector.detect()` format'''
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        xyxy = self.xyxy[start:end].tolist()
+        conf = self.conf[start:end].tolist()
+        class_id = self.class_id[start:end].tolist()
+        class_idx = self.class_idx[start:end].tolist()
+        return [{
+            "bbox": xyxy[i],
+            "conf": conf[i],
+            "class_id": class_id[i],
+            "class_name": self.names[class_idx[i]]
+        } for i in range(end - start)]
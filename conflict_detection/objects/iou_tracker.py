@@ -0,0 +1,155 @@
+import numpy as np
+
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+MATCHERS = ("greedy", "hungarian")
+
+def box_iou(a:np.ndarray, b:np.ndarray):
+    '''Pairwise IoU of (n, 4) and (m, 4) x1, y1, x2, y2 boxes -> (n, m)'''
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+class IoUTracker:
+    '''
+    Description
+    -----------
+    Lightweight multi-object tracker in pure NumPy: every track's box is shifted by its center's
+    constant velocity each frame, predicted boxes are matched to detections by IoU (greedy by default, optimal
+    assignment with `matcher="hungarian"`), and unmatched detections above `activation_thresh` start
+    new tracks. A track is reported once it has been matched `min_hits` times and is dropped after
+    `max_frames_lost` frames without a match. All state is a handful of arrays, so it pickles for
+    checkpoints like the ByteTrack backend.
+
+    Parameters
+    ----------
+    activation_thresh : float, default = 0.25
+    lost_buffer : int, default = 30
+        Frames (at 30 fps) a lost track is kept for re-matching; scaled by fps / 30 like ByteTrack.
+    fps : int, default = 30
+    match_thresh : float, default = 0.2
+        Minimum IoU between a predicted track box and a detection (ByteTrack's default gate).
+    matcher : {"greedy", "hungarian"}, default = "greedy"
+        "hungarian" uses scipy's `linear_sum_assignment` (falls back to greedy if scipy is missing).
+    min_hits : int, default = 2
+    velocity_smoothing : float, default = 0.3
+        Weight of the newest measurement in the exponentially smoothed center velocity; lower values
+        are steadier under box jitter.
+    '''
+    def __init__(self, activation_thresh:float=0.25, lost_buffer:int=30, fps:int=30, match_thresh:float=0.2, matcher:str="greedy", min_hits:int=2, velocity_smoothing:float=0.3):
+        if matcher not in MATCHERS:
+            raise ValueError(f"Invalid matcher: {matcher}. Expected one of {list(MATCHERS)}.")
+
+        self.activation_thresh = activation_thresh
+        self.max_frames_lost = int(fps / 30.0 * lost_buffer)
+        self.match_thresh = match_thresh
+        self.matcher = matcher
+        self.min_hits = min_hits
+        self.velocity_smoothing = velocity_smoothing
+        self.next_id = 1
+
+        self.boxes = np.empty((0, 4), dtype=np.float64)
+        self.velocity = np.empty((0, 2), dtype=np.float64)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.hits = np.empty(0, dtype=np.int64)
+        self.lost = np.empty(0, dtype=np.int64)
+
+    def update(self, xyxy:np.ndarray, confidence:np.ndarray):
+        '''
+        Advances every track one frame and matches it to this frame's detections.
+
+        Returns
+        -------
+        index : np.ndarray
+            Indices of the detections that belong to a reported (confirmed) track
+        track_ids : np.ndarray
+            Their track ids
+        '''
+        xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+        confidence = np.asarray(confidence, dtype=np.float64).reshape(-1)
+
+        # Constant-velocity prediction
+        predicted = self.boxes + np.tile(self.velocity * (self.lost + 1)[:, None], 2)
+        track_idx, det_idx = self._match(box_iou(predicted, xyxy))
+
+        # Matched tracks: smooth the center's per-frame velocity over the frames since they were last seen
+        if len(track_idx):
+            shift = xyxy[det_idx] - self.boxes[track_idx]
+            measured = (shift[:, :2] + shift[:, 2:]) / 2 / (self.lost[track_idx] + 1)[:, None]
+            first = self.hits[track_idx] == 1
+            alpha = np.where(first, 1.0, self.velocity_smoothing)[:, None]
+            self.velocity[track_idx] = alpha * measured + (1 - alpha) * self.velocity[track_idx]
+            self.boxes[track_idx] = xyxy[det_idx]
+            self.hits[track_idx] += 1
+
+        matched = np.zeros(len(self.ids), dtype=bool)
+        matched[track_idx] = True
+        self.lost = np.where(matched, 0, self.lost + 1)
+
+        # Unmatched, confident detections start tracks
+        unmatched = np.ones(len(xyxy), dtype=bool)
+        unmatched[det_idx] = False
+        new = np.flatnonzero(unmatched & (confidence >= self.activation_thresh))
+        new_ids = np.arange(self.next_id, self.next_id + len(new), dtype=np.int64)
+        self.next_id += len(new)
+
+        report = self.hits[track_idx] >= self.min_hits
+        index = det_idx[report]
+        track_ids = self.ids[track_idx][report]
+        if self.min_hits <= 1:
+            index = np.concatenate([index, new])
+            track_ids = np.concatenate([track_ids, new_ids])
+
+        self.boxes = np.vstack([self.boxes, xyxy[new]])
+        self.velocity = np.vstack([self.velocity, np.zeros((len(new), 2))])
+        self.ids = np.concatenate([self.ids, new_ids])
+        self.hits = np.concatenate([self.hits, np.ones(len(new), dtype=np.int64)])
+        self.lost = np.concatenate([self.lost, np.zeros(len(new), dtype=np.int64)])
+
+        # Drop tracks lost for too long, and unconfirmed tracks on their first miss
+        keep = (self.lost <= self.max_frames_lost) & ((self.hits >= self.min_hits) | (self.lost == 0))
+        if not keep.all():
+            self.boxes, self.velocity = self.boxes[keep], self.velocity[keep]
+            self.ids, self.hits, self.lost = self.ids[keep], self.hits[keep], self.lost[keep]
+
+        order = np.argsort(index, kind="stable")
+        return index[order], track_ids[order]
+
+    def _match(self, iou:np.ndarray):
+        '''Returns matched (track indices, detection indices) with IoU >= match_thresh'''
+        if iou.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        if self.matcher == "hungarian":
+            try:
+                from scipy.optimize import linear_sum_assignment
+            except ImportError:
+                logger.warning("scipy is not installed; falling back to greedy IoU matching.")
+                self.matcher = "greedy"
+            else:
+                rows, cols = linear_sum_assignment(-iou)
+                ok = iou[rows, cols] >= self.match_thresh
+                return rows[ok].astype(np.int64), cols[ok].astype(np.int64)
+
+        # Greedy: best remaining pair first
+        rows, cols = np.nonzero(iou >= self.match_thresh)
+        order = np.argsort(-iou[rows, cols], kind="stable")
+        used_rows, used_cols = set(), set()
+        track_idx, det_idx = [], []
+        for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+            if r in used_rows or c in used_cols:
+                continue
+            used_rows.add(r)
+            used_cols.add(c)
+            track_idx.append(r)
+            det_idx.append(c)
+        return np.array(track_idx, dtype=np.int64), np.array(det_idx, dtype=np.int64)
@@ -0,0 +1,118 @@
+import cv2
+import numpy as np
+
+from numpy.typing import NDArray
+
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+MOTION = "motion"
+TRACKING = "tracking"
+STATIC = "static"
+DUPLICATE = "duplicate"
+SKIPPED = (STATIC, DUPLICATE)
+
+class MotionGate:
+    '''
+    Description
+    -----------
+    Cheap pre-filter that decides whether a frame needs inference. Each frame is downscaled to a small
+    blurred grayscale thumbnail and compared with the thumbnail of the last frame that was sent to the
+    detector. Comparing against the last *inferred* frame, not the previous frame, means slow motion
+    adds up until it crosses the threshold instead of being missed one frame at a time.
+
+    A frame is classified as:
+        "duplicate" : identical to the previous frame on a strided full-resolution sample (camera / encoder
+                      stall); skip inference and reuse the previous detections
+        "static"    : fewer than `min_changed` of the pixels inside `roi` changed by more than `diff_thresh`
+                      and no tracks are active; skip inference, nothing is there to detect
+        "tracking"  : static, but tracks are active; run inference so stopped vehicles keep their tracks
+        "motion"    : anything else; run inference
+
+    Parameters
+    ----------
+    width : int, default = 160
+        Thumbnail width; height keeps the aspect ratio.
+    diff_thresh : int, default = 20
+        Per-pixel absolute grayscale difference counted as change.
+    min_changed : float, default = 0.002
+        Fraction of ROI pixels that must change for the frame to count as motion.
+    roi : NDArray, optional
+        Polygon (n, 2) in full-resolution pixel coordinates restricting the analysis region.
+    '''
+    SAMPLE_STRIDE = 4
+
+    def __init__(self, width:int=160, diff_thresh:int=20, min_changed:float=0.002, roi:NDArray=None):
+        self.width = width
+        self.diff_thresh = diff_thresh
+        self.min_changed = min_changed
+        self.roi = None if roi is None else np.asarray(roi, dtype=np.float32).reshape(-1, 2)
+
+        self.counts = {MOTION: 0, TRACKING: 0, STATIC: 0, DUPLICATE: 0}
+        self._mask = None
+        self._mask_pixels = None
+        self._reference = None
+        self._previous = None
+
+        logger.debug("Initialized motion gate.")
+
+    def check(self, frame:NDArray, tracks_active:bool=False):
+        '''
+        Classifies `frame` (see class docstring); "motion" / "tracking" frames become the new reference,
+        so the caller is expected to run inference on them. Use `skip(state)` to test the result.
+        '''
+        thumb = self._thumbnail(frame)
+        # Copied so annotating the frame afterwards can't alter the comparison
+        sample = np.ascontiguousarray(frame[::self.SAMPLE_STRIDE, ::self.SAMPLE_STRIDE])
+
+        if self._previous is not None and self._previous.shape == sample.shape and cv2.norm(sample, self._previous, cv2.NORM_INF) == 0:
+            state = DUPLICATE
+        elif self._reference is None or self._changed(thumb) >= self.min_changed:
+            state = MOTION
+        else:
+            state = TRACKING if tracks_active else STATIC
+
+        if not self.skip(state):
+            self._reference = thumb
+        self._previous = sample
+        self.counts[state] += 1
+        return state
+
+    @staticmethod
+    def skip(state:str):
+        return state in SKIPPED
+
+    def skip_rate(self):
+        total = sum(self.counts.values())
+        return (self.counts[STATIC] + self.counts[DUPLICATE]) / total if total else 0.0
+
+    def summary(self):
+        return {"frames": sum(self.counts.values()), **self.counts, "skip_rate": self.skip_rate()}
+
+    def _changed(self, thumb:NDArray):
+        '''Fraction of ROI pixels that differ from the reference thumbnail by more than `diff_thresh`'''
+        diff = cv2.absdiff(thumb, self._reference)
+        _, changed = cv2.threshold(diff, self.diff_thresh, 255, cv2.THRESH_BINARY)
+        if self._mask is not None:
+            changed = cv2.bitwise_and(changed, self._mask)
+        return cv2.countNonZero(changed) / self._mask_pixels
+
+    def _thumbnail(self, frame:NDArray):
+        h, w = frame.shape[:2]
+        size = (self.width, max(1, round(h * self.width / w)))
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumb = cv2.GaussianBlur(cv2.resize(gray, size, interpolation=cv2.INTER_AREA), (3, 3), 0)
+
+        if self._mask_pixels is None:
+            self._build_mask(thumb.shape, w / size[0], h / size[1])
+        return thumb
+
+    def _build_mask(self, shape:tuple, scale_x:float, scale_y:float):
+        if self.roi is None:
+            self._mask_pixels = shape[0] * shape[1]
+            return
+        self._mask = np.zeros(shape, dtype=np.uint8)
+        pts = np.round(self.roi / [scale_x, scale_y]).astype(np.int32)
+        cv2.fillPoly(self._mask, [pts], 255)
+        self._mask_pixels = max(1, cv2.countNonZero(self._mask))
@@ -1,32 +1,114 @@
 import numpy as np
-from ultralytics import YOLO
+from typing import List
 
+from .detection_cache import DetectionCache
 from conflict_detection.utils import get_logger
 
 logger = get_logger(__name__)
 
 class ObjectDetector:
 
-    def __init__(self, model_path:str="yolov8n.pt", confidence:float=0.5):
-
-        self.model = YOLO(model=model_path, verbose=False)
+    def __init__(self, model_path:str="yolov8n.pt", confidence:float=0.5, cache_dir:str=None):
+        """
+        Parameters
+        ----------
+        model_path : str
+            YOLO weights; only loaded on the first frame that isn't served from the cache
+        confidence : float
+            Minimum detection confidence
+        cache_dir : str, optional
+            Directory for the on-disk detection cache (see `DetectionCache`)
+        """
+        self.model_path = model_path
         self.confidence = confidence
+        self.cache = DetectionCache(cache_dir) if cache_dir is not None else None
+
+        self._model = None
+        self._recorder = None
+        self._replay = None
+        self._replay_idx = 0
 
         logger.debug("Initialied detector.")
 
+    @property
+    def model(self):
+        if self._model is None:
+            # Deferred so importing the package doesn't pull in ultralytics / torch
+            from ultralytics import YOLO
+            self._model = YOLO(model=self.model_path, verbose=False)
+        return self._model
+
+    def open_cache(self, video_path:str, meta:dict=None):
+        '''
+        Looks up cached detections for `video_path`. Returns `CachedDetections` on a hit, in which case
+        `detect()` serves frames from the cache in order; on a miss returns None and `detect()` records
+        every frame until `close_cache()` is called.
+        '''
+        # Drop state left over from a previous video so it is neither replayed nor recorded into
+        self.close_cache(complete=False)
+        self._replay_idx = 0
+        if self.cache is None:
+            return None
+
+        key = self.cache.key(video_path, self.model_path, self.confidence)
+        if self.cache.has(key):
+            logger.info(f"Detection cache hit for {video_path}.")
+            self._replay = self.cache.load(key)
+            return self._replay
+
+        logger.info(f"Detection cache miss for {video_path}; recording detections.")
+        self._recorder = self.cache.recorder(key, {**(meta or {}), "video": str(video_path), "model_path": self.model_path, "confidence": self.confidence})
+        return None
+
+    def close_cache(self, complete:bool=True):
+        '''Writes recorded detections; partial recordings (`complete=False`) are discarded.'''
+        if self._recorder is not None and complete:
+            self._recorder.close()
+        self._recorder = None
+        self._replay = None
+
     def detect(self, frame:np.ndarray):
+        if self._replay is not None and self._replay_idx < len(self._replay):
+            self._replay_idx += 1
+            return self._replay.get_frame(self._replay_idx - 1)
+
         results = self.model(frame, conf=self.confidence, verbose=False)
+        results_lst = self._result_to_dicts(results[0])
+
+        if self._recorder is not None:
+            self._recorder.append(results_lst)
+
+        return results_lst
 
+    def skip_frame(self, detections:List[dict]):
+        '''
+        Accounts for a frame the caller didn't run inference on (e.g. skipped by `MotionGate`) so the
+        detection cache stays frame-aligned: the replay advances one frame and the recorder stores
+        `detections` for it.
+        '''
+        if self._replay is not None and self._replay_idx < len(self._replay):
+            self._replay_idx += 1
+        if self._recorder is not None:
+            self._recorder.append(detections)
+
+    def detect_batch(self, frames:List[np.ndarray]):
+        '''Runs one batched inference over `frames` (may come from different sources); returns one detection list per frame'''
+        if len(frames) == 0:
+            return []
+        results = self.model(frames, conf=self.confidence, verbose=False)
+        return [self._result_to_dicts(result) for result in results]
+
+    def _result_to_dicts(self, result):
         results_lst = []
 
-        if len(results[0].boxes) == 0:
+        if len(result.boxes) == 0:
             logger.debug("No objects detected in frame.")
         else:
-            for box in results[0].boxes:
+            for box in result.boxes:
                 x1, y1, x2, y2 = box.xyxy[0].tolist()
                 conf = box.conf[0].item()
                 class_id = box.cls[0].item()
-                class_name = results[0].names[class_id]
+                class_name = result.names[class_id]
                 box_dict = {
                     "bbox": [x1, y1, x2, y2],
                     "conf": conf,
@@ -34,5 +116,5 @@ class ObjectDetector:
                     "class_name": class_name
                 }
                 results_lst.append(box_dict)
-                    
-        return results_lst
\ No newline at end of file
+
+        return results_lst
@@ -1,14 +1,21 @@
 import numpy as np
-import supervision as sv
+
+from typing import TYPE_CHECKING
+from .iou_tracker import IoUTracker
 from conflict_detection.utils import get_logger
 
+if TYPE_CHECKING:
+    import supervision as sv
+
 logger = get_logger(__name__)
 
+TRACKER_BACKENDS = ("bytetrack", "iou")
+
 class ObjectTracker:
 
-    def __init__(self, activation_thresh:float=0.25, lost_buffer:int=30, fps:int=30):
+    def __init__(self, activation_thresh:float=0.25, lost_buffer:int=30, fps:int=30, backend:str="bytetrack", **backend_kwargs):
         """
-        Initialize ByteTrack tracker
+        Initialize the tracker
         
         Parameters
         ----------
@@ -18,14 +25,33 @@ class ObjectTracker:
             Minimum confidence to start tracking
         lost_buffer : int
             Frames to keep lost tracks alive
+        backend : {"bytetrack", "iou"}
+            "bytetrack" is supervision's ByteTrack (Kalman filter, two-stage matching); "iou" is the
+            built-in pure-NumPy `IoUTracker` (constant-velocity prediction, greedy / Hungarian IoU
+            matching), which doesn't need supervision and is cheaper per frame
+        backend_kwargs
+            Extra `IoUTracker` parameters for the "iou" backend (e.g. matcher="hungarian", match_thresh)
         """
-        self.tracker = sv.ByteTrack(
-            track_activation_threshold=activation_thresh, 
-            lost_track_buffer=lost_buffer, 
-            frame_rate=fps
-        )
+        if backend not in TRACKER_BACKENDS:
+            raise ValueError(f"Invalid tracker backend: {backend}. Expected one of {list(TRACKER_BACKENDS)}.")
+        self.backend = backend
 
-        logger.debug(f"Initialied tracker (fps={fps}).")
+        if backend == "iou":
+            self._sv = None
+            self.tracker = IoUTracker(activation_thresh=activation_thresh, lost_buffer=lost_buffer, fps=fps, **backend_kwargs)
+        else:
+            # Deferred so importing the package doesn't pull in supervision
+            import supervision as sv
+            self._sv = sv
+            self.tracker = sv.ByteTrack(
+                track_activation_threshold=activation_thresh, 
+                lost_track_buffer=lost_buffer, 
+                frame_rate=fps
+            )
+        # ByteTrack scales the lost buffer by fps / 30; a track unseen for longer never comes back
+        self.max_frames_lost = int(fps / 30.0 * lost_buffer)
+
+        logger.debug(f"Initialied {backend} tracker (fps={fps}).")
 
     def track(self, detections:list):
         """
@@ -41,19 +67,64 @@ class ObjectTracker:
         tracks : list of dict
             Detections with track_id added
         """
+        if self.backend == "iou":
+            return self._iou_track(detections)
+
         sv_detections = self._detections_to_sv_detections(detections=detections)
 
         tracked = self.tracker.update_with_detections(sv_detections)
         
         return self._sv_detections_to_dict(tracked, detections)
 
+    def get_state(self):
+        '''The backend name and tracker instance itself (tracked / lost tracks, motion state, id counters); picklable'''
+        return {"backend": self.backend, "tracker": self.tracker, "max_frames_lost": self.max_frames_lost}
+
+    def set_state(self, state:dict):
+        '''Restores `get_state()`, including the backend, so a run resumes with the tracker it was checkpointed with'''
+        # States saved before the backend was recorded: infer it from the tracker instance
+        backend = state.get("backend", "iou" if isinstance(state["tracker"], IoUTracker) else "bytetrack")
+        if backend not in TRACKER_BACKENDS:
+            raise ValueError(f"Invalid tracker backend in state: {backend}. Expected one of {list(TRACKER_BACKENDS)}.")
+        if backend != self.backend:
+            logger.warning(f"Resuming with the {backend} tracker the state was saved with instead of {self.backend}.")
+            self._sv = None
+            if backend == "bytetrack":
+                import supervision as sv
+                self._sv = sv
+            self.backend = backend
+
+        self.tracker = state["tracker"]
+        self.max_frames_lost = state["max_frames_lost"]
+
+    def _iou_track(self, detections:list):
+        '''Runs the IoU backend; tracks keep the detections' own bbox / conf / class, in detection order'''
+        n = len(detections)
+        xyxy = np.array([det["bbox"] for det in detections], dtype=np.float64).reshape(n, 4)
+        conf = np.array([det["conf"] for det in detections], dtype=np.float64)
+
+        index, track_ids = self.tracker.update(xyxy, conf)
+
+        tracks = []
+        for i, track_id in zip(index.tolist(), track_ids.tolist()):
+            det = detections[i]
+            tracks.append({
+                "bbox": [float(v) for v in det["bbox"]],
+                "conf": float(det["conf"]),
+                "class_id": int(det["class_id"]),
+                "class_name": det["class_name"],
+                "track_id": track_id
+            })
+        logger.debug(f"Tracked {len(tracks)} objects.")
+        return tracks
+
     def _detections_to_sv_detections(self, detections:list):
         '''converts detection dict (output of Detector.detect()) to supervision format'''
         n_dims = len(detections)
         
         if n_dims == 0:
             logger.debug("Detections list contains no detections.")
-            return sv.Detections.empty()
+            return self._sv.Detections.empty()
         
         xyxy = np.zeros((n_dims, 4), dtype=np.float32)
         conf = np.zeros(n_dims, dtype=np.float32)
@@ -64,18 +135,21 @@ class ObjectTracker:
             conf[i] = det["conf"]
             class_id[i] = det["class_id"]
 
-        return sv.Detections(
+        return self._sv.Detections(
             xyxy=xyxy,
             confidence=conf,
             class_id=class_id
         )
 
-    def _sv_detections_to_dict(self, sv_detections:sv.Detections, original_detections:list):
+    def _sv_detections_to_dict(self, sv_detections:"sv.Detections", original_detections:list):
         '''Convert supervision detections back to dict format with 'track_id' added'''
         if len(sv_detections) == 0:
             logger.debug("No tracked found. Returning empty list.")
             return []
         
+        # ByteTrack drops / reorders detections, so class names are looked up by class_id
+        class_names = {det["class_id"]: det["class_name"] for det in original_detections}
+
         tracks = []
         for i in range(len(sv_detections)):
             track_id = int(sv_detections.tracker_id[i]) if sv_detections.tracker_id[i] is not None else None
@@ -85,7 +159,7 @@ class ObjectTracker:
                 "bbox": [float(x1), float(y1), float(x2), float(y2)],
                 "conf": float(sv_detections.confidence[i]),
                 "class_id": int(sv_detections.class_id[i]),
-                "class_name": original_detections[i]["class_name"],
+                "class_name": class_names.get(int(sv_detections.class_id[i])),
                 "track_id": track_id
             }
             tracks.append(track_dict)
@@ -1,3 +1,5 @@
 from .time_to_collision import TimeToCollision
 from .post_encroachment_time import PostEncroachmentTime
-from .safety_manager import SafetyManager
\ No newline at end of file
+from .safety_manager import SafetyManager
+from .online_conflicts import OnlineConflictMonitor
+from .threshold_sweep import ThresholdSweep
\ No newline at end of file
@@ -0,0 +1,120 @@
+import time
+import numpy as np
+
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+CONFLICT = "conflict"
+NEAR_MISS = "near_miss"
+
+class OnlineConflictMonitor:
+    '''
+    Description
+    -----------
+    Frame-by-frame TTC for the tracks visible in the latest frame, so conflicts can be reported while
+    the video is still being processed instead of after `TimeToCollision.analyze_all_conflicts()`.
+    Uses the same closest-approach model as `TimeToCollision.calculate_instant_ttc()`, vectorized over
+    all active pairs, with each track's velocity taken over its last `history` samples.
+
+    A pair whose predicted minimum distance is below `min_dist` is a "conflict" when its TTC is at most
+    `ttc_thresh` and a "near_miss" when its TTC is at most `near_miss_thresh`. Repeats for a pair are
+    suppressed for `cooldown` seconds (frame time) unless the pair escalates from near miss to conflict.
+
+    Parameters
+    ----------
+    ttc_thresh : float, default = 1.5
+    min_dist : float, default = 0.5
+    near_miss_thresh : float, optional
+        Defaults to twice `ttc_thresh`.
+    history : int, default = 5
+    cooldown : float, default = 1.0
+    '''
+    def __init__(self, ttc_thresh:float=1.5, min_dist:float=0.5, near_miss_thresh:float=None, history:int=5, cooldown:float=1.0):
+        self.ttc_thresh = ttc_thresh
+        self.min_dist = min_dist
+        self.near_miss_thresh = 2 * ttc_thresh if near_miss_thresh is None else max(near_miss_thresh, ttc_thresh)
+        self.history = max(2, int(history))
+        self.cooldown = cooldown
+        self.counts = {CONFLICT: 0, NEAR_MISS: 0}
+        self._last_emitted = {}
+
+    def update(self, collector):
+        '''Checks the tracks seen in the collector's latest frame; returns the new events (list of dict)'''
+        frame_idx = collector.frame_count
+        active = [tid for tid, last in collector.last_seen.items() if last == frame_idx]
+        state = [self._track_state(tid, collector.trajectories[tid]) for tid in active]
+        state = [s for s in state if s is not None]
+        if len(state) < 2:
+            return []
+
+        ids = [s[0] for s in state]
+        pos = np.array([s[1] for s in state])
+        vel = np.array([s[2] for s in state])
+        timestamp = max(s[3] for s in state)
+
+        i, j = np.triu_indices(len(state), 1)
+        rel_pos = pos[j] - pos[i]
+        rel_vel = vel[j] - vel[i]
+        rel_vel_sqrd = (rel_vel ** 2).sum(axis=1)
+        dot = (rel_pos * rel_vel).sum(axis=1)
+
+        closing = (rel_vel_sqrd > 0) & (dot < 0)
+        ttc = np.divide(-dot, rel_vel_sqrd, out=np.full_like(dot, np.inf), where=closing)
+        distance = np.linalg.norm(rel_pos + rel_vel * np.where(closing, ttc, 0)[:, None], axis=1)
+
+        self._expire(timestamp)
+        events = []
+        for k in np.flatnonzero(closing & (distance < self.min_dist) & (ttc <= self.near_miss_thresh)):
+            a, b = i[k], j[k]
+            level = CONFLICT if ttc[k] <= self.ttc_thresh else NEAR_MISS
+            pair = (ids[a], ids[b]) if ids[a] < ids[b] else (ids[b], ids[a])
+            if not self._should_emit(pair, level, timestamp):
+                continue
+
+            collision = pos[a] + vel[a] * ttc[k]
+            events.append({
+                "type": level,
+                "track_A_id": int(ids[a]),
+                "track_B_id": int(ids[b]),
+                "class_A": state[a][4],
+                "class_B": state[b][4],
+                "ttc": float(ttc[k]),
+                "min_distance": float(distance[k]),
+                "location": [float(collision[0]), float(collision[1])],
+                "position_A": [float(pos[a][0]), float(pos[a][1])],
+                "position_B": [float(pos[b][0]), float(pos[b][1])],
+                "timestamp": float(timestamp),
+                "frame_idx": int(frame_idx),
+                "emitted_at": time.time()
+            })
+            self.counts[level] += 1
+        return events
+
+    def _track_state(self, track_id:int, samples:list):
+        '''(track_id, center, velocity, timestamp, class_name) from the last `history` samples, or None with < 2 samples'''
+        if len(samples) < 2:
+            return None
+        last, first = samples[-1], samples[-min(self.history, len(samples))]
+        center = self._center(last["bbox"])
+        dt = last["timestamp"] - first["timestamp"]
+        velocity = (center - self._center(first["bbox"])) / dt if dt > 0 else np.zeros(2)
+        return track_id, center, velocity, last["timestamp"], last["class_name"]
+
+    def _should_emit(self, pair:tuple, level:str, timestamp:float):
+        previous = self._last_emitted.get(pair)
+        escalated = previous is not None and previous[0] == NEAR_MISS and level == CONFLICT
+        if previous is not None and not escalated and timestamp - previous[1] < self.cooldown:
+            return False
+        self._last_emitted[pair] = (level, timestamp)
+        return True
+
+    def _expire(self, timestamp:float):
+        expired = [pair for pair, (_, ts) in self._last_emitted.items() if timestamp - ts >= self.cooldown]
+        for pair in expired:
+            del self._last_emitted[pair]
+
+    @staticmethod
+    def _center(bbox):
+        x1, y1, x2, y2 = bbox
+        return np.array([(x1 + x2) / 2, (y1 + y2) / 2], dtype=np.float64)
@@ -2,7 +2,7 @@ import numpy as np
 
 from typing import List
 
-from conflict_detection.trajectory import TrajAnalyzer
+from conflict_detection.trajectory import TrajAnalyzer, exclude_stationary
 from conflict_detection.utils import get_logger
 
 logger = get_logger(__name__)
@@ -15,6 +15,9 @@ class PostEncroachmentTime:
         self.pet_thresh = pet_thresh
         self.min_dist = min_dist
         self.conflict_history = {}
+        self.excluded = {"tracks": 0, "pairs": 0}
+        self.cell_history = {}
+        self.cell_size = None
 
         logger.debug("Conflict detector initialized.")
 
@@ -143,7 +146,7 @@ class PostEncroachmentTime:
             results[t_rounded] = self.calculate_instant_ttc(traj_A, traj_B, t_rounded)
         return results
 
-    def analyze_all_conflicts(self, analyzers:List[TrajAnalyzer], start:float=None, end:float=None, step:float=0.1):
+    def analyze_all_conflicts(self, analyzers:List[TrajAnalyzer], start:float=None, end:float=None, step:float=0.1, skip_stationary:bool=True):
         '''
         Calls `._calculate_sweep_ttc()` for every unique TrajAnalyzer() pair in contained 
         within the argument passed for `analyzers`. 
@@ -158,9 +161,17 @@ class PostEncroachmentTime:
         :type end: float
         :param step: Time step between start and end
         :type step: float, default 0.1s
+        :param skip_stationary: Leave fully stationary tracks (see `TrajAnalyzer.is_stationary()`) out of
+            pair generation; the excluded track / pair counts are stored in `excluded`
+        :type skip_stationary: bool, default True
         :return: A dict of dicts with time as the key for each time in the sweep.
         :rtype: dict[dict]
         '''
+        if skip_stationary:
+            analyzers, self.excluded = exclude_stationary(analyzers)
+            if self.excluded["tracks"]:
+                logger.info(f"Excluded {self.excluded['tracks']} stationary tracks ({self.excluded['pairs']} pairs).")
+
         if len(analyzers) < 2:
             logger.warning(f"The argument passed to analyzers must contain 2+ `TrajAnalyzer()` objects to perform TTC calculation.")
             return
@@ -229,6 +240,85 @@ class PostEncroachmentTime:
 
         return results
 
+    def analyze_cells(self, analyzers:List[TrajAnalyzer], cell_size:float=10.0, resample:float=None):
+        '''
+        Grid-based PET. The image is divided into square cells of `cell_size` pixels; for each cell, the
+        tracks that passed through it are ordered by entry time and PET is the gap between one track
+        leaving the cell and the next (different) track entering it (0 if they were in it together).
+        Cells are kept when their smallest PET is at most `pet_thresh`.
+
+        Fully vectorized: each track's cell occupancy intervals come from one sort / reduce over its
+        centers, and successive users of every cell are compared in one pass.
+
+        `resample` (seconds) reads each track at that fixed step by interpolation instead of at its stored
+        points; pass the frame interval for simplified tracks (see `TrajAnalyzer.simplify()`), whose
+        stored points can be too far apart to visit every cell they cross.
+
+        :return: dict of arrays (one entry per cell): cell_x, cell_y (cell indices), track_A_id (first
+            through), track_B_id, pet, time (when track A left the cell); also stored as `cell_history`.
+        '''
+        keys, track_ids, enter, leave = [], [], [], []
+        for traj in analyzers:
+            if len(traj) == 0:
+                continue
+            times = traj._get_value("timestamp")
+            centers = traj.get_centers()
+            if resample is not None and len(traj) >= 2:
+                times = np.minimum(times[0] + np.arange(int((times[-1] - times[0]) / resample) + 1) * resample, times[-1])
+                centers, _, _ = traj.interpolate(times)
+            cells = np.floor(centers / cell_size).astype(np.int64)
+            key = self._cell_key(cells[:, 0], cells[:, 1])
+
+            order = np.argsort(key, kind="stable")
+            key, times = key[order], times[order]
+            starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+            keys.append(key[starts])
+            enter.append(np.minimum.reduceat(times, starts))
+            leave.append(np.maximum.reduceat(times, starts))
+            track_ids.append(np.full(len(starts), traj.track_id, dtype=np.int64))
+
+        columns = ("cell_x", "cell_y", "track_A_id", "track_B_id", "pet", "time")
+        if not keys:
+            self.cell_history = {name: np.array([]) for name in columns}
+            return self.cell_history
+
+        keys, track_ids = np.concatenate(keys), np.concatenate(track_ids)
+        enter, leave = np.concatenate(enter), np.concatenate(leave)
+
+        # Successive users of each cell
+        order = np.lexsort((enter, keys))
+        keys, track_ids, enter, leave = keys[order], track_ids[order], enter[order], leave[order]
+        successive = (keys[1:] == keys[:-1]) & (track_ids[1:] != track_ids[:-1])
+        first = np.flatnonzero(successive)
+        pet = np.maximum(enter[first + 1] - leave[first], 0.0)
+
+        # Smallest PET per cell, then threshold
+        order = np.lexsort((pet, keys[first]))
+        first, pet = first[order], pet[order]
+        best = np.r_[True, keys[first][1:] != keys[first][:-1]] & (pet <= self.pet_thresh)
+        first, pet = first[best], pet[best]
+
+        cell_x, cell_y = self._cell_index(keys[first])
+        self.cell_history = {
+            "cell_x": cell_x,
+            "cell_y": cell_y,
+            "track_A_id": track_ids[first],
+            "track_B_id": track_ids[first + 1],
+            "pet": pet,
+            "time": leave[first]
+        }
+        self.cell_size = cell_size
+        logger.info(f"Found {len(pet)} cells with PET <= {self.pet_thresh}s.")
+        return self.cell_history
+
+    @staticmethod
+    def _cell_key(cell_x, cell_y):
+        return (cell_x << 32) + (cell_y & 0xFFFFFFFF)
+
+    @staticmethod
+    def _cell_index(key):
+        return key >> 32, ((key & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000
+
     def _get_overlap_period(self, traj_A: TrajAnalyzer, traj_B: TrajAnalyzer):
 
         times_A = np.array(traj_A._get_value("timestamp"))
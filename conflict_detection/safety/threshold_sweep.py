@@ -0,0 +1,179 @@
+import numpy as np
+
+from typing import List
+from numpy.typing import NDArray
+
+from conflict_detection.trajectory import TrajAnalyzer, exclude_stationary
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+class ThresholdSweep:
+    '''
+    Description
+    -----------
+    Evaluates a whole grid of (`ttc_thresh`, `min_dist`) combinations from one pass over the tracks,
+    for calibrating thresholds at a new site. `compute()` samples every overlapping pair at the same
+    times as `TimeToCollision.analyze_all_conflicts()` and stores, per sample, the closest-approach
+    time and the separation at that time (vectorized over all samples). `evaluate()` then only compares those
+    arrays against the thresholds, so each extra grid point costs a few array operations.
+
+    A sample is a conflict when the pair is closing, the predicted separation is below `min_dist`
+    and the time to closest approach is at most `ttc_thresh` (as in `OnlineConflictMonitor`).
+    `TimeToCollision` does not apply `ttc_thresh`; `ttc_thresh=np.inf` reproduces its results.
+
+    Parameters
+    ----------
+    step : float, default = 0.1
+        Sampling step in seconds (as in `analyze_all_conflicts()`).
+    '''
+    def __init__(self, step:float=0.1):
+        self.step = step
+        self.pairs = []
+        self.pair_idx = np.empty(0, dtype=np.int64)
+        self.time = np.empty(0)
+        self.ttc = np.empty(0)
+        self.distance = np.empty(0)
+        self.collision = np.empty((0, 2))
+        self.excluded = {"tracks": 0, "pairs": 0}
+
+    def compute(self, analyzers:List[TrajAnalyzer], start:float=None, end:float=None, skip_stationary:bool=True):
+        '''
+        Closest-approach time / separation for every sample of every time-overlapping pair; returns self.
+        Fully stationary tracks are left out with `skip_stationary`, as in `analyze_all_conflicts()`.
+        '''
+        if skip_stationary:
+            analyzers, self.excluded = exclude_stationary(analyzers)
+        analyzers = [traj for traj in analyzers if len(traj) >= 2]
+        self.pairs = []
+        if len(analyzers) < 2:
+            logger.warning("Need 2+ tracks with 2+ positions to sweep thresholds.")
+            return self
+
+        first = np.array([traj._get_value("timestamp")[0] for traj in analyzers])
+        last = np.array([traj._get_value("timestamp")[-1] for traj in analyzers])
+        i, j = np.triu_indices(len(analyzers), 1)
+        pair_start = np.maximum(first[i], first[j]) if start is None else np.full(len(i), float(start))
+        pair_end = np.minimum(last[i], last[j]) if end is None else np.full(len(i), float(end))
+        keep = (np.maximum(first[i], first[j]) <= np.minimum(last[i], last[j])) & (pair_start <= pair_end)
+        i, j, pair_start, pair_end = i[keep], j[keep], pair_start[keep], pair_end[keep]
+
+        pair_idx, times = self._sample_times(pair_start, pair_end)
+        pos_A, vel_A, ok_A = self._interpolate(analyzers, i[pair_idx], times)
+        pos_B, vel_B, ok_B = self._interpolate(analyzers, j[pair_idx], times)
+        ok = ok_A & ok_B
+
+        # Pairs without a single valid sample never conflict; drop them and renumber the rest
+        used, pair_idx = np.unique(pair_idx[ok], return_inverse=True)
+        self.pairs = [(analyzers[a].track_id, analyzers[b].track_id) for a, b in zip(i[used].tolist(), j[used].tolist())]
+        self.pair_idx = pair_idx.astype(np.int64)
+        self.time = times[ok]
+        self.ttc, self.distance, self.collision = self._closest_approach(pos_A[ok], vel_A[ok], pos_B[ok], vel_B[ok])
+        logger.info(f"Swept {len(self.pairs)} pairs ({len(self.time)} samples).")
+        return self
+
+    def evaluate(self, ttc_thresholds:NDArray, min_distances:NDArray):
+        '''
+        Results for every combination of `ttc_thresholds` x `min_distances`.
+
+        Returns
+        -------
+        dict
+            "ttc_thresh" (T,) and "min_dist" (D,) as passed; "conflict_pairs" (T, D) number of conflicting
+            pairs; "conflict_checks" (T, D) number of conflicting samples; "min_ttc" (T, D, n_pairs) each
+            pair's minimum TTC (NaN where the pair doesn't conflict); "pairs" the (track_A_id, track_B_id)
+            of the last axis.
+        '''
+        T = np.asarray(ttc_thresholds, dtype=np.float64).reshape(-1)
+        D = np.asarray(min_distances, dtype=np.float64).reshape(-1)
+        n_pairs = len(self.pairs)
+
+        conflict_pairs = np.zeros((len(T), len(D)), dtype=np.int64)
+        conflict_checks = np.zeros((len(T), len(D)), dtype=np.int64)
+        min_ttc = np.full((len(T), len(D), n_pairs), np.nan)
+        for d, min_dist in enumerate(D):
+            close = self.distance < min_dist
+            # A pair conflicts under ttc_thresh exactly when its minimum TTC among close samples is within it
+            pair_min = np.full(n_pairs, np.inf)
+            np.minimum.at(pair_min, self.pair_idx[close], self.ttc[close])
+            within = (pair_min[None, :] <= T[:, None]) & np.isfinite(pair_min)[None, :]
+
+            conflict_pairs[:, d] = within.sum(axis=1)
+            conflict_checks[:, d] = np.searchsorted(np.sort(self.ttc[close]), T, side="right")
+            min_ttc[:, d, :] = np.where(within, pair_min[None, :], np.nan)
+
+        return {"ttc_thresh": T, "min_dist": D, "conflict_pairs": conflict_pairs, "conflict_checks": conflict_checks, "min_ttc": min_ttc, "pairs": list(self.pairs)}
+
+    def minimum_ttc(self, ttc_thresh:float, min_dist:float):
+        '''Per-pair minima for one combination, in the format of `TimeToCollision.get_all_minimum_ttc()`'''
+        conflict = (self.distance < min_dist) & (self.ttc <= ttc_thresh)
+        idx = np.flatnonzero(conflict)
+        # Smallest TTC per pair, earliest time on ties (like `get_minimum_ttc()`)
+        idx = idx[np.lexsort((self.time[idx], self.ttc[idx], self.pair_idx[idx]))]
+        first = idx[np.r_[True, self.pair_idx[idx][1:] != self.pair_idx[idx][:-1]]] if len(idx) else idx
+
+        return {self.pairs[self.pair_idx[k]]: {
+            "min_ttc": float(self.ttc[k]),
+            "time_of_min": float(self.time[k]),
+            "collision_point": (float(self.collision[k, 0]), float(self.collision[k, 1])),
+            "min_distance": float(self.distance[k])
+        } for k in first.tolist()}
+
+    def _sample_times(self, start:NDArray, end:NDArray):
+        '''
+        The sample times `TimeToCollision._calculate_sweep_ttc()` uses for every pair (`np.linspace` from
+        start to end, rounded to 10 ms, deduplicated), built for all pairs at once. Returns (pair index, time).
+        '''
+        num = ((end - start) / self.step).astype(np.int64) + 1
+        pair_idx = np.repeat(np.arange(len(num)), num)
+        offsets = np.cumsum(num) - num
+        k = np.arange(len(pair_idx)) - offsets[pair_idx]
+
+        # np.linspace: start + k * (end - start) / (num - 1), with the last sample exactly `end`
+        div = np.maximum(num - 1, 1)
+        times = k * ((end - start) / div)[pair_idx] + start[pair_idx]
+        is_last = (k == num[pair_idx] - 1) & (num[pair_idx] > 1)
+        times[is_last] = end[pair_idx][is_last]
+
+        # np.round matches Python's round() except where the scaled value sits on a half; redo those exactly
+        scaled = times * 100
+        rounded = np.round(times, 2)
+        tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        rounded[tie] = [round(float(t), 2) for t in times[tie]]
+
+        # Rounding can map neighbouring samples onto the same time; keep one
+        order = np.lexsort((rounded, pair_idx))
+        pair_idx, rounded = pair_idx[order], rounded[order]
+        unique = np.r_[True, (pair_idx[1:] != pair_idx[:-1]) | (rounded[1:] != rounded[:-1])]
+        return pair_idx[unique], rounded[unique]
+
+    @staticmethod
+    def _interpolate(analyzers:list, track_idx:NDArray, times:NDArray):
+        '''Positions / velocities / validity of track `track_idx[k]` at `times[k]`, one vectorized call per track'''
+        positions = np.full((len(times), 2), np.nan)
+        velocities = np.full((len(times), 2), np.nan)
+        valid = np.zeros(len(times), dtype=bool)
+
+        order = np.argsort(track_idx, kind="stable")
+        bounds = np.flatnonzero(np.r_[True, track_idx[order][1:] != track_idx[order][:-1], True])
+        for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            rows = order[lo:hi]
+            positions[rows], velocities[rows], valid[rows] = analyzers[track_idx[rows[0]]].interpolate(times[rows])
+        return positions, velocities, valid
+
+    @staticmethod
+    def _closest_approach(pos_A:NDArray, vel_A:NDArray, pos_B:NDArray, vel_B:NDArray):
+        '''(ttc, separation, collision point) per sample; ttc / separation are inf where the pair isn't closing'''
+        rel_pos = pos_B - pos_A
+        rel_vel = vel_B - vel_A
+        rel_vel_sqrd = rel_vel[:, 0] ** 2 + rel_vel[:, 1] ** 2
+        dot = rel_pos[:, 0] * rel_vel[:, 0] + rel_pos[:, 1] * rel_vel[:, 1]
+
+        closing = (rel_vel_sqrd != 0) & (dot <= 0)
+        ttc = np.divide(-dot, rel_vel_sqrd, out=np.full_like(dot, np.inf), where=closing)
+        t = np.where(closing, ttc, 0)[:, None]
+
+        future_A = pos_A + vel_A * t
+        future_B = pos_B + vel_B * t
+        distance = np.where(closing, np.sqrt(((future_B - future_A) ** 2).sum(axis=1)), np.inf)
+        return ttc, distance, future_A
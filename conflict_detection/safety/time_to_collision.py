@@ -2,7 +2,7 @@ import numpy as np
 
 from typing import List
 
-from conflict_detection.trajectory import TrajAnalyzer
+from conflict_detection.trajectory import TrajAnalyzer, exclude_stationary
 from conflict_detection.utils import get_logger
 
 logger = get_logger(__name__)
@@ -14,6 +14,7 @@ class TimeToCollision:
         self.ttc_thresh = ttc_thresh
         self.min_dist = min_dist
         self.conflict_history = {}
+        self.excluded = {"tracks": 0, "pairs": 0}
 
         logger.debug("Conflict detector initialized.")
 
@@ -142,7 +143,7 @@ class TimeToCollision:
             results[t_rounded] = self.calculate_instant_ttc(traj_A, traj_B, t_rounded)
         return results
 
-    def analyze_all_conflicts(self, analyzers:List[TrajAnalyzer], start:float=None, end:float=None, step:float=0.1):
+    def analyze_all_conflicts(self, analyzers:List[TrajAnalyzer], start:float=None, end:float=None, step:float=0.1, skip_stationary:bool=True):
         '''
         Calls `._calculate_sweep_ttc()` for every unique TrajAnalyzer() pair in contained 
         within the argument passed for `analyzers`. 
@@ -157,9 +158,17 @@ class TimeToCollision:
         :type end: float
         :param step: Time step between start and end
         :type step: float, default 0.1s
+        :param skip_stationary: Leave fully stationary tracks (see `TrajAnalyzer.is_stationary()`) out of
+            pair generation; the excluded track / pair counts are stored in `excluded`
+        :type skip_stationary: bool, default True
         :return: A dict of dicts with time as the key for each time in the sweep.
         :rtype: dict[dict]
         '''
+        if skip_stationary:
+            analyzers, self.excluded = exclude_stationary(analyzers)
+            if self.excluded["tracks"]:
+                logger.info(f"Excluded {self.excluded['tracks']} stationary tracks ({self.excluded['pairs']} pairs).")
+
         if len(analyzers) < 2:
             logger.warning(f"The argument passed to analyzers must contain 2+ `TrajAnalyzer()` objects to perform TTC calculation.")
             return
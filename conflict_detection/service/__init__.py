@@ -0,0 +1,2 @@
+from .job_queue import JobQueue
+from .worker import Worker, WorkerPool
\ No newline at end of file
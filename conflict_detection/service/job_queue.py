@@ -0,0 +1,139 @@
+import json
+import time
+import sqlite3
+
+from pathlib import Path
+
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    params TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    worker TEXT,
+    error TEXT,
+    result_dir TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    heartbeat REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+class JobQueue:
+    '''
+    Description
+    -----------
+    SQLite-backed job queue shared by any number of worker processes on one machine. A job names a
+    video, a calibration profile and optional threshold overrides. Claiming is atomic (`BEGIN IMMEDIATE`),
+    so two workers never take the same job. Failed jobs go back to the queue until they have used
+    `max_attempts` attempts. Workers `heartbeat()` the job they run, so a job whose worker died anywhere
+    (another pool, a crashed supervisor) can be told apart from one that is simply long.
+
+    Parameters
+    ----------
+    db_path : str
+        SQLite file; created (with its schema) if missing.
+    '''
+    def __init__(self, db_path:str):
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        # Queues created before heartbeats were recorded
+        if "heartbeat" not in {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat REAL")
+
+    def submit(self, video:str, profile:str, params:dict=None, max_attempts:int=3):
+        '''Queues a job; returns its id'''
+        cur = self._conn.execute(
+            "INSERT INTO jobs (video, profile, params, max_attempts, created) VALUES (?, ?, ?, ?, ?)",
+            (str(video), profile, json.dumps(params or {}), max_attempts, time.time())
+        )
+        logger.info(f"Queued job {cur.lastrowid}: {video} ({profile}).")
+        return cur.lastrowid
+
+    def claim(self, worker:str):
+        '''Atomically takes the oldest queued job for `worker`; returns the job dict or None'''
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id LIMIT 1", (QUEUED,)).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, started = ?, heartbeat = ?, error = NULL WHERE id = ?",
+                    (RUNNING, worker, *[time.time()] * 2, row["id"])
+                )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return None if row is None else self.get(row["id"])
+
+    def complete(self, job_id:int, result_dir:str):
+        self._conn.execute("UPDATE jobs SET status = ?, result_dir = ?, finished = ? WHERE id = ?", (DONE, str(result_dir), time.time(), job_id))
+
+    def fail(self, job_id:int, error:str):
+        '''Records `error`; the job is re-queued unless it has used all its attempts'''
+        self._conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, error = ?, finished = ? WHERE id = ?",
+            (QUEUED, FAILED, error, time.time(), job_id)
+        )
+        job = self.get(job_id)
+        logger.warning(f"Job {job_id} attempt {job['attempts']}/{job['max_attempts']} failed ({job['status']}): {error}")
+        return job
+
+    def heartbeat(self, job_id:int):
+        '''Marks running job `job_id` as still being worked on'''
+        self._conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND status = ?", (time.time(), job_id, RUNNING))
+
+    def requeue_orphans(self, live_workers:set, prefix:str, lease:float=None):
+        '''
+        Fails running jobs whose worker is no longer alive and returns their ids: jobs of workers named
+        `prefix...` (one pool's workers) that are not in `live_workers`, and, with `lease`, jobs of any
+        worker whose last heartbeat is more than `lease` seconds old. Jobs held by other live pools are left alone.
+        '''
+        rows = self._conn.execute("SELECT id, worker, COALESCE(heartbeat, started) AS heartbeat FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+        now = time.time()
+        orphans = [
+            row["id"] for row in rows
+            if ((row["worker"] or "").startswith(prefix) and row["worker"] not in live_workers)
+            or (lease is not None and now - row["heartbeat"] > lease)
+        ]
+        for job_id in orphans:
+            self.fail(job_id, "worker exited while running the job")
+        return orphans
+
+    def get(self, job_id:int):
+        row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No job with id {job_id}.")
+        return {**dict(row), "params": json.loads(row["params"])}
+
+    def jobs(self, status:str=None):
+        query, args = ("SELECT id FROM jobs WHERE status = ? ORDER BY id", (status,)) if status else ("SELECT id FROM jobs ORDER BY id", ())
+        return [self.get(row["id"]) for row in self._conn.execute(query, args).fetchall()]
+
+    def counts(self):
+        '''status -> number of jobs'''
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for row in self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        return counts
+
+    def close(self):
+        self._conn.close()
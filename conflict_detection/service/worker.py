@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import socket
+import threading
+import traceback
+import multiprocessing as mp
+
+import numpy as np
+
+from pathlib import Path
+
+from .job_queue import JobQueue, QUEUED, RUNNING
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Job / profile parameters forwarded to `DetectionSystem`
+JOB_PARAMS = ("activation_thresh", "lost_buffer", "ttc_thresh", "min_dist", "finalize_tracks", "motion_gate")
+
+RESULT_FILE = "result.json"
+
+def worker_name(pid:int=None, pool:int=None):
+    '''host:pool:pid, where pool is the supervising process's pid, so every pool on a host has its own prefix'''
+    return f"{pool_prefix(pool or os.getppid())}{pid or os.getpid()}"
+
+def pool_prefix(pool:int=None):
+    return f"{socket.gethostname()}:{pool or os.getpid()}:"
+
+class Worker:
+    '''
+    Description
+    -----------
+    Long-lived job runner. The `ObjectDetector` is built and warmed up once, then every claimed job
+    reuses it: only the tracker, trajectories and safety state are per job. Each job is processed headless
+    with the calibration of its profile, archived to `results_dir/job_{id}/` (see
+    `DetectionSystem.export_results()`) and summarized in `result.json`.
+
+    Parameters
+    ----------
+    queue_path : str
+        `JobQueue` database.
+    profiles : dict
+        name -> dict with `world_pts`, `img_pts` and optional default `JOB_PARAMS` / `model_conf`.
+    results_dir : str
+    model_path : str
+    model_conf : float, default = 0.5
+        Default confidence; a job or profile can override it with `model_conf`.
+    poll_interval : float, default = 1.0
+        Seconds to sleep when the queue is empty.
+    lease : float, default = 300.0
+        Seconds after which a job without heartbeat counts as abandoned; the running job is heartbeat
+        from a background thread every `lease / 5` seconds.
+    '''
+    def __init__(self, queue_path:str, profiles:dict, results_dir:str, model_path:str="./models/yolov8n.pt", model_conf:float=0.5, poll_interval:float=1.0, lease:float=300.0):
+        # Deferred so the supervising process never loads the model stack
+        from conflict_detection.objects import ObjectDetector
+
+        self.queue_path = queue_path
+        self.queue = JobQueue(queue_path)
+        self.lease = lease
+        self.profiles = profiles
+        self.results_dir = Path(results_dir)
+        self.model_conf = model_conf
+        self.poll_interval = poll_interval
+        self.name = worker_name()
+        self.detector = ObjectDetector(model_path=model_path, confidence=model_conf)
+        self.jobs_done = 0
+
+    def warm_up(self):
+        '''Loads the model and runs one inference so the first job doesn't pay for it'''
+        start = time.perf_counter()
+        self.detector.detect(np.zeros((640, 640, 3), dtype=np.uint8))
+        logger.info(f"Worker {self.name} warmed up in {time.perf_counter() - start:.2f}s.")
+
+    def run(self, stop_event=None, max_jobs:int=None):
+        '''Claims and runs jobs until `stop_event` is set (or `max_jobs` jobs have run)'''
+        self.warm_up()
+        while stop_event is None or not stop_event.is_set():
+            if max_jobs is not None and self.jobs_done >= max_jobs:
+                break
+            job = self.queue.claim(self.name)
+            if job is None:
+                time.sleep(self.poll_interval)
+                continue
+            self.run_job(job)
+        self.queue.close()
+
+    def run_job(self, job:dict):
+        '''Runs one claimed job, marking it done or failed (failed jobs are retried by the queue)'''
+        # Deferred for the same reason as the detector
+        from conflict_detection.detect import DetectionSystem
+
+        logger.info(f"Worker {self.name} starting job {job['id']} (attempt {job['attempts']}): {job['video']}")
+        start = time.perf_counter()
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job["id"], done), daemon=True)
+        heartbeat.start()
+        try:
+            profile = self.profiles[job["profile"]]
+            params = {**{k: v for k, v in profile.items() if k not in ("world_pts", "img_pts")}, **job["params"]}
+            self.detector.confidence = params.get("model_conf", self.model_conf)
+
+            system = DetectionSystem(
+                job["video"], np.array(profile["world_pts"], dtype=np.float32), img_pts=np.array(profile["img_pts"], dtype=np.float32),
+                detector=self.detector, frame_cache_mb=0, **{k: params[k] for k in JOB_PARAMS if k in params}
+            )
+            system.monitor_traffic(headless=True)
+            min_ttc = system.detect_conflicts()
+
+            result_dir = self.results_dir / f"job_{job['id']}"
+            system.export_results(result_dir)
+            (result_dir / RESULT_FILE).write_text(json.dumps({
+                "job": job,
+                "worker": self.name,
+                "seconds": time.perf_counter() - start,
+                "tracks": len(system.traj),
+                "conflicts": [{"track_A_id": int(a), "track_B_id": int(b), **{k: (list(v) if isinstance(v, tuple) else v) for k, v in result.items()}} for (a, b), result in min_ttc.items()],
+                "stages": system.timer.summary()
+            }, indent=2, default=float))
+        except Exception as e:
+            logger.debug(traceback.format_exc())
+            self.queue.fail(job["id"], f"{type(e).__name__}: {e}")
+        else:
+            self.queue.complete(job["id"], result_dir)
+            logger.info(f"Worker {self.name} finished job {job['id']} in {time.perf_counter() - start:.1f}s.")
+        finally:
+            done.set()
+            heartbeat.join()
+            self.jobs_done += 1
+
+    def _heartbeat(self, job_id:int, done:threading.Event):
+        # SQLite connections can't be shared across threads
+        queue = JobQueue(self.queue_path)
+        try:
+            while not done.wait(self.lease / 5):
+                queue.heartbeat(job_id)
+        finally:
+            queue.close()
+
+
+def _worker_main(worker_kwargs:dict, stop_event, log_level:str):
+    from conflict_detection.utils import setup_logging
+    setup_logging(log_level=log_level, log_to_file=False, console_output=True)
+    Worker(**worker_kwargs).run(stop_event)
+
+
+class WorkerPool:
+    '''
+    Description
+    -----------
+    Supervises `workers` `Worker` processes sharing one `JobQueue`. The supervisor restarts workers
+    that die (up to `max_restarts` times) and hands their in-flight jobs back to the queue, counted as a
+    failed attempt. Several pools can share a queue: a pool only reclaims its own workers' jobs, plus
+    jobs whose heartbeat is older than `lease` (e.g. left running by a pool that crashed).
+
+    Parameters
+    ----------
+    queue_path, profiles, results_dir, model_path, model_conf, poll_interval, lease
+        See `Worker`.
+    workers : int, default = 2
+    max_restarts : int, default = 10
+    log_level : str, default = "INFO"
+        Logging level inside the worker processes.
+    '''
+    def __init__(self, queue_path:str, profiles:dict, results_dir:str, model_path:str="./models/yolov8n.pt", model_conf:float=0.5, workers:int=2, poll_interval:float=1.0, max_restarts:int=10, log_level:str="INFO", lease:float=300.0):
+        self.queue_path = queue_path
+        self.worker_kwargs = {
+            "queue_path": queue_path, "profiles": profiles, "results_dir": results_dir,
+            "model_path": model_path, "model_conf": model_conf, "poll_interval": poll_interval, "lease": lease
+        }
+        self.lease = lease
+        self.n_workers = workers
+        self.poll_interval = poll_interval
+        self.max_restarts = max_restarts
+        self.log_level = log_level
+        # spawn: forked children would inherit the parent's SQLite connection and torch threads
+        self._ctx = mp.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self.processes = []
+        self.restarts = 0
+
+    def serve(self, until_empty:bool=False):
+        '''
+        Starts the workers and supervises them until interrupted (Ctrl+C, or `stop()` from a signal
+        handler) or, with `until_empty`, until no job is queued or running. Returns the job counts by status.
+        '''
+        queue = JobQueue(self.queue_path)
+        queue.requeue_orphans(set(), pool_prefix(), self.lease)
+        self.processes = [self._spawn() for _ in range(self.n_workers)]
+        logger.info(f"Started {self.n_workers} workers on {self.queue_path}.")
+
+        try:
+            while not self._stop.is_set():
+                time.sleep(self.poll_interval)
+                self._supervise(queue)
+                counts = queue.counts()
+                if until_empty and counts[QUEUED] == 0 and counts[RUNNING] == 0:
+                    break
+        except KeyboardInterrupt:
+            logger.info("Interrupted; stopping workers.")
+        finally:
+            self.stop()
+
+        counts = queue.counts()
+        queue.close()
+        return counts
+
+    def stop(self, timeout:float=30.0):
+        '''Asks workers to finish their current job and exit; terminates any still running after `timeout`'''
+        self._stop.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+    def _supervise(self, queue:JobQueue):
+        for i, process in enumerate(self.processes):
+            if not process.is_alive() and not self._stop.is_set():
+                if self.restarts >= self.max_restarts:
+                    logger.error(f"Workers restarted {self.restarts} times; giving up.")
+                    self._stop.set()
+                    break
+                logger.warning(f"Worker {worker_name(process.pid, os.getpid())} exited with code {process.exitcode}; restarting.")
+                self.processes[i] = self._spawn()
+                self.restarts += 1
+        queue.requeue_orphans({worker_name(p.pid, os.getpid()) for p in self.processes if p.is_alive()}, pool_prefix(), self.lease)
+
+    def _spawn(self):
+        process = self._ctx.Process(target=_worker_main, args=(self.worker_kwargs, self._stop, self.log_level), daemon=True)
+        process.start()
+        return process
@@ -1,3 +1,5 @@
 from .studio_manager import StudioManager
+from .clip_extractor import ClipExtractor
+from .bev_view import BirdsEyeView
 
-__all__ = ["StudioManager"]
\ No newline at end of file
+__all__ = ["StudioManager", "ClipExtractor", "BirdsEyeView"]
\ No newline at end of file
@@ -0,0 +1,181 @@
+import os
+import cv2
+import hashlib
+import numpy as np
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+from numpy.typing import NDArray
+
+from .illustrate import Illustrator
+from .render import Render
+from conflict_detection.utils import get_logger
+
+if TYPE_CHECKING:
+    from conflict_detection.homography import WorldProjector
+
+logger = get_logger(__name__)
+
+# Suggested `map_dir`; maps are only persisted when a directory is passed explicitly
+DEFAULT_MAP_DIR = Path.home() / ".cache" / "conflict_detection" / "bev_maps"
+
+AXIS_ORDERS = ("xy", "latlon", "lonlat")
+
+class BirdsEyeView:
+    '''
+    Description
+    -----------
+    Top-down view of the calibrated region, rendered next to the camera view. The pixel lookup of every
+    BEV pixel (world -> camera, through the calibration's inverse homography) is computed once, converted
+    to OpenCV's fixed-point map format and persisted as a small `.npz` keyed on the calibration, frame
+    size and output size (when `map_dir` is given), so each frame costs one `cv2.remap` instead of a
+    `cv2.warpPerspective`.
+    Output and side-by-side buffers are allocated once and reused every frame.
+
+    The BEV canvas covers the calibration's four world points (plus `margin`) with north up and east to
+    the right, at one scale for both axes. Geographic world points have their longitude scaled by
+    cos(mean latitude) first (local equirectangular approximation), so distances and angles in the BEV
+    are true to the ground.
+
+    Parameters
+    ----------
+    projector : WorldProjector
+    frame_size : tuple
+        Camera (width, height).
+    height : int, optional
+        BEV height in pixels (default: the camera frame height, so the two views line up in a diptych).
+    margin : float, default = 0.0
+        World units (degrees of latitude for geographic points) added around the calibrated region.
+    axis_order : {"xy", "latlon", "lonlat"}, default = "xy"
+        "xy" for planar world coordinates with x east and y north; "latlon" / "lonlat" for degrees in
+        that order, as with the (lat, lon) calibration of `scripts/main.py`.
+    map_dir : str, optional
+        Where remap maps are persisted (e.g. `DEFAULT_MAP_DIR`); without it they are rebuilt for every view.
+    marker_seconds : float, default = 1.0
+        How long a conflict marker stays on the BEV after its event.
+    '''
+    def __init__(self, projector:"WorldProjector", frame_size:tuple, height:int=None, margin:float=0.0, map_dir:str=None, marker_seconds:float=1.0, illustrator:Illustrator=None, render:Render=None, axis_order:str="xy"):
+        if axis_order not in AXIS_ORDERS:
+            raise ValueError(f"Invalid axis_order: {axis_order}. Expected one of {list(AXIS_ORDERS)}.")
+        self.axis_order = axis_order
+        self.projector = projector
+        self.frame_size = tuple(int(v) for v in frame_size)
+        self.marker_seconds = marker_seconds
+        self.draw = illustrator if illustrator is not None else Illustrator(stroke_color=(0, 0, 255))
+        self.render = render if render is not None else Render()
+
+        pts = projector.dst_pts.reshape(-1, 2).astype(np.float64)
+        # world -> (east, north) in a frame with one unit for both axes
+        self.world_to_ground = self._ground_frame(pts)
+        ground = pts @ self.world_to_ground[:2, :2].T
+        emin, nmin = ground.min(axis=0) - margin
+        emax, nmax = ground.max(axis=0) + margin
+        height = int(height) if height is not None else self.frame_size[1]
+        scale = height / (nmax - nmin)
+        self.size = (max(1, int(np.ceil((emax - emin) * scale))), height)
+
+        # world -> BEV pixel (east right, north up), and camera pixel -> BEV pixel
+        ground_to_bev = np.array([[scale, 0, -emin * scale], [0, -scale, nmax * scale], [0, 0, 1]], dtype=np.float64)
+        self.world_to_bev = ground_to_bev @ self.world_to_ground
+        self.M = self.world_to_bev @ projector.H
+
+        self.map1, self.map2 = self._load_maps(Path(map_dir)) if map_dir is not None else self._build_maps()
+        self.bev = np.zeros((self.size[1], self.size[0], 3), dtype=np.uint8)
+        self.diptych = None
+        self.events = []
+
+    def warp(self, frame:NDArray):
+        '''The camera frame seen from above (into the reused BEV buffer; copy it to keep it)'''
+        return cv2.remap(frame, self.map1, self.map2, cv2.INTER_LINEAR, dst=self.bev, borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+
+    def to_bev(self, pts:NDArray):
+        '''Camera pixel (x, y) points -> BEV pixel coordinates (float)'''
+        pts = np.asarray(pts, dtype=np.float64).reshape(1, -1, 2)
+        if pts.shape[1] == 0:
+            return pts.reshape(0, 2)
+        return cv2.perspectiveTransform(pts, self.M).reshape(-1, 2)
+
+    def annotate(self, bev:NDArray, tracks:list, events:list=None, timestamp:float=None):
+        '''
+        Draws every track's box center and id, and a marker at the location of each conflict / near-miss
+        event (`OnlineConflictMonitor` format) for `marker_seconds` after it was raised.
+        '''
+        if events:
+            self.events.extend(events)
+        if timestamp is not None:
+            self.events = [e for e in self.events if timestamp - e["timestamp"] <= self.marker_seconds]
+
+        if tracks:
+            boxes = np.array([track["bbox"] for track in tracks], dtype=np.float64).reshape(-1, 4)
+            centers = np.stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2], axis=1)
+            self.draw.draw_positions(bev, self.to_bev(centers), [track["track_id"] for track in tracks])
+
+        if self.events:
+            points = self.to_bev([e["location"] for e in self.events])
+            for point in points:
+                self.draw.draw_conflict(bev, point)
+        return bev
+
+    def render_frame(self, frame:NDArray, tracks:list, events:list=None, timestamp:float=None):
+        '''
+        Annotated camera view and BEV of `frame` side by side, written into a buffer allocated on the
+        first call (copy the result to keep it). `frame` itself is annotated in place.
+        '''
+        # Warp before the camera view is drawn on, so boxes / labels don't smear across the BEV
+        bev = self.annotate(self.warp(frame), tracks, events, timestamp)
+        if tracks:
+            frame = self.draw.draw_tracks(frame, [track["bbox"] for track in tracks], [(track["track_id"], track["class_name"]) for track in tracks])
+        if self.diptych is None:
+            self.diptych = np.empty((frame.shape[0], frame.shape[1] + bev.shape[1], 3), dtype=np.uint8)
+        return self.render.render_diptych([frame, bev], out=self.diptych)
+
+    def output_size(self):
+        '''(width, height) of `render_frame()` output'''
+        return self.frame_size[0] + self.size[0], self.frame_size[1]
+
+    def key(self):
+        '''Identifies the calibration profile and sizes the remap maps were built for'''
+        digest = hashlib.sha1()
+        digest.update(np.round(self.projector.H, 12).tobytes())
+        digest.update(np.round(self.world_to_bev, 12).tobytes())
+        digest.update(np.array(self.frame_size + self.size, dtype=np.int64).tobytes())
+        digest.update(self.axis_order.encode())
+        return digest.hexdigest()[:16]
+
+    def _ground_frame(self, pts:NDArray):
+        '''3x3 linear map from world coordinates to (east, north)'''
+        if self.axis_order == "xy":
+            return np.eye(3)
+        lat, lon = (0, 1) if self.axis_order == "latlon" else (1, 0)
+        frame = np.zeros((3, 3))
+        frame[0, lon] = np.cos(np.radians(pts[:, lat].mean()))
+        frame[1, lat] = 1.0
+        frame[2, 2] = 1.0
+        return frame
+
+    def _load_maps(self, map_dir:Path):
+        path = map_dir / f"{self.key()}.npz"
+        if path.exists():
+            with np.load(path, allow_pickle=False) as data:
+                logger.debug(f"Loaded BEV maps from {path}")
+                return data["map1"], data["map2"]
+
+        map1, map2 = self._build_maps()
+        try:
+            map_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp.npz")
+            np.savez(tmp, map1=map1, map2=map2)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not persist BEV maps to {path}: {e}")
+        return map1, map2
+
+    def _build_maps(self):
+        '''Camera pixel of every BEV pixel, in the fixed-point format `cv2.remap` reads fastest'''
+        w, h = self.size
+        xs, ys = np.meshgrid(np.arange(w, dtype=np.float64), np.arange(h, dtype=np.float64))
+        grid = np.stack([xs, ys], axis=-1).reshape(1, -1, 2)
+        src = cv2.perspectiveTransform(grid, np.linalg.inv(self.M)).reshape(h, w, 2).astype(np.float32)
+        map1, map2 = cv2.convertMaps(src, None, cv2.CV_16SC2)
+        logger.info(f"Built BEV remap maps ({w}x{h}).")
+        return map1, map2
@@ -0,0 +1,140 @@
+import cv2
+import json
+import numpy as np
+
+from pathlib import Path
+from typing import Dict
+
+from .read import Reader
+from .illustrate import Illustrator
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+class ClipExtractor:
+    '''
+    Description
+    -----------
+    Writes one short annotated clip per detected conflict instead of re-encoding the whole video. Each
+    clip covers `pre_seconds` before to `post_seconds` after the time of minimum TTC, with the
+    conflicting pair boxed and the predicted collision point marked. Clips are written in start-frame
+    order and the reader seeks to each window (see `Reader.set_frame_idx()`), so only the frames that
+    end up in a clip are decoded.
+
+    Parameters
+    ----------
+    source : str or Reader
+        Video the tracks were collected from.
+    clip_dir : str
+        Output directory; clips are named `conflict_{A}_{B}_f{frame}.mp4` and listed in `clips.json`.
+    pre_seconds, post_seconds : float, default = 2.0
+    fourcc : str, default = "mp4v"
+    index_dir : str, optional
+        Seek index location when `source` is a path (see `Reader`); speeds up jumping between clips.
+    '''
+    MANIFEST_FILE = "clips.json"
+
+    def __init__(self, source, clip_dir:str, pre_seconds:float=2.0, post_seconds:float=2.0, fourcc:str="mp4v", index_dir:str=None):
+        self.source = source if isinstance(source, Reader) else Reader(source, index_dir=index_dir)
+        if self.source.source_type != "video":
+            raise ValueError(f"Clip extraction needs a video source, got {self.source.source_type}.")
+
+        self.clip_dir = Path(clip_dir)
+        self.clip_dir.mkdir(parents=True, exist_ok=True)
+        self.pre_frames = int(round(pre_seconds * self.source.fps))
+        self.post_frames = int(round(post_seconds * self.source.fps))
+        self.fourcc = fourcc
+        self.draw = Illustrator(stroke_color=(0, 165, 255), fill_color=(0, 0, 255))
+
+    def extract(self, conflicts:Dict[tuple, dict], analyzers:dict):
+        '''
+        Parameters
+        ----------
+        conflicts : dict
+            (track_A, track_B) -> minimum TTC result (see `TimeToCollision.get_all_minimum_ttc()`).
+        analyzers : dict
+            track_id -> `TrajAnalyzer` (see `TrajManager.get_analyzer()`).
+
+        Returns
+        -------
+        clips : list of dict
+            path, track ids, frame window and min TTC of every clip written (also saved to `clips.json`).
+        '''
+        windows = sorted((self._window(pair, result) + (pair, result) for pair, result in conflicts.items()), key=lambda w: w[0])
+
+        clips = []
+        for start, end, event, pair, result in windows:
+            tracks = [self._frame_boxes(analyzers[track_id], start, end) for track_id in pair]
+            path = self.clip_dir / f"conflict_{pair[0]}_{pair[1]}_f{event}.mp4"
+            written = self._write_clip(path, start, end, tracks, result, f"Tracks {pair[0]} & {pair[1]} | TTC {result['min_ttc']:.2f}s")
+
+            clips.append({
+                "path": path.name,
+                "track_A_id": int(pair[0]),
+                "track_B_id": int(pair[1]),
+                "event_frame": event,
+                "start_frame": start,
+                "end_frame": start + written - 1,
+                "min_ttc": float(result["min_ttc"]),
+                "collision_point": [float(v) for v in result["collision_point"]]
+            })
+
+        (self.clip_dir / self.MANIFEST_FILE).write_text(json.dumps(clips, indent=2))
+        logger.info(f"Wrote {len(clips)} conflict clips to {self.clip_dir}.")
+        return clips
+
+    def _window(self, pair:tuple, result:dict):
+        '''(start, end, event) video frame indices; collector timestamps are frame_count / fps with frame_count starting at 1'''
+        event = max(0, int(round(result["time_of_min"] * self.source.fps)) - 1)
+        start = max(0, event - self.pre_frames)
+        end = event + self.post_frames
+        if self.source.frame_count:
+            end = min(end, self.source.frame_count - 1)
+        return start, end, event
+
+    def _frame_boxes(self, traj, start:int, end:int):
+        '''
+        video frame index -> (bbox, (track_id, class_name)) for one track over frames [start, end]. Centers
+        and sizes are interpolated at every frame's time (see `TrajAnalyzer.interpolate()`), so tracks thinned
+        by `simplify()` or `collapse_stationary()` still get a box on every frame they span.
+        '''
+        if len(traj) == 0:
+            return {}
+
+        frame_idx = traj._get_value("frame_idx") - 1
+        timestamps, classes = traj._get_value("timestamp"), traj._get_value("class_name")
+        frames = np.arange(max(start, frame_idx[0]), min(end, frame_idx[-1]) + 1)
+        if len(traj) == 1:
+            return {int(f): (traj.get_bboxes()[0].tolist(), (traj.track_id, classes[0])) for f in frames}
+
+        times = np.interp(frames, frame_idx, timestamps)
+        centers, _, valid = traj.interpolate(times)
+        sizes = traj._get_value("size")
+        half = np.column_stack([np.interp(times, timestamps, sizes[:, 0]), np.interp(times, timestamps, sizes[:, 1])]) / 2
+        boxes = np.hstack([centers - half, centers + half])
+        # Label of the last stored point at or before each frame
+        labels = np.searchsorted(frame_idx, frames, side="right") - 1
+        return {int(f): (box, (traj.track_id, classes[i])) for f, box, i, ok in zip(frames.tolist(), boxes.tolist(), labels.tolist(), valid.tolist()) if ok}
+
+    def _write_clip(self, path:Path, start:int, end:int, tracks:list, result:dict, text:str):
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*self.fourcc), self.source.fps, (self.source.width, self.source.height))
+
+        self.source.set_frame_idx(start)
+        written = 0
+        for idx in range(start, end + 1):
+            ret, frame = self.source.read()
+            if not ret:
+                break
+
+            present = [track[idx] for track in tracks if idx in track]
+            if present:
+                boxes, labels = zip(*present)
+                frame = self.draw.draw_tracks(frame, np.array(boxes), list(labels))
+            frame = self.draw.draw_conflict(frame, result["collision_point"], text)
+
+            writer.write(frame)
+            written += 1
+
+        writer.release()
+        logger.debug(f"Wrote {written} frames ({start}-{start + written - 1}) to {path}.")
+        return written
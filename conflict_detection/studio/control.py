@@ -31,15 +31,15 @@ class Controller:
                     elif key == ord('-'):
                         self.current_frame = (self.current_frame - 50) + self.last_frame if self.current_frame - 50 <= 0 else self.current_frame - 50
                         logger.info(f"Skipping to frame {self.current_frame}")
-                        self.source.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
+                        self.source.set_frame_idx(self.current_frame)
                     elif key == ord('+'):
                         self.current_frame = (self.current_frame + 50) - self.last_frame if self.current_frame + 50 > self.last_frame else self.current_frame + 50
                         logger.info(f"Skipping to frame {self.current_frame}")
-                        self.source.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
+                        self.source.set_frame_idx(self.current_frame)
                     elif key in [ord('r'), ord('R')]:
                         self.current_frame = 0
                         logger.info("Restarting stream.")
-                        self.source.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
+                        self.source.set_frame_idx(self.current_frame)
 
                 if not self.paused:
                     key = cv2.waitKey(1) & 0xFF
@@ -52,15 +52,15 @@ class Controller:
                     elif key == ord('-'):
                         self.current_frame = (self.current_frame - 50) + self.last_frame if self.current_frame - 50 <= 0 else self.current_frame - 50
                         logger.info(f"Skipping to frame {self.current_frame}")
-                        self.source.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
+                        self.source.set_frame_idx(self.current_frame)
                     elif key == ord('+'):
                         self.current_frame = (self.current_frame + 50) - self.last_frame if self.current_frame + 50 > self.last_frame else self.current_frame + 50
                         logger.info(f"Skipping to frame {self.current_frame}")
-                        self.source.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
+                        self.source.set_frame_idx(self.current_frame)
                     elif key in [ord('r'), ord('R')]:
                         self.current_frame = 0
                         logger.info(f"Restarting stream.")
-                        self.source.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
+                        self.source.set_frame_idx(self.current_frame)
                     
                     self.current_frame += 1
             else:
@@ -10,6 +10,8 @@ class Custodian():
         self.writer = writer
 
     def _clean_up(self):
+        if self.source.live is not None:
+            self.source.live.stop()
         if self.source.cap is not None:
             self.source.cap.release()
             self.source.cap = None
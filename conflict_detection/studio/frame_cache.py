@@ -0,0 +1,54 @@
+import numpy as np
+
+from collections import OrderedDict
+
+class FrameCache:
+    '''
+    Description
+    -----------
+    LRU cache of decoded frames keyed on frame index, bounded by total bytes rather than frame count so
+    the same budget holds for any resolution. Frames are copied on the way in so callers can draw on
+    the frame they were handed without touching the cached one.
+
+    Parameters
+    ----------
+    max_mb : float
+        Memory budget in megabytes; 0 disables the cache.
+    '''
+    def __init__(self, max_mb:float=256):
+        self.max_bytes = int(max_mb * 2**20)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, idx:int):
+        return idx in self._frames
+
+    def get(self, idx:int):
+        '''Returns a copy of cached frame `idx`, or None'''
+        frame = self._frames.get(idx)
+        if frame is None:
+            self.misses += 1
+            return None
+        self._frames.move_to_end(idx)
+        self.hits += 1
+        return frame.copy()
+
+    def put(self, idx:int, frame:np.ndarray):
+        if frame.nbytes > self.max_bytes:
+            return
+        if idx in self._frames:
+            self.nbytes -= self._frames.pop(idx).nbytes
+        self._frames[idx] = frame.copy()
+        self.nbytes += frame.nbytes
+        while self.nbytes > self.max_bytes:
+            _, old = self._frames.popitem(last=False)
+            self.nbytes -= old.nbytes
+
+    def clear(self):
+        self._frames.clear()
+        self.nbytes = 0
@@ -3,18 +3,60 @@ import cv2
 import numpy as np
 
 from typing import List
+from collections import OrderedDict
 
 from conflict_detection.utils import get_logger
 
 logger = get_logger(__name__)
 
+LINE_TYPES = {"aa": cv2.LINE_AA, "fast": cv2.LINE_8}
+
 class Illustrator:
     '''Superimposes shapes/lines on an image'''
 
-    def __init__(self, stroke_color:tuple = (0, 0, 0), fill_color:tuple = (0, 255, 0)):
-        
+    def __init__(self, stroke_color:tuple = (0, 0, 0), fill_color:tuple = (0, 255, 0), line_mode:str = "aa", label_cache_size:int = 1024):
+        '''
+        `line_mode` is "aa" (anti-aliased) or "fast" (8-connected lines, no blending) for throughput runs;
+        `label_cache_size` bounds the number of rasterized track labels kept between frames.
+        '''
+        if line_mode not in LINE_TYPES:
+            raise ValueError(f"Invalid line_mode: {line_mode}. Expected one of {list(LINE_TYPES)}.")
+
         self.stroke_color = self._hex_to_bgr(stroke_color)
         self.fill_color = self._hex_to_bgr(fill_color)
+        self.line_mode = line_mode
+        self.line_type = LINE_TYPES[line_mode]
+        self.label_cache_size = label_cache_size
+        self._label_sprites = OrderedDict()
+
+    def draw_tracks(self, frame:np.ndarray, boxes:np.ndarray, labels:List[tuple]):
+        '''
+        Draws every box of a frame in one pass.
+
+        Parameters
+        ----------
+        frame : np.ndarray
+        boxes : array-like, shape (n, 4)
+            x1, y1, x2, y2 pixel coordinates
+        labels : list of tuple
+            (track_id, class_name) per box; the rasterized label of each pair is cached across frames
+
+        Returns
+        -------
+        frame : np.ndarray
+            Annotated frame (a 3-channel copy if the input was single channel)
+        '''
+        frame = self._channel_checker(frame)
+        if len(boxes) == 0:
+            return frame
+
+        boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        x1, y1, x2, y2 = boxes.T
+        corners = np.stack([x1, y1, x2, y1, x2, y2, x1, y2], axis=1).reshape(-1, 4, 1, 2)
+        cv2.polylines(frame, list(corners), isClosed=True, color=self.stroke_color, thickness=2, lineType=self.line_type)
+
+        self._blit_labels(frame, boxes[:, :2], labels)
+        return frame
 
     def draw_boxes(self, frame:np.ndarray, pt1:tuple, pt2:tuple, class_name:str, conf:float, track_id:int):
         frame = self._channel_checker(frame)
@@ -35,10 +77,94 @@ class Illustrator:
         cv2.putText(frame, text, (int(w // 2) - 80, 10 + (banner_height // 2)), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2, cv2.LINE_AA)
         return frame
     
+    def draw_conflict(self, frame:np.ndarray, collision_point:tuple, text:str=None):
+        '''Marks a predicted collision point and optionally writes `text` in a banner across the top'''
+        frame = self._channel_checker(frame)
+        x, y = int(round(collision_point[0])), int(round(collision_point[1]))
+        cv2.circle(frame, (x, y), 14, self.fill_color, 2, self.line_type)
+        cv2.drawMarker(frame, (x, y), self.fill_color, markerType=cv2.MARKER_TILTED_CROSS, markerSize=18, thickness=2, line_type=self.line_type)
+        if text is not None:
+            frame = self._draw_banner_text(frame, text)
+        return frame
+
+    def draw_positions(self, frame:np.ndarray, points:np.ndarray, track_ids:list=None, radius:int=5):
+        '''Marks each (x, y) point with a filled dot and, with `track_ids`, its id (e.g. track positions on a BEV)'''
+        frame = self._channel_checker(frame)
+        points = np.round(np.asarray(points, dtype=np.float64).reshape(-1, 2)).astype(np.int32)
+        for i, (x, y) in enumerate(points.tolist()):
+            cv2.circle(frame, (x, y), radius, self.stroke_color, -1, self.line_type)
+            if track_ids is not None and track_ids[i] is not None:
+                cv2.putText(frame, str(track_ids[i]), (x + radius + 2, y - radius), cv2.FONT_HERSHEY_SIMPLEX, 0.45, self.stroke_color, 1, self.line_type)
+        return frame
+
+    def draw_heatmap(self, frame:np.ndarray, values:np.ndarray, alpha:float=0.5, colormap:int=cv2.COLORMAP_JET, vmax:float=None):
+        '''
+        Blends `values` (same height / width as `frame`) over the frame as a color map. Cells that are 0 or
+        NaN are left untouched; values are scaled to [0, `vmax`] (default: their maximum).
+        '''
+        frame = self._channel_checker(frame)
+        values = np.asarray(values, dtype=np.float32)
+        mask = np.isfinite(values) & (values > 0)
+        if not mask.any():
+            return frame
+
+        vmax = float(values[mask].max()) if vmax is None else vmax
+        scaled = np.clip(np.nan_to_num(values) / vmax, 0, 1) if vmax > 0 else np.zeros_like(values)
+        colored = cv2.applyColorMap((255 * scaled).astype(np.uint8), colormap)
+        blended = cv2.addWeighted(frame, 1 - alpha, colored, alpha, 0)
+        frame[mask] = blended[mask]
+        return frame
+
     def draw_circles(self, frame:np.ndarray, center_pts:tuple):
         frame = self._channel_checker(frame)
         cv2.drawMarker(frame, center_pts, markerType=cv2.MARKER_CROSS, thickness=2, color=(0, 0, 255))
 
+    def _blit_labels(self, frame:np.ndarray, anchors:np.ndarray, labels:List[tuple]):
+        '''Pastes the cached label sprite of every box into the frame (one C call per label)'''
+        h, w = frame.shape[:2]
+        for (ax, ay), label in zip(anchors.tolist(), labels):
+            color, alpha, inv_alpha, mask, (dy, dx) = self._label_sprite(label)
+            sh, sw = mask.shape
+            y0, x0 = ay - 10 + dy, ax + dx
+
+            # Clip the sprite to the frame
+            top, left = max(0, -y0), max(0, -x0)
+            bottom, right = min(sh, h - y0), min(sw, w - x0)
+            if top >= bottom or left >= right:
+                continue
+
+            roi = frame[y0 + top:y0 + bottom, x0 + left:x0 + right]
+            if self.line_mode == "fast":
+                cv2.copyTo(color[top:bottom, left:right], mask[top:bottom, left:right], roi)
+            else:
+                roi[:] = cv2.blendLinear(color[top:bottom, left:right], roi, alpha[top:bottom, left:right], inv_alpha[top:bottom, left:right])
+
+    def _label_sprite(self, label:tuple):
+        '''
+        Returns the rasterized label of a (track_id, class_name) pair as (color, alpha, 1 - alpha, mask, offset),
+        where offset is the sprite's top-left corner relative to the text origin (LRU cached).
+        '''
+        if label in self._label_sprites:
+            self._label_sprites.move_to_end(label)
+            return self._label_sprites[label]
+
+        track_id, class_name = label
+        text = f"Class:{class_name}, Track: {track_id}"
+        (tw, th), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)
+        pad = 2
+        canvas = np.zeros((th + baseline + 2 * pad, tw + 2 * pad), dtype=np.uint8)
+        cv2.putText(canvas, text, (pad, th + pad), cv2.FONT_HERSHEY_SIMPLEX, 0.5, 255, 2, self.line_type)
+
+        color = np.empty((*canvas.shape, 3), dtype=np.uint8)
+        color[:] = self.stroke_color
+        alpha = canvas.astype(np.float32) / 255
+        sprite = (color, alpha, 1 - alpha, (canvas > 0).astype(np.uint8), (-th - pad, -pad))
+
+        self._label_sprites[label] = sprite
+        if len(self._label_sprites) > self.label_cache_size:
+            self._label_sprites.popitem(last=False)
+        return sprite
+
     def _hex_to_bgr(self, color):
         if isinstance(color, tuple) and len(color) == 3:
             if len(color) == 3:
@@ -0,0 +1,175 @@
+import time
+import threading
+
+from collections import deque
+
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+POLICIES = ("drop_oldest", "every_nth")
+
+class LiveSource:
+    '''
+    Description
+    -----------
+    Background capture for cameras and network streams. A thread keeps draining the driver so its
+    buffer never backs up, and stamps every frame with its capture time (`time.monotonic()` when
+    `grab()` returns). The consumer always gets recent frames and end-to-end latency stays bounded no
+    matter how slow inference is.
+
+    Policies
+    --------
+    "drop_oldest" : frames go into a ring of `buffer_size` (default 1, i.e. always the freshest frame);
+                    when it is full the oldest frame is dropped.
+    "every_nth"   : only every `every_n`-th captured frame is decoded (the rest are grabbed and
+                    discarded), then buffered as above. Keeps a regular effective frame rate of fps / n.
+
+    With `latency_budget` (seconds), frames older than the budget when the consumer asks for them are
+    dropped as stale. Every drop is counted (see `summary()`).
+
+    A stall doesn't end the run: `read()` keeps waiting (logging every `timeout` seconds), and when the
+    driver reports a failed grab the capture thread reopens the source through `reopen` up to
+    `max_reconnects` times in a row, `reconnect_delay` seconds apart. The source only ends once
+    reconnecting fails (or right away without `reopen`).
+
+    Parameters
+    ----------
+    cap : cv2.VideoCapture
+    policy : str, default = "drop_oldest"
+    every_n : int, default = 1
+    latency_budget : float, optional
+    buffer_size : int, default = 1
+    reopen : callable, optional
+        Returns a new `cv2.VideoCapture` for the same source.
+    max_reconnects : int, default = 5
+    reconnect_delay : float, default = 1.0
+    '''
+    def __init__(self, cap, policy:str="drop_oldest", every_n:int=1, latency_budget:float=None, buffer_size:int=1, reopen=None, max_reconnects:int=5, reconnect_delay:float=1.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid policy: {policy}. Expected one of {list(POLICIES)}.")
+
+        self.cap = cap
+        self.policy = policy
+        self.every_n = max(1, int(every_n)) if policy == "every_nth" else 1
+        self.latency_budget = latency_budget
+        self.reopen = reopen
+        self.max_reconnects = max_reconnects
+        self.reconnect_delay = reconnect_delay
+        self.counts = {"captured": 0, "delivered": 0, "overwritten": 0, "stale": 0, "decimated": 0, "reconnects": 0}
+        self.start_time = None
+        self.last_capture_time = None
+
+        self._buffer = deque(maxlen=max(1, int(buffer_size)))
+        self._cond = threading.Condition()
+        self._ended = False
+        self._stopped = False
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._thread = None
+        self._failures = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._capture, name="live-capture", daemon=True)
+            self._thread.start()
+            logger.debug(f"Started live capture ({self.policy}, every_n={self.every_n}, budget={self.latency_budget}).")
+
+    def read(self, timeout:float=5.0):
+        '''Returns (True, frame) for the next frame within the latency budget, or (False, None) once the source has ended'''
+        self.start()
+        waited = 0.0
+        with self._cond:
+            while True:
+                while not self._buffer and not self._ended:
+                    if not self._cond.wait(timeout):
+                        waited += timeout
+                        logger.warning(f"No frame from live source for {waited:.1f}s; still waiting.")
+                if not self._buffer:
+                    return False, None
+
+                capture_time, frame = self._buffer.popleft()
+                age = time.monotonic() - capture_time
+                if self.latency_budget is not None and age > self.latency_budget:
+                    self.counts["stale"] += 1
+                    continue
+
+                self.counts["delivered"] += 1
+                self._latency_total += age
+                self._latency_max = max(self._latency_max, age)
+                self.last_capture_time = capture_time
+                return True, frame
+
+    def timestamp(self):
+        '''Capture time of the last delivered frame in seconds since the first captured frame'''
+        if self.last_capture_time is None:
+            return None
+        return self.last_capture_time - self.start_time
+
+    def stop(self):
+        self._stopped = True
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        # A capture opened by `_reconnect()` belongs to this object; the original one to the `Reader`
+        if self.counts["reconnects"]:
+            self.cap.release()
+
+    def summary(self):
+        '''Capture / delivery / drop counts, drop rate and queueing latency at delivery'''
+        delivered = self.counts["delivered"]
+        dropped = self.counts["overwritten"] + self.counts["stale"]
+        return {
+            **self.counts,
+            "dropped": dropped,
+            "drop_rate": (dropped + self.counts["decimated"]) / self.counts["captured"] if self.counts["captured"] else 0.0,
+            "mean_latency_ms": 1000 * self._latency_total / delivered if delivered else None,
+            "max_latency_ms": 1000 * self._latency_max if delivered else None
+        }
+
+    def _capture(self):
+        while not self._stopped:
+            ok = self.cap.grab()
+            capture_time = time.monotonic()
+            if not ok:
+                if self._reconnect():
+                    continue
+                break
+
+            self._failures = 0
+            if self.start_time is None:
+                self.start_time = capture_time
+            self.counts["captured"] += 1
+            if (self.counts["captured"] - 1) % self.every_n:
+                self.counts["decimated"] += 1
+                continue
+
+            ok, frame = self.cap.retrieve()
+            if not ok:
+                continue
+            with self._cond:
+                if len(self._buffer) == self._buffer.maxlen:
+                    self.counts["overwritten"] += 1
+                self._buffer.append((capture_time, frame))
+                self._cond.notify()
+
+        with self._cond:
+            self._ended = True
+            self._cond.notify_all()
+
+    def _reconnect(self):
+        '''Reopens the source after a failed grab; False once `max_reconnects` attempts in a row failed'''
+        while self.reopen is not None and not self._stopped and self._failures < self.max_reconnects:
+            self._failures += 1
+            logger.warning(f"Live source stalled; reconnecting ({self._failures}/{self.max_reconnects}).")
+            time.sleep(self.reconnect_delay)
+            cap = self.reopen()
+            if cap is None or not cap.isOpened():
+                continue
+            if self.counts["reconnects"]:
+                self.cap.release()
+            self.cap = cap
+            self.counts["reconnects"] += 1
+            return True
+        if self.reopen is not None:
+            logger.error(f"Could not reconnect to live source after {self.max_reconnects} attempts.")
+        return False
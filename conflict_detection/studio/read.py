@@ -1,13 +1,46 @@
 import cv2
 import os
+
+from .seek_index import SeekIndex
+from .frame_cache import FrameCache
+from .live_source import LiveSource
 from conflict_detection.utils import get_logger
 
 logger = get_logger(__name__)
 
+# Schemes that are always live; http(s) URLs may just as well be recorded files, so they are live only with `live=True`
+STREAM_PREFIXES = ("rtsp://", "rtsps://", "rtmp://", "udp://", "tcp://")
+
 class Reader():
 
-    def __init__(self, source):
+    def __init__(self, source, index_dir:str=None, cache_mb:float=0, live_policy:str="drop_oldest", every_n:int=1, latency_budget:float=None, live:bool=None):
+        """
+        Parameters
+        ----------
+        source : str or int
+            Image or video path, or camera index
+        index_dir : str, optional
+            Where video seek indexes are persisted (e.g. `seek_index.DEFAULT_INDEX_DIR`). Building one scans
+            the whole file on first open, so it is opt-in; without it seeks go through the backend.
+        cache_mb : float, default = 0
+            Budget of the decoded-frame LRU used to make rewinds and restarts near-instant; 0 disables it.
+            Only worth it for seek-heavy use such as interactive playback.
+        live_policy, every_n, latency_budget
+            Frame-dropping behaviour for cameras and stream URLs (see `LiveSource`)
+        live : bool, optional
+            Capture in real time through `LiveSource`. Default: True for camera indexes and rtsp / rtmp /
+            udp / tcp URLs, False otherwise (e.g. http(s)-hosted recordings, which are decoded frame by
+            frame); pass True for http(s) camera streams such as MJPEG.
+        """
         self.source = source
+        self.index_dir = index_dir
+        self.index = None
+        self.frames = FrameCache(cache_mb)
+        self.position = 0
+        self._cap_pos = 0
+        self.live = None
+        self._force_live = live
+        self._live_options = {"policy": live_policy, "every_n": every_n, "latency_budget": latency_budget}
         self.source_type = None
         self.name = None
         self.ext = None
@@ -20,7 +53,7 @@ class Reader():
         self._initialize_source()
     
     def _initialize_source(self):
-        if isinstance(self.source, int):
+        if self._is_live_source():
             self._initialize_camera()
         elif isinstance(self.source, str):
             if self._is_image_file():
@@ -30,6 +63,11 @@ class Reader():
         else:
             raise ValueError(f"Invalid source type: {type(self.source)}. Expected str or int.")
 
+    def _is_live_source(self):
+        if self._force_live is not None:
+            return self._force_live
+        return isinstance(self.source, int) or (isinstance(self.source, str) and self.source.lower().startswith(STREAM_PREFIXES))
+
     def _is_image_file(self):
         '''ADD'''
         valid_suffix = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp']
@@ -65,6 +103,12 @@ class Reader():
             self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             self.fps = int(self.cap.get(cv2.CAP_PROP_FPS))
             self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+            # Only local files can be indexed (`SeekIndex.key` stats the file); URLs seek through the backend
+            if self.index_dir is not None and os.path.isfile(self.source):
+                self.index = SeekIndex.open(self.source, self.index_dir)
+            if self.index is not None and len(self.index) > 0:
+                self.frame_count = len(self.index)
             
             _, self.ext = os.path.splitext(os.path.basename(self.source))
             if self.name is None:
@@ -83,14 +127,75 @@ class Reader():
             self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             self.fps = int(self.cap.get(cv2.CAP_PROP_FPS))
+            self.live = LiveSource(self.cap, reopen=lambda: cv2.VideoCapture(self.source), **self._live_options)
 
             if self.name is None:
                 self.name = 'camera_' + str(self.source)
             
             logger.info(f"Successfully opened camera: {self.source} ({self.width}x{self.height}, {self.fps:.1f} FPS)")
 
+    def read(self):
+        '''Returns the frame at the current position and advances; served from the frame cache when possible'''
+        if self.cap is None:
+            return False, None
+
+        if self.source_type == 'camera':
+            return self.live.read()
+
+        idx = self.position
+        frame = self.frames.get(idx)
+        if frame is None:
+            self._seek(idx)
+            ret, frame = self.cap.read()
+            if not ret:
+                return False, None
+            self._cap_pos += 1
+            self.frames.put(idx, frame)
+
+        self.position += 1
+        return True, frame
+
     def set_frame_idx(self, idx:int):
-        if self.cap is not None:
+        '''Moves the read position; the decoder only seeks when the next frame isn't cached'''
+        if self.cap is None:
+            return
+        if self.source_type == 'camera':
+            return
+        self.position = max(0, int(idx))
+
+    def timestamp(self, idx:int=None):
+        '''
+        Presentation time in milliseconds of frame `idx` (default: the last frame read), from the seek
+        index when available. For cameras / streams: capture time of the last frame read, in
+        milliseconds since the first captured frame.
+        '''
+        if self.source_type == 'camera':
+            seconds = self.live.timestamp()
+            return None if seconds is None else 1000.0 * seconds
+
+        idx = self.position - 1 if idx is None else idx
+        if self.index is not None and 0 <= idx < len(self.index):
+            return self.index.timestamp(idx)
+        return 1000.0 * idx / self.fps if self.fps else None
+
+    def _seek(self, idx:int):
+        '''
+        Positions the decoder on frame `idx`. Short forward gaps inside the current GOP are decoded
+        through with `grab()` (no color conversion); anything else jumps to the keyframe at or before
+        `idx` and grabs forward from there, so a seek never decodes more than one GOP.
+        '''
+        if idx == self._cap_pos:
+            return
+
+        if self.index is None:
             self.cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-        else:
-            return
\ No newline at end of file
+            self._cap_pos = idx
+            return
+
+        keyframe = self.index.keyframe_before(idx)
+        if not keyframe <= self._cap_pos < idx:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            self._cap_pos = keyframe
+
+        while self._cap_pos < idx and self.cap.grab():
+            self._cap_pos += 1
\ No newline at end of file
@@ -24,10 +24,22 @@ class Render:
         composite[0:th, :] = triptych
         return composite
 
-    def render_diptych(self, frames:list):
-        diptych = np.hstack(frames)
+    def render_diptych(self, frames:list, out:NDArray=None):
+        '''
+        Two frames side by side, split by a line at the border. `out` (preallocated, height of the frames
+        and their summed width) is filled in place instead of allocating a new array every call.
+        '''
+        if out is None:
+            diptych = np.hstack(frames)
+        else:
+            left, right = frames
+            lw = left.shape[1]
+            out[:, :lw] = left
+            out[:, lw:lw + right.shape[1]] = right
+            diptych = out
         h, w = diptych.shape[:2]
-        cv2.line(diptych, (w // 2, 0), (w // 2, h), (0, 255, 255), 1, cv2.LINE_AA)
+        x = frames[0].shape[1]
+        cv2.line(diptych, (x, 0), (x, h), (0, 255, 255), 1, cv2.LINE_AA)
         return diptych
     
     def render_triptych(self, frames:list):
@@ -38,6 +50,15 @@ class Render:
         cv2.line(triptych, (w - (w // 3), 0), (w - (w // 3), h), (0, 255, 255), 1, cv2.LINE_AA)
         return triptych
     
+    def render_world_grid(self, grid:NDArray, grid_to_world:NDArray, world_to_pixel:NDArray, frame_size:tuple):
+        '''
+        Warps a world-space grid (e.g. a heatmap layer) into camera pixel space. `grid_to_world` maps
+        grid (col, row) to world coordinates, `world_to_pixel` is the calibration's inverse homography and
+        `frame_size` is (width, height). Pixels outside the grid are NaN.
+        '''
+        M = np.asarray(world_to_pixel, dtype=np.float64) @ np.asarray(grid_to_world, dtype=np.float64)
+        return cv2.warpPerspective(np.asarray(grid, dtype=np.float32), M, tuple(int(v) for v in frame_size), flags=cv2.INTER_NEAREST, borderMode=cv2.BORDER_CONSTANT, borderValue=np.nan)
+
     def resize_frame(self, frame:NDArray, max_width:int):
         h, w = frame.shape[:2]
         if w > max_width:
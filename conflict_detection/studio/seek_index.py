@@ -0,0 +1,93 @@
+import os
+import cv2
+import hashlib
+import numpy as np
+
+from pathlib import Path
+
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Suggested `index_dir`; nothing is written anywhere unless a directory is passed explicitly
+DEFAULT_INDEX_DIR = Path.home() / ".cache" / "conflict_detection" / "seek_index"
+
+class SeekIndex:
+    '''
+    Description
+    -----------
+    Per-video keyframe and timestamp index. Built once by scanning the container's packets in raw mode
+    (no decoding) and persisted as a small `.npz` keyed on the video's path, size and mtime, so later
+    opens of the same file load it instantly.
+
+    Parameters
+    ----------
+    keyframes : NDArray
+        Sorted indices of the frames that start a GOP.
+    timestamps : NDArray
+        Presentation time of every frame in milliseconds.
+    '''
+    def __init__(self, keyframes:np.ndarray, timestamps:np.ndarray):
+        self.keyframes = np.asarray(keyframes, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @classmethod
+    def open(cls, video_path:str, index_dir:str):
+        '''Loads the index of `video_path` persisted in `index_dir`, building and saving it on first open. Returns None if the backend can't index the file.'''
+        index_dir = Path(index_dir)
+        path = index_dir / f"{cls.key(video_path)}.npz"
+
+        if path.exists():
+            with np.load(path, allow_pickle=False) as data:
+                return cls(data["keyframes"], data["timestamps"])
+
+        index = cls.build(video_path)
+        if index is None:
+            return None
+
+        try:
+            index_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp.npz")
+            np.savez(tmp, keyframes=index.keyframes, timestamps=index.timestamps)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not persist seek index to {path}: {e}")
+        return index
+
+    @classmethod
+    def build(cls, video_path:str):
+        '''Scans every packet of `video_path` without decoding; returns None if raw stream reading is unsupported'''
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG)
+        try:
+            if not cap.isOpened() or not cap.set(cv2.CAP_PROP_FORMAT, -1):
+                logger.warning(f"Backend cannot read raw packets of {video_path}; seeking without an index.")
+                return None
+
+            keyframes, timestamps = [], []
+            while cap.grab():
+                if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                    keyframes.append(len(timestamps))
+                timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+        finally:
+            cap.release()
+
+        if not keyframes or keyframes[0] != 0:
+            keyframes.insert(0, 0)
+        logger.info(f"Indexed {video_path}: {len(timestamps)} frames, {len(keyframes)} keyframes.")
+        return cls(keyframes, timestamps)
+
+    @staticmethod
+    def key(video_path:str):
+        stat = os.stat(video_path)
+        return hashlib.blake2b(f"{os.path.abspath(video_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode(), digest_size=16).hexdigest()
+
+    def keyframe_before(self, idx:int):
+        '''Index of the last keyframe at or before frame `idx`'''
+        return int(self.keyframes[np.searchsorted(self.keyframes, idx, side="right") - 1])
+
+    def timestamp(self, idx:int):
+        '''Presentation time of frame `idx` in milliseconds'''
+        return float(self.timestamps[idx])
@@ -17,11 +17,11 @@ logger = get_logger(__name__)
 
 class StudioManager():
     
-    def __init__(self, source:Union[str, int]):
+    def __init__(self, source:Union[str, int], line_mode:str="aa", frame_cache_mb:float=0, seek_index_dir:str=None, live_policy:str="drop_oldest", every_n:int=1, latency_budget:float=None, live:bool=None):
 
-        self.source = Reader(source)
+        self.source = Reader(source, index_dir=seek_index_dir, cache_mb=frame_cache_mb, live_policy=live_policy, every_n=every_n, latency_budget=latency_budget, live=live)
         self.write = Writer(self.source)
-        self.draw = Illustrator(stroke_color=(0, 0, 255))
+        self.draw = Illustrator(stroke_color=(0, 0, 255), line_mode=line_mode)
         self.render = Render()
         self.playback = Controller(self.source)
         self.clean = Custodian(self.source, self.write)
@@ -33,15 +33,7 @@ class StudioManager():
         if self.source.source_type == 'image':
             return True, self.source.image
         
-        if self.source.cap is None:
-            return False, None
-
-        ret, frame = self.source.cap.read()
-        
-        if ret:
-            return True, frame
-        else:
-            return False, None
+        return self.source.read()
         
     def get_metadata(self):
         '''Returns fps, height, and width of media object'''
@@ -52,11 +44,17 @@ class StudioManager():
     def source_type(self):
         return self.source.source_type
     
+    def capture_timestamp(self):
+        '''Capture time (seconds since the first frame) of the last frame from a camera / stream, else None'''
+        if self.source.live is None:
+            return None
+        return self.source.live.timestamp()
+
     def get_name(self):
         return self.source.name
     
-    def create_writer(self, file_out_name:str, fourcc:str):
-        self.write._initialize_writer(file_out_name, fourcc)
+    def create_writer(self, file_out_name:str, fourcc:str, frame_size:tuple=None):
+        self.write._initialize_writer(file_out_name, fourcc, frame_size)
 
     def write_frame(self, frame:NDArray):
         if self.write.writer is not None:
@@ -74,13 +72,12 @@ class StudioManager():
         return self.playback.playback_controls()
     
     def draw_tracked_objects(self, frame:NDArray, tracks:List[dict]):
-        if len(tracks) != 0:
-            for track in tracks:
-                x1, y1, x2, y2 = map(int, track["bbox"])
-                class_name = track["class_name"]
-                conf = track["conf"]
-                track_id = track["track_id"]
-                frame = self.draw.draw_boxes(frame, (x1, y1), (x2, y2), class_name, conf, track_id)
+        '''Draws all tracks of a frame in one batched pass; returns the annotated frame'''
+        if len(tracks) == 0:
+            return frame
+        boxes = [track["bbox"] for track in tracks]
+        labels = [(track["track_id"], track["class_name"]) for track in tracks]
+        return self.draw.draw_tracks(frame, boxes, labels)
 
     def release_all_resources(self):
         self.clean._clean_up()
@@ -15,7 +15,9 @@ class Writer():
     def write_frame(self, frame):
         self.writer.write(frame)
 
-    def _initialize_writer(self, file_out_name, fourcc:str):
+    def _initialize_writer(self, file_out_name, fourcc:str, frame_size:tuple=None):
+        '''`frame_size` (width, height) defaults to the source's; composites such as the BEV diptych are wider'''
         fourcc = cv2.VideoWriter_fourcc(*fourcc)
-        self.writer = cv2.VideoWriter(file_out_name, fourcc, self.fps, (self.width, self.height))
+        frame_size = tuple(frame_size) if frame_size is not None else (self.width, self.height)
+        self.writer = cv2.VideoWriter(file_out_name, fourcc, self.fps, frame_size)
         logger.debug("Successfully initialized writer object")
\ No newline at end of file
@@ -1,3 +1,5 @@
 from .traj_collector import TrajCollector
 from .traj_analyzer import TrajAnalyzer
-from .traj_manager import TrajManager
\ No newline at end of file
+from .traj_manager import TrajManager
+from .zone_map import ZoneMap
+from .stationary import exclude_stationary
\ No newline at end of file
@@ -0,0 +1,71 @@
+import numpy as np
+from numpy.typing import NDArray
+
+SIMPLIFY_METHODS = ("sed", "rdp")
+
+def simplify_mask(timestamps:NDArray, centers:NDArray, tolerance:float, max_gap:float=None, method:str="sed"):
+    '''
+    Ramer-Douglas-Peucker over a timestamped track; returns a boolean mask of the points to keep.
+
+    Parameters
+    ----------
+    timestamps : NDArray
+        (n,) sorted timestamps.
+    centers : NDArray
+        (n, 2) positions.
+    tolerance : float
+        Largest error allowed for a dropped point, in position units.
+    max_gap : float, optional
+        Largest time allowed between two kept points; longer segments are split at the point nearest
+        their midpoint even when every point is within `tolerance`.
+    method : str, default = "sed"
+        "sed": time-aware, the error is the distance between a point and the position linearly
+        interpolated in time between the kept neighbours (what `TrajAnalyzer` returns for its timestamp),
+        so the simplified track never strays more than `tolerance` from the original at any point's time.
+        "rdp": classic, the perpendicular distance to the line through the kept neighbours; keeps the
+        shape but not the timing, so stop-and-go tracks can be off by far more than `tolerance` in time.
+    '''
+    if method not in SIMPLIFY_METHODS:
+        raise ValueError(f"Unknown simplification method {method!r}; expected one of {SIMPLIFY_METHODS}.")
+
+    n = len(timestamps)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, -1]] = n > 0
+
+    # Explicit stack instead of recursion: long stop-and-go tracks can split thousands of times
+    stack = [(0, n - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2:
+            continue
+
+        error = _segment_error(timestamps, centers, lo, hi, method)
+        split = int(np.argmax(error))
+        if error[split] <= tolerance:
+            if max_gap is None or timestamps[hi] - timestamps[lo] <= max_gap:
+                continue
+            split = int(np.argmin(np.abs(timestamps[lo + 1:hi] - (timestamps[lo] + timestamps[hi]) / 2)))
+
+        mid = lo + 1 + split
+        keep[mid] = True
+        stack.append((lo, mid))
+        stack.append((mid, hi))
+    return keep
+
+def _segment_error(timestamps:NDArray, centers:NDArray, lo:int, hi:int, method:str):
+    '''Error of every point strictly between `lo` and `hi` against the segment [lo, hi]'''
+    start, end = centers[lo], centers[hi]
+    points = centers[lo + 1:hi]
+
+    if method == "sed":
+        delta = timestamps[hi] - timestamps[lo]
+        # Same convention as `TrajAnalyzer.interpolate()` for repeated timestamps
+        factor = (timestamps[lo + 1:hi] - timestamps[lo]) / delta if delta != 0 else np.ones(hi - lo - 1)
+        expected = start + factor[:, None] * (end - start)
+        return np.hypot(points[:, 0] - expected[:, 0], points[:, 1] - expected[:, 1])
+
+    direction = end - start
+    length = np.hypot(direction[0], direction[1])
+    if length == 0:
+        return np.hypot(points[:, 0] - start[0], points[:, 1] - start[1])
+    return np.abs(direction[0] * (points[:, 1] - start[1]) - direction[1] * (points[:, 0] - start[0])) / length
@@ -0,0 +1,56 @@
+import numpy as np
+from numpy.typing import NDArray
+
+def stationary_intervals(timestamps:NDArray, centers:NDArray, speed_thresh:float, window:float=1.0, min_duration:float=2.0):
+    '''
+    Intervals where a track stands still; returns a (k, 2) array of first / last point indices.
+
+    Speed is measured over windows rather than between frames, so detector jitter doesn't read as
+    motion: for every point, the displacement to the last point within `window` seconds after it,
+    divided by the time between the two (all points at once through one `searchsorted`). Every point
+    inside a window whose speed is at most `speed_thresh` is stationary; runs of stationary points
+    lasting at least `min_duration` seconds are returned. Windows cut short by the end of the track
+    count once they span half of `window`.
+
+    Parameters
+    ----------
+    timestamps : NDArray
+        (n,) sorted timestamps.
+    centers : NDArray
+        (n, 2) positions.
+    speed_thresh : float
+        Position units per second.
+    window : float, default = 1.0
+        Seconds.
+    min_duration : float, default = 2.0
+        Seconds.
+    '''
+    n = len(timestamps)
+    if n < 2:
+        return np.empty((0, 2), dtype=np.int64)
+
+    end = np.searchsorted(timestamps, timestamps + window, side="right") - 1
+    span = timestamps[end] - timestamps
+    distance = np.hypot(centers[end, 0] - centers[:, 0], centers[end, 1] - centers[:, 1])
+    slow = np.flatnonzero((span > 0) & (span >= window / 2) & (distance <= speed_thresh * span))
+
+    # Points covered by at least one slow window
+    cover = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(cover, slow, 1)
+    np.add.at(cover, end[slow] + 1, -1)
+    stationary = np.cumsum(cover[:-1]) > 0
+
+    edges = np.diff(np.r_[0, stationary.astype(np.int8), 0])
+    first, last = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+    long_enough = timestamps[last] - timestamps[first] >= min_duration
+    return np.column_stack([first[long_enough], last[long_enough]])
+
+def exclude_stationary(analyzers:list):
+    '''
+    Splits off fully stationary tracks (see `TrajAnalyzer.is_stationary()`) before pair generation.
+    Returns (remaining analyzers, {"tracks": excluded tracks, "pairs": pairs no longer generated}).
+    '''
+    remaining = [traj for traj in analyzers if not traj.is_stationary()]
+    n, kept = len(analyzers), len(remaining)
+    excluded = {"tracks": n - kept, "pairs": n * (n - 1) // 2 - kept * (kept - 1) // 2}
+    return remaining, excluded
@@ -2,6 +2,8 @@ import numpy as np
 from typing import List
 from collections import Counter
 
+from .simplify import simplify_mask
+from .stationary import stationary_intervals
 from conflict_detection.utils import get_logger
 
 logger = get_logger(__name__)
@@ -17,13 +19,11 @@ class TrajAnalyzer:
             Each dict has: bbox, timestamp, frame_idx, class_name, conf
         """
         self.track_id = track_id
-        self.positions = self._initialize_positions(positions)
+        self._columns = self._initialize_positions(positions)
+        # One row per collapsed stationary interval: start, end, center x, center y
+        self._dwells = np.empty((0, 4))
 
-        self._speed_cache = None
-        self._path_length_cache = None
-        self._segment_speeds = {}
-        self._instant_positions = {}
-        self._instant_velocity = {}
+        self._reset_caches()
         
         logger.debug(f"Initialized trajectory analyzer for Track {self.track_id}.")
 
@@ -70,6 +70,102 @@ class TrajAnalyzer:
         else:
             return self._instant_velocity[time]
 
+    def interpolate(self, times:np.ndarray):
+        '''
+        Vectorized `calculate_instant_position()` / `calculate_instant_velocity()` for many times at once
+        (uncached). Returns (positions (n, 2), velocities (n, 2), valid (n,)); rows where `valid` is False
+        (time outside the track, or fewer than 2 positions) are NaN.
+        '''
+        times = np.asarray(times, dtype=np.float64).reshape(-1)
+        positions = np.full((len(times), 2), np.nan)
+        velocities = np.full((len(times), 2), np.nan)
+        if not self._sufficient_data():
+            return positions, velocities, np.zeros(len(times), dtype=bool)
+
+        timestamps = self._get_value("timestamp")
+        centers = self.get_centers()
+        valid = (times >= timestamps.min()) & (times <= timestamps.max())
+        t = times[valid]
+
+        idx = np.searchsorted(timestamps, t)
+        exact = timestamps[np.minimum(idx, len(timestamps) - 1)] == t
+        # Same segment choice as the scalar methods: [idx - 1, idx], the first segment at the first timestamp
+        seg = np.maximum(idx, 1)
+        ts1, ts2 = timestamps[seg - 1], timestamps[seg]
+        delta = ts2 - ts1
+        factor = np.divide(t - ts1, delta, out=np.ones_like(t), where=delta != 0)
+
+        c1, c2 = centers[seg - 1], centers[seg]
+        interpolated = c1 + factor[:, None] * (c2 - c1)
+        positions[valid] = np.where(exact[:, None], centers[np.minimum(idx, len(timestamps) - 1)], interpolated)
+        velocities[valid] = np.divide(c2 - c1, delta[:, None], out=np.zeros_like(c1), where=delta[:, None] != 0)
+        return positions, velocities, valid
+
+    def simplify(self, tolerance:float, max_gap:float=None, method:str="sed"):
+        '''
+        Drops, in place, the points that interpolating between the remaining ones reproduces to within
+        `tolerance` (see `simplify_mask()`). Per-point class labels are replaced by the track's stable class,
+        so `get_stable_class()` is unchanged. Returns {"points", "kept", "ratio", "max_error"}, where
+        `max_error` is the largest distance between an original point and the simplified track at its time.
+        '''
+        n = len(self)
+        if n <= 2:
+            return {"points": n, "kept": n, "ratio": 1.0, "max_error": 0.0}
+
+        timestamps, centers = self._get_value("timestamp"), self.get_centers()
+        keep = simplify_mask(timestamps, centers, tolerance, max_gap, method)
+        kept = int(keep.sum())
+        dx = np.interp(timestamps, timestamps[keep], centers[keep, 0]) - centers[:, 0]
+        dy = np.interp(timestamps, timestamps[keep], centers[keep, 1]) - centers[:, 1]
+
+        stable_class = self.get_stable_class()
+        self._columns = {key: [stable_class] * kept if key == "class_name" else column[keep] for key, column in self._columns.items()}
+        self._reset_caches()
+        return {"points": n, "kept": kept, "ratio": n / kept, "max_error": float(np.hypot(dx, dy).max())}
+
+    def collapse_stationary(self, speed_thresh:float, window:float=1.0, min_duration:float=2.0):
+        '''
+        Finds the intervals where the track stands still (see `stationary_intervals()`) and stores each as
+        one dwell record, in place: only the first and last point of an interval are kept, both moved to
+        its mean position, so interpolating inside it returns that position with zero velocity.
+        Returns the new dwell records (see `get_dwells()`).
+        '''
+        timestamps, centers = self._get_value("timestamp"), self.get_centers()
+        intervals = stationary_intervals(timestamps, centers, speed_thresh, window, min_duration)
+        if len(intervals) == 0:
+            return []
+
+        first, last = intervals[:, 0], intervals[:, 1]
+        cumulative = np.r_[np.zeros((1, 2)), np.cumsum(centers, axis=0)]
+        mean = (cumulative[last + 1] - cumulative[first]) / (last - first + 1)[:, None]
+        dwells = np.column_stack([timestamps[first], timestamps[last], mean])
+
+        # Drop every point strictly inside an interval
+        inside = np.zeros(len(self) + 1, dtype=np.int64)
+        np.add.at(inside, first + 1, 1)
+        np.add.at(inside, last, -1)
+        keep = np.cumsum(inside[:-1]) == 0
+
+        centers = centers.copy()
+        centers[first], centers[last] = mean, mean
+        self._columns["center"] = centers
+        self._columns = {key: [column[i] for i in np.flatnonzero(keep)] if key == "class_name" else column[keep] for key, column in self._columns.items()}
+        self._dwells = np.vstack([self._dwells, dwells])
+        self._dwells = self._dwells[np.argsort(self._dwells[:, 0], kind="stable")]
+        self._reset_caches()
+        return self._dwell_records(dwells)
+
+    def get_dwells(self):
+        '''Collapsed stationary intervals as dicts of start, end, duration and center'''
+        return self._dwell_records(self._dwells)
+
+    def is_stationary(self):
+        '''True when one collapsed stationary interval spans the whole track'''
+        if len(self._dwells) != 1 or len(self) == 0:
+            return False
+        timestamps = self._get_value("timestamp")
+        return bool(self._dwells[0, 0] <= timestamps[0] and self._dwells[0, 1] >= timestamps[-1])
+
     def calculate_path_length(self):
         '''Get total path length of a tracked object (cached operation).'''        
         if self._path_length_cache is None:
@@ -83,20 +179,74 @@ class TrajAnalyzer:
 
     def get_stable_class(self):
         '''Return most common class across trajectory'''
-        if len(self.positions) == 0:
+        if len(self) == 0:
             return None
         
         classes = self._get_value("class_name")
         return Counter(classes).most_common(1)[0][0]
 
     def get_centers(self):
-        return np.array(self._get_value("center"))
+        return self._columns["center"]
+
+    def get_bboxes(self):
+        '''Returns (n, 4) array of x1, y1, x2, y2 rebuilt from centers and sizes'''
+        half = self._columns["size"] / 2
+        return np.hstack([self._columns["center"] - half, self._columns["center"] + half])
+
+    @property
+    def positions(self):
+        '''Sorted / deduped positions as a list of dicts (center, size, timestamp, frame_idx, class_name, conf)'''
+        cols = self._columns
+        return [{
+            "center": tuple(center),
+            "size": tuple(size),
+            "timestamp": timestamp,
+            "frame_idx": frame_idx,
+            "class_name": class_name,
+            "conf": conf
+        } for center, size, timestamp, frame_idx, class_name, conf in zip(
+            cols["center"].tolist(), cols["size"].tolist(), cols["timestamp"].tolist(),
+            cols["frame_idx"].tolist(), cols["class_name"], cols["conf"].tolist())]
+
+    def to_arrays(self):
+        '''Returns the analyzer's columns as a dict of arrays (see `from_arrays()`)'''
+        return {**self._columns, "class_name": np.array(self._columns["class_name"], dtype=str), "track_id": np.array(self.track_id), "dwells": self._dwells}
+
+    @classmethod
+    def from_arrays(cls, arrays:dict):
+        '''Rebuilds an analyzer from the output of `to_arrays()` without re-processing positions'''
+        traj = cls.__new__(cls)
+        traj.track_id = int(arrays["track_id"])
+        traj._columns = {
+            "center": np.asarray(arrays["center"], dtype=np.float64).reshape(-1, 2),
+            "size": np.asarray(arrays["size"], dtype=np.float64).reshape(-1, 2),
+            "timestamp": np.asarray(arrays["timestamp"], dtype=np.float64),
+            "frame_idx": np.asarray(arrays["frame_idx"], dtype=np.int64),
+            "class_name": [str(c) for c in arrays["class_name"]],
+            "conf": np.asarray(arrays["conf"], dtype=np.float64)
+        }
+        traj._dwells = np.asarray(arrays.get("dwells", np.empty((0, 4))), dtype=np.float64).reshape(-1, 4)
+        traj._reset_caches()
+        return traj
+
+    def __len__(self):
+        return len(self._columns["timestamp"])
+
+    @staticmethod
+    def _dwell_records(dwells:np.ndarray):
+        return [{
+            "start": start,
+            "end": end,
+            "duration": end - start,
+            "center": (x, y)
+        } for start, end, x, y in dwells.tolist()]
 
     def _compute_avg_speed(self):
         '''compute speed where speed is a function of a tracked objects total distance 
         traveled divided by the total amount of time the tracked object persists across the
         camera's field of view.'''
-        total_time = self.positions[-1]["timestamp"] - self.positions[0]["timestamp"]
+        timestamps = self._columns["timestamp"]
+        total_time = timestamps[-1] - timestamps[0]
 
         if total_time == 0:
             logger.warning(f"Track {self.track_id}: Zero time elapsed, cannot compute speed.")
@@ -118,11 +268,11 @@ class TrajAnalyzer:
         if timestamps is None:
             return None
     
-        # Index info
-        idx = np.searchsorted(timestamps, time)
+        # Index info (the first segment at the first timestamp)
+        idx = max(int(np.searchsorted(timestamps, time)), 1)
 
         # Space info
-        travel_range = np.array(self._get_value("center"))[[idx-1, idx]]
+        travel_range = self.get_centers()[[idx-1, idx]]
         travel_dist = self._compute_path_length(travel_range)
         
         # Time info
@@ -178,7 +328,8 @@ class TrajAnalyzer:
         if timestamps is None:
             return None
         
-        idx = np.searchsorted(timestamps, time)
+        # The segment ending at `time`; the first segment at the first timestamp
+        idx = max(int(np.searchsorted(timestamps, time)), 1)
         ts1, ts2 = timestamps[[idx - 1, idx]]
 
         centers = self.get_centers()
@@ -204,6 +355,8 @@ class TrajAnalyzer:
         Sort by timestamp, 
         dedupe by frame_idx, 
         and convert bbox coords to center coords.
+
+        Positions are stored column-wise (one array per field) to keep long-lived analyzers compact.
         '''
         if len(positions) == 0:
             logger.warning(f"Track {self.track_id} contains no positions.")
@@ -213,31 +366,31 @@ class TrajAnalyzer:
 
         # Dedupe by frame_idx        
         deduped = list({d["frame_idx"]: d for d in sorted_pos}.values())
-        
-        if len(deduped) == 0:
-            return []
 
-        bbox_pts = np.array([d["bbox"] for d in deduped])
+        bbox_pts = np.array([d["bbox"] for d in deduped], dtype=np.float64).reshape(-1, 4)
         cx = bbox_pts[:, [0, 2]].mean(axis=1)
         cy = bbox_pts[:, [1, 3]].mean(axis=1)
         w = bbox_pts[:, 2] - bbox_pts[:, 0]
         h = bbox_pts[:, 3] - bbox_pts[:, 1]
 
-        processed = []
-        for i, pos in enumerate(deduped):
-            processed.append({
-                "center": (float(cx[i]), float(cy[i])),
-                "size": (float(w[i]), float(h[i])),
-                "timestamp": pos["timestamp"],
-                "frame_idx": pos["frame_idx"],
-                "class_name": pos["class_name"],
-                "conf": pos["conf"]
-            })
-
-        return processed
+        return {
+            "center": np.column_stack([cx, cy]),
+            "size": np.column_stack([w, h]),
+            "timestamp": np.array([d["timestamp"] for d in deduped], dtype=np.float64),
+            "frame_idx": np.array([d["frame_idx"] for d in deduped], dtype=np.int64),
+            "class_name": [d["class_name"] for d in deduped],
+            "conf": np.array([d["conf"] for d in deduped], dtype=np.float64)
+        }
+
+    def _reset_caches(self):
+        self._speed_cache = None
+        self._path_length_cache = None
+        self._segment_speeds = {}
+        self._instant_positions = {}
+        self._instant_velocity = {}
     
     def _validate_time_arg(self, time):
-        timestamps = np.array(self._get_value("timestamp"))
+        timestamps = self._get_value("timestamp")
         
         if time < timestamps.min() or time > timestamps.max():
             logger.warning(f"Track {self.track_id}: Time argument is out-of-bounds. Must be between {timestamps[0]} and {timestamps[-1]}")
@@ -248,7 +401,7 @@ class TrajAnalyzer:
     
     def _sufficient_data(self):
         '''Utility function to check if trajectory has sufficient data points to perform operations'''
-        return len(self.positions) >= 2
+        return len(self) >= 2
     
     def _get_value(self, key:str):
-        return [p[key] for p in self.positions]
\ No newline at end of file
+        return self._columns[key]
\ No newline at end of file
@@ -13,15 +13,17 @@ class TrajCollector:
         if self.use_wall_time:
             self.start_time = time.time() 
         self.trajectories = {}
+        self.last_seen = {}
         
         logger.debug("Initialized TrajCollector.")
 
 
-    def collect(self, tracks):
+    def collect(self, tracks, timestamp:float=None):
+        '''`timestamp` (seconds) overrides the frame-count / wall-clock time, e.g. with a live frame's capture time'''
         self.frame_count += 1
-        if self.use_wall_time:
+        if timestamp is None and self.use_wall_time:
             timestamp = time.time() - self.start_time
-        else:
+        elif timestamp is None:
             timestamp = self.frame_count / self.fps
 
         for track in tracks:
@@ -32,6 +34,7 @@ class TrajCollector:
 
             if tid not in self.trajectories:
                 self.trajectories[tid] = []
+            self.last_seen[tid] = self.frame_count
 
             self.trajectories[tid].append({
                 "bbox": track["bbox"],
@@ -50,6 +53,33 @@ class TrajCollector:
         self._runtime_check()
         return self.trajectories.get(track_id, [])
     
+    def pop_lost(self, max_age:int):
+        '''Removes and returns the tracks that have not been seen for more than `max_age` frames'''
+        lost = [tid for tid, last in self.last_seen.items() if self.frame_count - last > max_age]
+        popped = {}
+        for tid in lost:
+            del self.last_seen[tid]
+            popped[tid] = self.trajectories.pop(tid)
+        return popped
+
+    def get_state(self):
+        '''Everything needed to continue collecting after a restart (see `set_state()`)'''
+        state = {
+            "frame_count": self.frame_count,
+            "trajectories": self.trajectories,
+            "last_seen": self.last_seen
+        }
+        if self.use_wall_time:
+            state["elapsed"] = time.time() - self.start_time
+        return state
+
+    def set_state(self, state:dict):
+        self.frame_count = state["frame_count"]
+        self.trajectories = state["trajectories"]
+        self.last_seen = state["last_seen"]
+        if self.use_wall_time:
+            self.start_time = time.time() - state.get("elapsed", 0.0)
+
     def get_all_track_ids(self):
         self._runtime_check()
         return list(self.trajectories.keys())
@@ -1,8 +1,13 @@
+import tempfile
+import numpy as np
 from numpy.typing import NDArray
 from typing import List
+from pathlib import Path
+from collections import Counter
 
 from .traj_collector import TrajCollector
 from .traj_analyzer import TrajAnalyzer
+from .zone_map import ZoneMap
 from conflict_detection.homography import WorldProjector
 from conflict_detection.utils import get_logger
 
@@ -10,42 +15,244 @@ logger = get_logger(__name__)
 
 class TrajManager:
 
-    def __init__(self, projector:WorldProjector, fps:int=30, use_wall_time:bool = False):
-
+    def __init__(self, projector:WorldProjector, fps:int=30, use_wall_time:bool = False, lost_buffer:int=None, spill_dir:str=None, simplify_tol:float=None, simplify_max_gap:float=None, simplify_method:str="sed", stationary_speed:float=None, stationary_window:float=1.0, stationary_min_duration:float=2.0):
+        """
+        Parameters
+        ----------
+        projector : WorldProjector
+        fps : int
+        use_wall_time : bool
+        lost_buffer : int, optional
+            When set, tracks unseen for more than `lost_buffer` frames are finalized while collecting:
+            built into a `TrajAnalyzer` and removed from the live collector.
+        spill_dir : str, optional
+            When set (with `lost_buffer`), finalized analyzers are written to disk instead of kept in
+            memory and loaded back on demand. Each manager writes into its own fresh subdirectory
+            (`spill_path`), since track ids restart per camera and per run; a shared `spill_dir` is safe.
+        simplify_tol : float, optional
+            When set, every track is simplified as it is finalized (and by `analyze_tracks()`) with
+            `TrajAnalyzer.simplify()`: points interpolation reproduces to within `simplify_tol` pixels are
+            dropped. See `get_simplify_summary()` for the compression ratio and error.
+        simplify_max_gap : float, optional
+            Largest time in seconds between two kept points of a simplified track.
+        simplify_method : str, default = "sed"
+            "sed" (time-aware) or "rdp" (see `simplify_mask()`).
+        stationary_speed : float, optional
+            When set, stationary intervals (windowed speed at most `stationary_speed` pixels/s for at least
+            `stationary_min_duration` seconds, see `stationary_intervals()`) are collapsed into dwell records
+            as tracks are finalized / analyzed, before simplification. Tracks that never move are then
+            left out of conflict pair generation (see `exclude_stationary()`).
+        stationary_window : float, default = 1.0
+            Seconds over which speed is measured.
+        stationary_min_duration : float, default = 2.0
+            Shortest stationary interval collapsed, in seconds.
+        """
         self.collector = TrajCollector(fps, use_wall_time)
         self.projector = projector
         self.analyzers = {}
+        self.lost_buffer = lost_buffer
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self.spilled = {}
+        self.zone_results = {}
+        self.simplify_tol = simplify_tol
+        self.simplify_max_gap = simplify_max_gap
+        self.simplify_method = simplify_method
+        self.stationary_speed = stationary_speed
+        self.stationary_window = stationary_window
+        self.stationary_min_duration = stationary_min_duration
+        # Running totals for finalized tracks (one small dict for the whole run); live tracks are redone by `analyze_tracks()`
+        self.simplify_totals = self._empty_simplify_totals()
+        self.live_simplify_totals = self._empty_simplify_totals()
+
+        self.spill_path = None
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            self.spill_path = Path(tempfile.mkdtemp(prefix="tracks_", dir=self.spill_dir))
 
         logger.debug(f"TrajManager successfully initialized.")
 
-    def collect_tracks(self, tracks: List[dict]):
-        self.collector.collect(tracks)
-    
+    def collect_tracks(self, tracks: List[dict], timestamp:float=None):
+        self.collector.collect(tracks, timestamp)
+        if self.lost_buffer is not None:
+            self.finalize_lost_tracks()
+
+    def finalize_lost_tracks(self, max_age:int=None):
+        '''Finalizes every live track that has been lost for more than `max_age` (default `lost_buffer`) frames'''
+        max_age = self.lost_buffer if max_age is None else max_age
+        lost = self.collector.pop_lost(max_age)
+        for track_id, track_data in lost.items():
+            self._finalize(TrajAnalyzer(track_id, track_data))
+        return list(lost)
+
     def analyze_tracks(self):
-        all_track_data = self.collector.get_all_traj_data()
-        for track_id, track_data in all_track_data.items():
-            traj = TrajAnalyzer(track_id, track_data)
-            self.analyzers[track_id] = traj
+        '''Builds analyzers for the live tracks; finalized tracks were analyzed when they were finalized'''
+        nothing_finalized = not self.spilled and not self.analyzers
+        if not self.collector.trajectories and nothing_finalized:
+            logger.warning("No tracks were collected; nothing to analyze.")
+            return self.analyzers
+        if self.collector.trajectories:
+            all_track_data = self.collector.get_all_traj_data()
+            self.live_simplify_totals = self._empty_simplify_totals()
+            for track_id, track_data in all_track_data.items():
+                traj = TrajAnalyzer(track_id, track_data)
+                self._collapse_stationary(traj)
+                self._simplify(traj, self.live_simplify_totals)
+                self.analyzers[track_id] = traj
+        if self.simplify_tol is not None:
+            summary = self.get_simplify_summary()
+            logger.info(f"Simplified {summary['tracks']} tracks: {summary['points']} -> {summary['kept']} points ({summary['ratio']:.1f}x), max error {summary['max_error']:.2f}.")
         return self.analyzers
 
+    def analyze_zones(self, zones:ZoneMap, min_samples:int=3):
+        '''
+        Looks up every analyzed track's centers in `zones` (one vectorized lookup per track) and records
+        its zone sequence with dwell times, plus origin (first zone) and destination (last zone); runs
+        shorter than `min_samples` samples are dropped as boundary jitter, the same default as
+        `DetectionSystem.count_zones()`. Call after `analyze_tracks()`. Returns track_id -> result.
+        '''
+        self.zone_results = {}
+        for traj in self.iter_analyzers():
+            visits = zones.sequence(traj.get_centers(), traj._get_value("timestamp"), min_samples)
+            self.zone_results[traj.track_id] = {
+                "class_name": traj.get_stable_class(),
+                "sequence": visits,
+                "origin": visits[0]["zone"] if visits else None,
+                "destination": visits[-1]["zone"] if visits else None
+            }
+        logger.info(f"Assigned zones for {len(self.zone_results)} tracks; {sum(len(r['sequence']) >= 2 for r in self.zone_results.values())} crossed 2+ zones.")
+        return self.zone_results
+
+    def get_turning_movements(self, by_class:bool=False):
+        '''(origin, destination[, class_name]) -> number of tracks, over tracks that visited 2+ zones (see `analyze_zones()`)'''
+        movements = Counter()
+        for result in self.zone_results.values():
+            if len(result["sequence"]) < 2:
+                continue
+            key = (result["origin"], result["destination"])
+            movements[key + (result["class_name"],) if by_class else key] += 1
+        return dict(movements)
+
+    def get_zone_occupancy(self):
+        '''zone -> number of visits, distinct tracks, and total / mean / max dwell seconds (see `analyze_zones()`)'''
+        occupancy = {}
+        for track_id, result in self.zone_results.items():
+            for visit in result["sequence"]:
+                zone = occupancy.setdefault(visit["zone"], {"visits": 0, "tracks": set(), "dwell": []})
+                zone["visits"] += 1
+                zone["tracks"].add(track_id)
+                zone["dwell"].append(visit["dwell"])
+        return {name: {
+            "visits": zone["visits"],
+            "tracks": len(zone["tracks"]),
+            "total_dwell": float(np.sum(zone["dwell"])),
+            "mean_dwell": float(np.mean(zone["dwell"])),
+            "max_dwell": float(np.max(zone["dwell"]))
+        } for name, zone in occupancy.items()}
+
+    def get_dwells(self):
+        '''Every collapsed stationary interval, with its track id (see `TrajAnalyzer.get_dwells()`)'''
+        return [{"track_id": traj.track_id, **dwell} for traj in self.iter_analyzers() for dwell in traj.get_dwells()]
+
+    def get_simplify_summary(self):
+        '''Tracks simplified, points before / after, compression ratio and largest interpolation error'''
+        totals = {key: self.simplify_totals[key] + self.live_simplify_totals[key] for key in ("tracks", "points", "kept")}
+        totals["ratio"] = totals["points"] / totals["kept"] if totals["kept"] else 1.0
+        totals["max_error"] = max(self.simplify_totals["max_error"], self.live_simplify_totals["max_error"])
+        return totals
+
     def get_centers(self, track_id:int=None):
         all_centers = []
         if track_id is None:
-            for track_id in self.analyzers:
-                traj = self.analyzers[track_id]
+            for traj in self.iter_analyzers():
                 all_centers.append(traj.get_centers())
             return all_centers
-        
-        if track_id not in self.analyzers:
-            raise KeyError(f"Error. {track_id} is not in analyzers. User must call `collect_tracks()` followed by `analyze_tracks()` first.")
-        
-        return self.analyzers[track_id].get_centers()
-    
+
+        return self.get_analyzer(track_id).get_centers()
+
     def get_analyzer(self, track_id:int=None):
+        '''Returns one analyzer, or all of them (spilled analyzers are loaded from disk)'''
         if track_id is None:
-            return self.analyzers
-        
-        if track_id not in self.analyzers:
-            raise KeyError(f"Error. {track_id} is not in analyzers. User must call `collect_tracks()` followed by `analyze_tracks()` first.")
-        
-        return self.analyzers[track_id]
\ No newline at end of file
+            if not self.spilled:
+                return self.analyzers
+            return {traj.track_id: traj for traj in self.iter_analyzers()}
+
+        if track_id in self.analyzers:
+            return self.analyzers[track_id]
+        if track_id in self.spilled:
+            return self._load_spilled(track_id)
+
+        raise KeyError(f"Error. {track_id} is not in analyzers. User must call `collect_tracks()` followed by `analyze_tracks()` first.")
+
+    def iter_analyzers(self):
+        '''Yields in-memory analyzers, then spilled analyzers one at a time'''
+        yield from self.analyzers.values()
+        for track_id in self.spilled:
+            yield self._load_spilled(track_id)
+
+    def get_track_ids(self):
+        '''Ids of every live, analyzed and finalized track'''
+        return list(dict.fromkeys([*self.analyzers, *self.spilled, *self.collector.trajectories]))
+
+    def __len__(self):
+        return len(self.get_track_ids())
+
+    def get_state(self):
+        '''Live collector contents plus finalized analyzers (as arrays) and spill paths; see `set_state()`'''
+        return {
+            "collector": self.collector.get_state(),
+            "analyzers": {track_id: traj.to_arrays() for track_id, traj in self.analyzers.items()},
+            "spilled": dict(self.spilled),
+            "spill_path": str(self.spill_path) if self.spill_path is not None else None,
+            "simplify_totals": dict(self.simplify_totals)
+        }
+
+    def set_state(self, state:dict):
+        self.collector.set_state(state["collector"])
+        self.analyzers = {track_id: TrajAnalyzer.from_arrays(arrays) for track_id, arrays in state["analyzers"].items()}
+        self.spilled = {track_id: str(path) for track_id, path in state["spilled"].items()}
+        # Keep spilling into the checkpointed run's directory, next to the tracks it already holds
+        spill_path = state.get("spill_path")
+        if spill_path is not None and self.spill_path is not None and Path(spill_path) != self.spill_path:
+            if not any(self.spill_path.iterdir()):
+                self.spill_path.rmdir()
+            self.spill_path = Path(spill_path)
+            self.spill_path.mkdir(parents=True, exist_ok=True)
+        self.simplify_totals = dict(state.get("simplify_totals", self._empty_simplify_totals()))
+
+    def _finalize(self, traj:TrajAnalyzer):
+        self._collapse_stationary(traj)
+        self._simplify(traj, self.simplify_totals)
+        if self.spill_dir is None:
+            self.analyzers[traj.track_id] = traj
+            return
+
+        path = self.spill_path / f"track_{traj.track_id}.npz"
+        np.savez(path, **traj.to_arrays())
+        # A str per track instead of a Path: the index of spilled tracks grows for the whole run
+        self.spilled[traj.track_id] = str(path)
+        self.analyzers.pop(traj.track_id, None)
+        logger.debug(f"Spilled track {traj.track_id} to {path}.")
+
+    def _collapse_stationary(self, traj:TrajAnalyzer):
+        if self.stationary_speed is None:
+            return
+        dwells = traj.collapse_stationary(self.stationary_speed, self.stationary_window, self.stationary_min_duration)
+        if dwells:
+            logger.debug(f"Track {traj.track_id}: collapsed {len(dwells)} stationary intervals ({sum(d['duration'] for d in dwells):.1f}s).")
+
+    def _simplify(self, traj:TrajAnalyzer, totals:dict):
+        if self.simplify_tol is None:
+            return
+        stats = traj.simplify(self.simplify_tol, self.simplify_max_gap, self.simplify_method)
+        totals["tracks"] += 1
+        totals["points"] += stats["points"]
+        totals["kept"] += stats["kept"]
+        totals["max_error"] = max(totals["max_error"], stats["max_error"])
+
+    @staticmethod
+    def _empty_simplify_totals():
+        return {"tracks": 0, "points": 0, "kept": 0, "max_error": 0.0}
+
+    def _load_spilled(self, track_id:int):
+        with np.load(self.spilled[track_id], allow_pickle=False) as data:
+            return TrajAnalyzer.from_arrays({name: data[name] for name in data.files})
@@ -0,0 +1,108 @@
+import cv2
+import numpy as np
+
+from numpy.typing import NDArray
+from typing import Dict
+
+from conflict_detection.homography import WorldProjector
+from conflict_detection.utils import get_logger
+
+logger = get_logger(__name__)
+
+class ZoneMap:
+    '''
+    Description
+    -----------
+    Named polygon zones (approaches, exits, crosswalks, ...) rasterized once into a label mask the size
+    of the frame, so assigning points to zones is a single array lookup instead of a point-in-polygon
+    test per point. Label 0 is "no zone"; where polygons overlap, the zone listed later wins.
+
+    Parameters
+    ----------
+    zones : dict
+        name -> polygon, an (n, 2) array of vertices.
+    frame_size : tuple
+        (width, height) of the video.
+    projector : WorldProjector, optional
+        Required when `coords="world"`: vertices are projected back to pixels before rasterizing.
+    coords : {"image", "world"}, default = "image"
+    '''
+    def __init__(self, zones:Dict[str, NDArray], frame_size:tuple, projector:WorldProjector=None, coords:str="image"):
+        if coords not in ("image", "world"):
+            raise ValueError(f"Invalid coords: {coords}. Expected 'image' or 'world'.")
+        if coords == "world" and projector is None:
+            raise ValueError("World-coordinate zones need a `projector`.")
+        if len(zones) > 255:
+            raise ValueError(f"At most 255 zones are supported, got {len(zones)}.")
+
+        self.names = list(zones)
+        self.width, self.height = int(frame_size[0]), int(frame_size[1])
+        self.polygons = {}
+        self.mask = np.zeros((self.height, self.width), dtype=np.uint8)
+
+        for label, (name, polygon) in enumerate(zones.items(), start=1):
+            pts = np.asarray(polygon, dtype=np.float32).reshape(-1, 2)
+            if coords == "world":
+                pts = projector.project(pts, "backward")
+            pts = np.round(pts).astype(np.int32)
+            self.polygons[name] = pts
+            cv2.fillPoly(self.mask, [pts], label)
+
+        logger.debug(f"Rasterized {len(self.names)} zones into a {self.width}x{self.height} label mask.")
+
+    def lookup(self, points:NDArray):
+        '''Zone label (1-based index into `names`, 0 = none) of each (x, y) pixel point'''
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        x = np.floor(points[:, 0]).astype(np.int64)
+        y = np.floor(points[:, 1]).astype(np.int64)
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        labels = np.zeros(len(points), dtype=np.uint8)
+        labels[inside] = self.mask[y[inside], x[inside]]
+        return labels
+
+    def name(self, label:int):
+        return self.names[label - 1] if label > 0 else None
+
+    def sequence(self, centers:NDArray, timestamps:NDArray, min_samples:int=3):
+        '''
+        Zones a track passed through, in order, as a list of dicts with zone, enter / exit timestamp,
+        dwell (seconds) and number of samples. Runs shorter than `min_samples` samples (boundary jitter)
+        are ignored, so a visit interrupted only by jitter stays one visit.
+        '''
+        labels = self.lookup(centers)
+        if len(labels) == 0:
+            return []
+
+        # Run-length encode the labels
+        starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+        ends = np.r_[starts[1:], len(labels)] - 1
+
+        visits, left = [], False
+        for start, end in zip(starts, ends):
+            label, samples = labels[start], int(end - start + 1)
+            if samples < min_samples:
+                continue
+            if label == 0:
+                left = True
+                continue
+            if visits and visits[-1]["label"] == label and not left:
+                visits[-1].update(exit=float(timestamps[end]), samples=visits[-1]["samples"] + samples)
+            else:
+                visits.append({"label": label, "enter": float(timestamps[start]), "exit": float(timestamps[end]), "samples": samples})
+            left = False
+
+        return [{
+            "zone": self.name(visit["label"]),
+            "enter": visit["enter"],
+            "exit": visit["exit"],
+            "dwell": visit["exit"] - visit["enter"],
+            "samples": visit["samples"]
+        } for visit in visits]
+
+    def draw(self, frame:NDArray, color:tuple=(255, 200, 0), thickness:int=2):
+        '''Outlines and labels every zone on `frame` (in place)'''
+        for name, pts in self.polygons.items():
+            cv2.polylines(frame, [pts], True, color, thickness, cv2.LINE_AA)
+            x, y = pts.min(axis=0)
+            cv2.putText(frame, name, (int(x) + 4, int(y) + 18), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2, cv2.LINE_AA)
+        return frame
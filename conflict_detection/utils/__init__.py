@@ -1,2 +1,4 @@
 from .logger import setup_logging, get_logger
-from .helpers import path_checker
\ No newline at end of file
+from .helpers import path_checker
+from .timer import StageTimer
+from .memory_profiler import MemoryProfiler
\ No newline at end of file
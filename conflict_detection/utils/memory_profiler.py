@@ -0,0 +1,142 @@
+import os
+import tracemalloc
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# component -> path fragments of the modules whose allocations are charged to it (first match wins)
+DEFAULT_COMPONENTS = {
+    "collector": ("trajectory/traj_collector.py",),
+    "analyzers": ("trajectory/traj_analyzer.py", "trajectory/traj_manager.py"),
+    "conflicts": ("safety/",),
+    "tracker": ("objects/", "supervision/"),
+    "frames": ("studio/", "cv2/"),
+    "alerts": ("alerts/",),
+}
+
+class MemoryProfiler:
+    '''
+    Description
+    -----------
+    Opt-in `tracemalloc` profiler for long runs. Every `snapshot()` records the traced Python / NumPy
+    heap, the process RSS, and how much of the heap each pipeline component holds. Allocations are
+    charged to a component by the file that made them (see `DEFAULT_COMPONENTS`), e.g. the position
+    dicts of live tracks to "collector" and the per-time caches of `TrajAnalyzer` to "analyzers".
+    `top_growth()` compares the latest snapshot with the first one line by line, so creep shows up as
+    the source lines whose allocations keep growing.
+
+    Tracing slows allocation-heavy code down (roughly 1.5-3x), so keep it off in production runs.
+
+    Parameters
+    ----------
+    every : int, default = 1000
+        Frames between snapshots when driven by `step()`.
+    components : dict, optional
+        Component name -> path fragments; replaces `DEFAULT_COMPONENTS`.
+    traceback_frames : int, default = 1
+        Frames of traceback stored per allocation (1 attributes each allocation to the line that made it).
+    '''
+    def __init__(self, every:int=1000, components:dict=None, traceback_frames:int=1):
+        self.every = max(1, int(every))
+        self.components = components if components is not None else DEFAULT_COMPONENTS
+        self.traceback_frames = traceback_frames
+        self.history = []
+        self.baseline = None
+        self.latest = None
+        self._steps = 0
+        self._started_here = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_frames)
+            self._started_here = True
+        self.baseline = self._take()
+        self.latest = self.baseline
+        self._record("start", self.baseline)
+        return self
+
+    def stop(self):
+        if self._started_here and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_here = False
+
+    def step(self, label=None):
+        '''Call once per frame; takes a snapshot every `every` calls and returns it (else None)'''
+        self._steps += 1
+        if self._steps % self.every != 0:
+            return None
+        return self.snapshot(label if label is not None else self._steps)
+
+    def snapshot(self, label=None):
+        '''Records traced heap, RSS and per-component bytes now; returns the record'''
+        if self.baseline is None:
+            self.start()
+        self.latest = self._take()
+        return self._record(label, self.latest)
+
+    def top_growth(self, limit:int=10):
+        '''Source lines whose allocations grew most between the first and latest snapshot'''
+        if self.baseline is None or self.latest is self.baseline:
+            return []
+        stats = self.latest.compare_to(self.baseline, "lineno")
+        return [{
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "component": self._component(stat.traceback[0].filename),
+            "size_diff": stat.size_diff,
+            "count_diff": stat.count_diff,
+            "size": stat.size
+        } for stat in stats[:limit]]
+
+    def growth(self):
+        '''Bytes gained since the first snapshot: traced heap, RSS and per component'''
+        if len(self.history) < 2:
+            return None
+        first, last = self.history[0], self.history[-1]
+        return {
+            "traced": last["traced"] - first["traced"],
+            "rss": last["rss"] - first["rss"] if last["rss"] is not None and first["rss"] is not None else None,
+            "components": {name: last["components"].get(name, 0) - first["components"].get(name, 0) for name in set(first["components"]) | set(last["components"])}
+        }
+
+    def summary(self, limit:int=10):
+        return {"snapshots": self.history, "growth": self.growth(), "top_growth": self.top_growth(limit)}
+
+    def log_summary(self, limit:int=5):
+        growth = self.growth()
+        if growth is None:
+            return
+        components = ", ".join(f"{name} {size / 2**20:+.1f} MB" for name, size in sorted(growth["components"].items(), key=lambda kv: -kv[1]) if size)
+        rss = f", RSS {growth['rss'] / 2**20:+.1f} MB" if growth["rss"] is not None else ""
+        logger.info(f"Memory over {len(self.history)} snapshots: traced {growth['traced'] / 2**20:+.1f} MB{rss} ({components or 'no component growth'}).")
+        for stat in self.top_growth(limit):
+            logger.info(f"  {stat['size_diff'] / 2**20:+.2f} MB ({stat['count_diff']:+d} blocks) {stat['location']} [{stat['component']}]")
+
+    def _take(self):
+        # The profiler's own records would otherwise show up as growth
+        return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)])
+
+    def _record(self, label, snapshot:tracemalloc.Snapshot):
+        components = {}
+        for stat in snapshot.statistics("filename"):
+            name = self._component(stat.traceback[0].filename)
+            components[name] = components.get(name, 0) + stat.size
+        record = {"label": label, "traced": sum(components.values()), "rss": self._rss(), "components": components}
+        self.history.append(record)
+        return record
+
+    def _component(self, filename:str):
+        filename = filename.replace(os.sep, "/")
+        for name, fragments in self.components.items():
+            if any(fragment in filename for fragment in fragments):
+                return name
+        return "other"
+
+    @staticmethod
+    def _rss():
+        '''Resident set size in bytes (Linux), else None'''
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
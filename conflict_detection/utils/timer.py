@@ -0,0 +1,36 @@
+import time
+from contextlib import contextmanager
+
+class StageTimer:
+    '''Accumulates wall-clock time spent in named pipeline stages'''
+
+    def __init__(self):
+        self.totals = {}
+        self.calls = {}
+
+    @contextmanager
+    def time(self, stage:str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage:str, seconds:float, calls:int=1):
+        '''Adds time measured elsewhere (e.g. a share of a batched stage) to `stage`'''
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+        self.calls[stage] = self.calls.get(stage, 0) + calls
+
+    def summary(self):
+        '''Returns dict of stage -> total seconds, number of calls and mean milliseconds per call'''
+        return {
+            stage: {
+                "seconds": total,
+                "calls": self.calls[stage],
+                "mean_ms": 1000 * total / self.calls[stage]
+            } for stage, total in self.totals.items()
+        }
+
+    def reset(self):
+        self.totals.clear()
+        self.calls.clear()
@@ -0,0 +1,110 @@
+'''
+Batch processing of a directory of videos with checkpoint / resume.
+
+Every video is processed headless with a fixed calibration, checkpointed every `--checkpoint-every`
+frames and archived to `<out_dir>/<video stem>/` (see `DetectionSystem.export_results()`). Re-running
+the same command skips videos that are already archived, resumes videos with a partial checkpoint and
+starts the rest from the beginning.
+
+The calibration file is JSON with `world_pts` and `img_pts` (four points each), either at the top level
+for every video or per video stem, with an optional "default" entry:
+
+    {"default": {"world_pts": [...], "img_pts": [...]}, "north_cam": {"world_pts": [...], "img_pts": [...]}}
+
+Usage
+-----
+    python scripts/batch_process.py ./media/in --calibration calibration.json --out-dir ./media/out/batch
+'''
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from pathlib import Path
+
+from conflict_detection.detect import DetectionSystem, Checkpoint
+from conflict_detection.archive import RunIndex
+from conflict_detection.archive.archive_writer import MANIFEST_FILE
+from conflict_detection.utils import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+VIDEO_SUFFIXES = (".mp4", ".avi", ".mov", ".mkv", ".m4v")
+
+
+def load_calibration(path:str):
+    '''Returns stem -> (world_pts, img_pts); "default" applies to stems without their own entry'''
+    raw = json.loads(Path(path).read_text())
+    if "world_pts" in raw:
+        raw = {"default": raw}
+    return {stem: (np.array(cfg["world_pts"], dtype=np.float32), np.array(cfg["img_pts"], dtype=np.float32)) for stem, cfg in raw.items()}
+
+
+def process_video(video:Path, calibration:dict, args):
+    '''Processes one video; returns "skipped", "resumed" or "processed"'''
+    archive_dir = Path(args.out_dir) / video.stem
+    checkpoint = Checkpoint(args.checkpoint_dir, video)
+
+    if checkpoint.is_complete() and (archive_dir / MANIFEST_FILE).exists():
+        logger.info(f"Skipping {video.name}: already archived to {archive_dir}.")
+        return "skipped"
+
+    header = checkpoint.header()
+    world_pts, img_pts = calibration.get(video.stem, calibration.get("default", (None, None)))
+    if world_pts is None:
+        raise KeyError(f"No calibration for {video.stem} and no default entry.")
+
+    system = DetectionSystem(
+        str(video), world_pts, img_pts=img_pts, model_path=args.model, model_conf=args.conf,
+        checkpoint_dir=args.checkpoint_dir, checkpoint_every=args.checkpoint_every,
+        finalize_tracks=args.finalize_tracks, motion_gate=args.motion_gate, frame_cache_mb=0
+    )
+    system.monitor_traffic(headless=True, resume=True)
+    system.detect_conflicts()
+    system.export_results(archive_dir)
+    return "resumed" if header is not None else "processed"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video_dir")
+    parser.add_argument("--calibration", required=True, help="JSON with world_pts / img_pts (see above)")
+    parser.add_argument("--out-dir", default="./media/out/batch")
+    parser.add_argument("--checkpoint-dir", default=None, help="Default: <out-dir>/checkpoints")
+    parser.add_argument("--checkpoint-every", type=int, default=9000, help="Frames between checkpoints")
+    parser.add_argument("--model", default="./models/yolov8n.pt")
+    parser.add_argument("--conf", type=float, default=0.5)
+    parser.add_argument("--finalize-tracks", action="store_true")
+    parser.add_argument("--motion-gate", action="store_true")
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    args.checkpoint_dir = args.checkpoint_dir or str(Path(args.out_dir) / "checkpoints")
+    setup_logging(log_level=args.log_level, log_to_file=False, console_output=True)
+
+    calibration = load_calibration(args.calibration)
+    videos = sorted(p for p in Path(args.video_dir).iterdir() if p.suffix.lower() in VIDEO_SUFFIXES)
+    logger.info(f"Found {len(videos)} videos in {args.video_dir}.")
+
+    status = {}
+    for video in videos:
+        try:
+            status[video.name] = process_video(video, calibration, args)
+        except Exception as e:
+            logger.exception(f"Failed on {video.name}: {e}")
+            status[video.name] = "failed"
+
+    # Keeps the dashboard's precomputed aggregates current (see `scripts/dashboard.py`)
+    RunIndex(args.out_dir).refresh()
+
+    for name, result in status.items():
+        print(f"{result:>9}  {name}")
+    sys.exit(1 if "failed" in status.values() else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+'''
+Review dashboard over archived runs.
+
+Reads the precomputed run index (see `RunIndex`) under an archive root, e.g. the `--out-dir` of
+`scripts/batch_process.py`, plus any heatmaps (`*.npz`, see `HeatmapAccumulator`) directly inside it.
+Raw per-frame positions are only read for the one conflict selected on the "Event" page.
+
+Usage
+-----
+    streamlit run scripts/dashboard.py -- --root ./media/out/batch
+'''
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from pathlib import Path
+
+from conflict_detection.archive import ArchiveReader, HeatmapAccumulator, RunIndex
+from conflict_detection.archive.archive_writer import CONFLICTS_FILE
+from conflict_detection.archive.run_index import RUNS_FILE, PAIRS_FILE, TRACKS_FILE
+
+HEATMAP_LAYERS = ("conflicts", "min_ttc", "mean_speed", "tracks")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default="./media/out/batch", help="Directory of archived runs")
+    return parser.parse_args(sys.argv[1:])
+
+
+@st.cache_data(ttl=300, show_spinner="Indexing runs...")
+def refresh_index(root:str):
+    '''Incremental index refresh, at most every 5 minutes per server; returns the index version'''
+    index = RunIndex(root)
+    index.refresh()
+    return index.mtime()
+
+
+@st.cache_data(show_spinner=False)
+def load_table(root:str, name:str, version:int):
+    return RunIndex(root).read(name)
+
+
+@st.cache_data(show_spinner=False)
+def load_heatmap(path:str, mtime:int):
+    heatmap = HeatmapAccumulator.load(path)
+    return {name: heatmap.layer(name) for name in HEATMAP_LAYERS}, heatmap.bounds, heatmap.resolution, heatmap.runs, heatmap.axis_order
+
+
+@st.cache_data(show_spinner="Loading event...")
+def load_event(run_dir:str, track_A:int, track_B:int):
+    '''Raw positions of the two tracks and the pair's TTC checks; only these rows are read from disk'''
+    reader = ArchiveReader(run_dir)
+    tracks = reader.read_tracks([track_A, track_B])
+    checks = pd.read_parquet(Path(run_dir) / CONFLICTS_FILE, filters=[("track_A_id", "==", track_A), ("track_B_id", "==", track_B)])
+    return tracks, checks
+
+
+def overview(runs:pd.DataFrame, pairs:pd.DataFrame, tracks:pd.DataFrame):
+    cols = st.columns(4)
+    cols[0].metric("Runs", len(runs))
+    cols[1].metric("Tracks", int(runs["n_tracks"].sum()))
+    cols[2].metric("Conflict pairs", int(runs["n_conflict_pairs"].sum()))
+    cols[3].metric("Min TTC (s)", f"{runs['min_ttc'].min():.2f}" if runs["min_ttc"].notna().any() else "-")
+
+    st.plotly_chart(px.bar(runs, x="run", y="n_conflict_pairs", hover_data=["n_tracks", "min_ttc"], title="Conflict pairs per run"), use_container_width=True)
+    st.dataframe(runs.drop(columns="manifest_mtime"), use_container_width=True, hide_index=True)
+
+
+def conflicts_page(pairs:pd.DataFrame):
+    if len(pairs) == 0:
+        st.info("No conflicts archived.")
+        return pairs
+
+    runs = st.multiselect("Runs", sorted(pairs["run"].unique()))
+    max_ttc = st.slider("Max TTC (s)", 0.0, float(np.ceil(pairs["min_ttc"].max())), float(np.ceil(pairs["min_ttc"].max())), 0.1)
+    filtered = pairs[pairs["min_ttc"] <= max_ttc]
+    if runs:
+        filtered = filtered[filtered["run"].isin(runs)]
+
+    st.plotly_chart(px.histogram(filtered, x="min_ttc", nbins=30, color="class_A", title="Minimum TTC per conflicting pair"), use_container_width=True)
+    st.dataframe(filtered.sort_values("min_ttc"), use_container_width=True, hide_index=True)
+    return filtered
+
+
+def tracks_page(tracks:pd.DataFrame):
+    if len(tracks) == 0:
+        st.info("No tracks archived.")
+        return
+
+    counts = tracks.groupby("stable_class", observed=True).size().rename("tracks").reset_index()
+    cols = st.columns(2)
+    cols[0].plotly_chart(px.bar(counts, x="stable_class", y="tracks", title="Tracks per class"), use_container_width=True)
+    cols[1].plotly_chart(px.box(tracks, x="stable_class", y="avg_speed", title="Average speed per class (px/s)"), use_container_width=True)
+    st.dataframe(tracks, use_container_width=True, hide_index=True)
+
+
+def heatmap_page(root:Path):
+    paths = sorted(root.glob("*.npz"))
+    if not paths:
+        st.info(f"No heatmaps (*.npz) in {root}. Create one with `DetectionSystem.update_heatmap()`.")
+        return
+
+    path = st.selectbox("Heatmap", paths, format_func=lambda p: p.name)
+    layers, bounds, resolution, runs, axis_order = load_heatmap(str(path), path.stat().st_mtime_ns)
+    layer = st.radio("Layer", HEATMAP_LAYERS, horizontal=True)
+    values = layers[layer].astype(np.float64)
+    values = np.where(np.isfinite(values) & (values != 0), values, np.nan)
+
+    # Grid columns follow world axis 0 and rows world axis 1; plot east on x and north on y
+    xmin, ymin, _, _ = bounds
+    x = xmin + resolution * (np.arange(values.shape[1]) + 0.5)
+    y = ymin + resolution * (np.arange(values.shape[0]) + 0.5)
+    labels = {"xy": ("x", "y"), "lonlat": ("lon", "lat"), "latlon": ("lat", "lon")}[axis_order]
+    if axis_order == "latlon":
+        values, x, y, labels = values.T, y, x, labels[::-1]
+
+    fig = px.imshow(values, x=x, y=y, origin="lower", labels={"x": labels[0], "y": labels[1]}, color_continuous_scale="Turbo_r" if layer == "min_ttc" else "Turbo", aspect="equal",
+                    title=f"{layer} ({runs} runs, {resolution:g} world units per cell)")
+    if axis_order != "xy":
+        # A degree of longitude is cos(lat) times shorter than a degree of latitude
+        fig.update_yaxes(scaleanchor="x", scaleratio=1 / np.cos(np.radians(np.mean(y))))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def event_page(index:RunIndex, pairs:pd.DataFrame):
+    if len(pairs) == 0:
+        st.info("No conflicts to inspect.")
+        return
+
+    options = pairs.sort_values("min_ttc").head(500)
+    row = st.selectbox("Conflict", options.itertuples(index=False),
+                       format_func=lambda r: f"{r.run} | tracks {r.track_A_id} & {r.track_B_id} | TTC {r.min_ttc:.2f}s at {r.time_of_min:.1f}s")
+    tracks, checks = load_event(str(index.run_dir(row.run)), int(row.track_A_id), int(row.track_B_id))
+
+    tracks = tracks.assign(cx=(tracks["x1"] + tracks["x2"]) / 2, cy=(tracks["y1"] + tracks["y2"]) / 2).sort_values(["track_id", "frame_idx"])
+    fig = px.line(tracks, x="cx", y="cy", color=tracks["track_id"].astype(str), hover_data=["timestamp", "frame_idx"], title="Trajectories (pixels)")
+    fig.add_trace(go.Scatter(x=[row.collision_x], y=[row.collision_y], mode="markers", marker={"symbol": "x", "size": 14, "color": "red"}, name="collision point"))
+    fig.update_yaxes(autorange="reversed", scaleanchor="x")
+
+    cols = st.columns(2)
+    cols[0].plotly_chart(fig, use_container_width=True)
+    cols[1].plotly_chart(px.line(checks.sort_values("time_checked"), x="time_checked", y="ttc", markers=True, title="TTC over time"), use_container_width=True)
+
+
+def main():
+    args = parse_args()
+    root = Path(args.root)
+    st.set_page_config(page_title="Traffic Conflict Review", layout="wide")
+    st.title("Traffic Conflict Review")
+
+    if not root.is_dir():
+        st.error(f"Archive root {root} does not exist.")
+        return
+
+    if st.sidebar.button("Re-index runs"):
+        refresh_index.clear()
+    version = refresh_index(str(root))
+    index = RunIndex(root)
+
+    runs = load_table(str(root), RUNS_FILE, version)
+    if len(runs) == 0:
+        st.info(f"No archived runs under {root}. Archive runs with `DetectionSystem.export_results()`.")
+        return
+    pairs = load_table(str(root), PAIRS_FILE, version)
+    tracks = load_table(str(root), TRACKS_FILE, version)
+
+    page = st.sidebar.radio("Page", ("Overview", "Conflicts", "Tracks", "Heatmaps", "Event"))
+    if page == "Overview":
+        overview(runs, pairs, tracks)
+    elif page == "Conflicts":
+        conflicts_page(pairs)
+    elif page == "Tracks":
+        tracks_page(tracks)
+    elif page == "Heatmaps":
+        heatmap_page(root)
+    else:
+        event_page(index, pairs)
+
+
+main()
@@ -4,6 +4,7 @@ import numpy as np
 
 from conflict_detection.detect import DetectionSystem
 from conflict_detection.studio import StudioManager
+from conflict_detection.studio.seek_index import DEFAULT_INDEX_DIR
 from conflict_detection.utils import get_logger, setup_logging, path_checker
 
 logger = get_logger(__name__)
@@ -15,7 +16,7 @@ setup_logging(
     console_output=True
 )
 
-def main(file_in:str, file_out:str, dst_pts:np.ndarray):
+def main(file_in:str, file_out:str, dst_pts:np.ndarray, archive_dir:str=None, clip_dir:str=None, geo_dir:str=None):
 
     system = DetectionSystem(file_in, dst_pts)
 
@@ -23,9 +24,19 @@ def main(file_in:str, file_out:str, dst_pts:np.ndarray):
 
     conflicts = system.detect_conflicts()
 
+    if archive_dir is not None:
+        system.export_results(archive_dir)
+
+    if clip_dir is not None:
+        system.export_clips(clip_dir, pre_seconds=2.0, post_seconds=2.0)
+
+    if geo_dir is not None:
+        # world_pts are (lat, lon) in WGS84
+        system.export_geo(geo_dir, crs="EPSG:4326", axis_order="latlon", pet_cell_size=10.0)
+
     if path_checker(file_out):
         logger.info("Playing back processed video...")
-        studio = StudioManager(file_out)
+        studio = StudioManager(file_out, frame_cache_mb=256, seek_index_dir=DEFAULT_INDEX_DIR)
         studio.print_menu()
 
         while True:
@@ -50,4 +61,6 @@ if __name__ == "__main__":
                            [33.713651, 78.899529],
                            [33.713976, 78.899634]]])
 
-    main(file_in, file_out, world_pts)
\ No newline at end of file
+    archive_dir = "./media/out/US_17_N_10th_Ave_20260107-archive"
+
+    main(file_in, file_out, world_pts, archive_dir)
\ No newline at end of file
@@ -0,0 +1,101 @@
+'''
+Warm-model worker service.
+
+    serve   start a pool of worker processes that keep the detector loaded and pull jobs from the queue
+    submit  queue one job per video
+    status  print job counts, or every job with --all
+
+Profiles are JSON: name -> {"world_pts": [...], "img_pts": [...], optional defaults such as
+"ttc_thresh", "min_dist", "lost_buffer", "model_conf"}. Per-job overrides are passed with --param.
+
+Usage
+-----
+    python scripts/worker.py serve --queue ./media/jobs.db --profiles profiles.json --results ./media/out/jobs --workers 4
+    python scripts/worker.py submit --queue ./media/jobs.db --profile us17 clip_001.mp4 clip_002.mp4 --param ttc_thresh=2.0
+    python scripts/worker.py status --queue ./media/jobs.db
+'''
+import argparse
+import json
+import signal
+import sys
+
+from pathlib import Path
+
+from conflict_detection.service import JobQueue, WorkerPool
+from conflict_detection.utils import setup_logging
+
+
+def parse_param(text:str):
+    '''"key=value" -> (key, JSON-decoded value, or the raw string)'''
+    key, _, value = text.partition("=")
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+
+def serve(args):
+    profiles = json.loads(Path(args.profiles).read_text())
+    pool = WorkerPool(args.queue, profiles, args.results, model_path=args.model, model_conf=args.conf, workers=args.workers, poll_interval=args.poll, log_level=args.log_level, lease=args.lease)
+    signal.signal(signal.SIGTERM, lambda *_: pool.stop())
+    counts = pool.serve(until_empty=args.until_empty)
+    print(json.dumps(counts))
+
+
+def submit(args):
+    queue = JobQueue(args.queue)
+    params = dict(parse_param(p) for p in args.param)
+    for video in args.videos:
+        job_id = queue.submit(str(Path(video).resolve()), args.profile, params, max_attempts=args.max_attempts)
+        print(f"{job_id}\t{video}")
+
+
+def status(args):
+    queue = JobQueue(args.queue)
+    if args.all:
+        for job in queue.jobs():
+            print(f"{job['id']:>6}  {job['status']:<8} {job['attempts']}/{job['max_attempts']}  {job['video']}  {job['result_dir'] or job['error'] or ''}")
+    print(json.dumps(queue.counts()))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log-level", default="INFO")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("serve")
+    p.add_argument("--queue", required=True)
+    p.add_argument("--profiles", required=True)
+    p.add_argument("--results", default="./media/out/jobs")
+    p.add_argument("--model", default="./models/yolov8n.pt")
+    p.add_argument("--conf", type=float, default=0.5)
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--poll", type=float, default=1.0, help="Seconds between queue polls when idle")
+    p.add_argument("--lease", type=float, default=300.0, help="Seconds without heartbeat after which another pool's running job is reclaimed")
+    p.add_argument("--until-empty", action="store_true", help="Exit once no job is queued or running")
+    p.set_defaults(func=serve)
+
+    p = commands.add_parser("submit")
+    p.add_argument("--queue", required=True)
+    p.add_argument("--profile", required=True)
+    p.add_argument("--param", action="append", default=[], help="Threshold override, e.g. ttc_thresh=2.0 (repeatable)")
+    p.add_argument("--max-attempts", type=int, default=3)
+    p.add_argument("videos", nargs="+")
+    p.set_defaults(func=submit)
+
+    p = commands.add_parser("status")
+    p.add_argument("--queue", required=True)
+    p.add_argument("--all", action="store_true")
+    p.set_defaults(func=status)
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging(log_level=args.log_level, log_to_file=False, console_output=True)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())